@@ -0,0 +1,3 @@
+"""
+今日头条 MCP 服务器基准测试
+"""
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+接口吞吐量与延迟基准测试
+
+在本地模拟服务器（tests/fake_server.py）上并发调用文章列表、删除、图片上传、登录状态、
+数据分析和接口发布等网络路径，统计吞吐量和延迟分位数，用于离线比较连接池、缓存和并发相关的改动。
+
+用法:
+    python -m benchmarks.api_bench
+    python -m benchmarks.api_bench --scenarios article_list,login_status --concurrency 8 --latency 0.02
+    python -m benchmarks.api_bench --session fresh --json results.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from toutiao_mcp_server.auth import TouTiaoAuth
+from toutiao_mcp_server.publisher import TouTiaoPublisher
+from toutiao_mcp_server.analytics import TouTiaoAnalytics
+from tests.fake_server import FakeToutiaoServer
+
+
+class Clients:
+    """一组共享同一认证会话的客户端"""
+
+    def __init__(self, cookies_file: str):
+        self.auth = TouTiaoAuth(cookies_file)
+        self.auth.session.cookies.set('sessionid', 'bench', domain='127.0.0.1')
+        # 基准测试不启动浏览器，接口发布失败时也不回退
+        self.publisher = TouTiaoPublisher(self.auth, driver_pool=Mock())
+        self.analytics = TouTiaoAnalytics(self.auth)
+
+
+def _ok(result: Any) -> bool:
+    """判断一次调用是否成功"""
+    if isinstance(result, dict):
+        return bool(result.get('success'))
+    return bool(result)
+
+
+def build_scenarios(server: FakeToutiaoServer, image_path: str) -> Dict[str, Callable[[Clients, int], Any]]:
+    """
+    构建基准场景
+
+    Args:
+        server: 模拟服务器
+        image_path: 上传场景使用的图片
+
+    Returns:
+        Dict: 场景名到调用函数的映射，调用函数接收客户端和调用序号
+    """
+    def delete_article(clients: Clients, index: int) -> Any:
+        # 删除不存在的文章同样走完整的请求路径，避免预置文章被删空后结果失真
+        article_id = server.articles[index % len(server.articles)]['id'] if server.articles else '0'
+        result = clients.publisher.delete_article(article_id)
+        return result if result.get('success') or result.get('message') == '文章不存在' else None
+
+    def publish_api(clients: Clients, index: int) -> Any:
+        return clients.publisher._publish_article_api(
+            title=f"基准测试文章 {index}", content="第一段\n第二段", tags=["科技"]
+        )
+
+    return {
+        'article_list': lambda c, i: c.publisher.get_article_list(page=i % 3 + 1, page_size=20),
+        'delete_article': delete_article,
+        'upload': lambda c, i: c.publisher._upload_image(image_path, compress=False),
+        'login_status': lambda c, i: c.auth.check_login_status(),
+        'account_overview': lambda c, i: c.analytics.get_account_overview(),
+        'article_stats': lambda c, i: c.analytics.get_article_stats(
+            server.articles[i % len(server.articles)]['id'] if server.articles else '0'),
+        'trending': lambda c, i: c.analytics.get_trending_analysis(days=7),
+        'content_performance': lambda c, i: c.analytics.get_content_performance(limit=20),
+        'audience': lambda c, i: c.analytics.get_audience_analysis(),
+        'report': lambda c, i: c.analytics.generate_report('weekly'),
+        'publish_api': publish_api,
+    }
+
+
+def percentile(samples: List[float], ratio: float) -> float:
+    """计算已排序样本的分位数"""
+    if not samples:
+        return 0.0
+    index = min(int(round(ratio * (len(samples) - 1))), len(samples) - 1)
+    return samples[index]
+
+
+def run_scenario(call: Callable[[Clients, int], Any],
+                 requests: int,
+                 concurrency: int,
+                 session_mode: str,
+                 cookies_file: str) -> Dict[str, Any]:
+    """
+    并发执行一个场景并统计结果
+
+    Args:
+        call: 场景调用函数
+        requests: 调用总次数
+        concurrency: 并发线程数
+        session_mode: shared 为所有调用共享一个会话，fresh 为每次调用新建会话
+        cookies_file: Cookie 文件路径
+
+    Returns:
+        Dict: 调用次数、失败次数、耗时、吞吐量和延迟分位数（毫秒）
+    """
+    shared = Clients(cookies_file) if session_mode == 'shared' else None
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def worker(index: int) -> None:
+        nonlocal errors
+        clients = shared or Clients(cookies_file)
+        started = time.perf_counter()
+        try:
+            ok = _ok(call(clients, index))
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'errors': errors,
+        'elapsed': round(wall, 3),
+        'throughput': round(requests / wall, 1) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="今日头条接口吞吐量与延迟基准测试（本地模拟服务器）")
+    parser.add_argument('--scenarios', default='all', help="逗号分隔的场景名，默认全部")
+    parser.add_argument('--requests', type=int, default=200, help="每个场景的调用次数")
+    parser.add_argument('--concurrency', type=int, default=4, help="并发线程数")
+    parser.add_argument('--latency', type=float, default=0.0, help="服务器响应延迟（秒）")
+    parser.add_argument('--jitter', type=float, default=0.0, help="延迟随机抖动上限（秒），叠加在 --latency 上")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="服务器随机返回 500 的比例")
+    parser.add_argument('--articles', type=int, default=200, help="预置文章数量")
+    parser.add_argument('--session', choices=['shared', 'fresh'], default='shared',
+                        help="shared 共享会话复用连接，fresh 每次调用新建会话")
+    parser.add_argument('--json', help="把结果写入 JSON 文件，便于前后对比")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    latency = (args.latency, args.latency + args.jitter) if args.jitter else args.latency
+    server = FakeToutiaoServer(latency=latency, error_rate=args.error_rate,
+                               article_count=args.articles).start()
+    work_dir = Path(tempfile.mkdtemp())
+    image_path = work_dir / "bench.jpg"
+    image_path.write_bytes(b'\xff\xd8' + b'\x00' * 64 * 1024)
+    cookies_file = str(work_dir / "cookies.json")
+
+    scenarios = build_scenarios(server, str(image_path))
+    names = list(scenarios) if args.scenarios == 'all' else [n.strip() for n in args.scenarios.split(',')]
+    unknown = [n for n in names if n not in scenarios]
+    if unknown:
+        parser.error(f"未知场景: {', '.join(unknown)}，可选: {', '.join(scenarios)}")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        with patch.dict('toutiao_mcp_server.config.TOUTIAO_URLS', server.urls()):
+            print(f"{'场景':<20}{'次数':>8}{'失败':>8}{'吞吐(次/秒)':>14}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}")
+            for name in names:
+                stats = run_scenario(scenarios[name], args.requests, args.concurrency, args.session, cookies_file)
+                results[name] = stats
+                print(f"{name:<20}{stats['requests']:>8}{stats['errors']:>8}{stats['throughput']:>14}"
+                      f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}")
+    finally:
+        server.stop()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            'options': vars(args),
+            'results': results
+        }, ensure_ascii=False, indent=2), encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+发布流程端到端基准测试（无头 Chrome + 模拟编辑器页面）
+
+在本地模拟服务器（tests/fake_server.py）提供的图文和微头条发布页上，用无头 Chrome 完整执行
+publish_article 和 publish_micro_post 的 Selenium 流程，按步骤（driver_acquire、navigation、
+editor_ready、title、body、cover_upload、image_upload、confirm、success_detection 等）统计耗时。
+不需要登录和联网，需要本机安装 Chrome 和 ChromeDriver。
+
+用法:
+    python -m benchmarks.editor_bench
+    python -m benchmarks.editor_bench --rounds 5 --images 3 --editor-delay 0.8 --upload-delay 0.3
+    python -m benchmarks.editor_bench --hot-editor --lean --json editor.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from toutiao_mcp_server.auth import TouTiaoAuth
+from toutiao_mcp_server.publisher import TouTiaoPublisher
+from toutiao_mcp_server.timing import get_timing_aggregator
+from tests.fake_server import FakeToutiaoServer, PIXEL_PNG
+
+
+def build_jobs(kinds: List[str], rounds: int, paragraphs: int, images: List[str]) -> List[Dict[str, Any]]:
+    """
+    生成发布任务，同类任务排在一起以便复用发布页面
+
+    Args:
+        kinds: 发布类型（article、micro_post）
+        rounds: 每种类型的发布次数
+        paragraphs: 文章段落数
+        images: 配图路径
+
+    Returns:
+        List: publish_batch 格式的任务列表
+    """
+    jobs = []
+    for kind in kinds:
+        for index in range(rounds):
+            if kind == 'article':
+                content = "\n".join(
+                    f"第 {n + 1} 段：基准测试正文，用于测量分批插入和字数校验的耗时。" for n in range(paragraphs)
+                )
+                jobs.append({'type': 'article', 'title': f"基准测试文章 {index + 1}", 'content': content,
+                             'images': list(images)})
+            else:
+                jobs.append({'type': 'micro_post', 'content': f"基准测试微头条 {index + 1}",
+                             'images': list(images), 'topic': '科技'})
+    return jobs
+
+
+def run_jobs(publisher: TouTiaoPublisher, jobs: List[Dict[str, Any]], hot_editor: bool) -> List[Dict[str, Any]]:
+    """逐条发布（每条单独借出浏览器），或在同一个浏览器中批量发布并复用发布页面"""
+    if hot_editor:
+        return publisher.publish_batch(jobs, hot_editor=True)['results']
+    results = []
+    for job in jobs:
+        if job['type'] == 'article':
+            results.append(publisher.publish_article(
+                job['title'], job['content'], images=job['images'], transport='selenium'
+            ))
+        else:
+            results.append(publisher.publish_micro_post(
+                job['content'], images=job['images'], topic=job['topic'], transport='selenium'
+            ))
+    return results
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    """按发布类型打印各步骤的耗时分布"""
+    for kind, stats in summary.items():
+        print(f"\n{kind}: 成功 {stats.get('succeeded', 0)}/{stats.get('runs', 0)}")
+        print(f"  {'步骤':<22}{'次数':>6}{'平均(秒)':>10}{'p50':>8}{'p90':>8}{'max':>8}")
+        steps = stats['steps']
+        for name in sorted(steps, key=lambda n: (n == 'total', n)):
+            step = steps[name]
+            print(f"  {name:<22}{step['count']:>6}{step['mean']:>10}{step['p50']:>8}{step['p90']:>8}{step['max']:>8}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="发布流程端到端基准测试（无头 Chrome + 模拟编辑器页面）")
+    parser.add_argument('--kinds', default='article,micro_post', help="逗号分隔的发布类型")
+    parser.add_argument('--rounds', type=int, default=3, help="每种类型的发布次数")
+    parser.add_argument('--images', type=int, default=1, help="每条内容的配图数量")
+    parser.add_argument('--paragraphs', type=int, default=20, help="文章段落数")
+    parser.add_argument('--latency', type=float, default=0.0, help="服务器响应延迟（秒）")
+    parser.add_argument('--editor-delay', type=float, default=0.3, help="编辑器挂载延迟（秒）")
+    parser.add_argument('--upload-delay', type=float, default=0.2, help="每张图片的上传延迟（秒）")
+    parser.add_argument('--dialog-delay', type=float, default=0.1, help="弹窗出现延迟（秒）")
+    parser.add_argument('--publish-delay', type=float, default=0.2, help="点击确认到提交发布的延迟（秒）")
+    parser.add_argument('--guide-mask', action='store_true', help="打开发布页时显示引导遮罩")
+    parser.add_argument('--no-micro-confirm', action='store_true', help="微头条点击发布后不弹出确认框")
+    parser.add_argument('--hot-editor', action='store_true', help="在同一个浏览器中批量发布并复用发布页面")
+    parser.add_argument('--lean', action='store_true', help="使用精简发布配置（eager 加载、屏蔽非必要请求）")
+    parser.add_argument('--json', help="把汇总和每次发布的结果写入 JSON 文件")
+    parser.add_argument('--verbose', action='store_true', help="输出发布流程日志")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+    kinds = [kind.strip() for kind in args.kinds.split(',')]
+    unknown = [kind for kind in kinds if kind not in ('article', 'micro_post')]
+    if unknown:
+        parser.error(f"未知发布类型: {', '.join(unknown)}")
+
+    server = FakeToutiaoServer(
+        latency=args.latency,
+        page_delays={'editor': args.editor_delay, 'upload': args.upload_delay,
+                     'dialog': args.dialog_delay, 'publish': args.publish_delay},
+        page_options={'guide_mask': args.guide_mask, 'micro_confirm': not args.no_micro_confirm}
+    ).start()
+    work_dir = Path(tempfile.mkdtemp())
+    images = []
+    for index in range(args.images):
+        path = work_dir / f"image_{index + 1}.png"
+        path.write_bytes(PIXEL_PNG)
+        images.append(str(path))
+    jobs = build_jobs(kinds, args.rounds, args.paragraphs, images)
+
+    selenium_config = {'headless': True, 'publish_profile': 'lean' if args.lean else 'standard',
+                       'profile_mode': 'ephemeral'}
+    publisher = None
+    try:
+        with patch.dict('toutiao_mcp_server.config.TOUTIAO_URLS', server.urls()), \
+                patch.dict('toutiao_mcp_server.config.SELENIUM_CONFIG', selenium_config):
+            auth = TouTiaoAuth(str(work_dir / "cookies.json"))
+            publisher = TouTiaoPublisher(auth)
+            get_timing_aggregator().reset()
+            results = run_jobs(publisher, jobs, args.hot_editor)
+    finally:
+        if publisher:
+            publisher.close()
+        server.stop()
+
+    summary = get_timing_aggregator().summary()
+    print_summary(summary)
+    submitted = sum(1 for r in server.requests if r['form'].get('source') == 'fixture')
+    print(f"\n模拟页面提交的发布请求: {submitted}/{len(jobs)}")
+    for job, result in zip(jobs, results):
+        if not result.get('success'):
+            print(f"  失败 [{job['type']}]: {result.get('message')}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            'options': vars(args),
+            'summary': summary,
+            'results': results
+        }, ensure_ascii=False, indent=2, default=str), encoding='utf-8')
+    return 0 if all(result.get('success') for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,18 +10,15 @@ from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import json
 import time
 from pathlib import Path
 
+from toutiao_mcp_server.cookie_store import CookieStore
+
 def load_cookies():
-    """加载登录 cookies"""
-    cookie_file = Path("toutiao_cookies.json")
-    if cookie_file.exists():
-        with open(cookie_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get('cookies', [])
-    return []
+    """加载登录 cookies（加共享锁读取，不会读到其他进程写了一半的文件）"""
+    data = CookieStore("toutiao_cookies.json").read()
+    return data.get('cookies', []) if data else []
 
 def publish_weitoutiao(content, auto_publish=False):
     """
@@ -46,6 +46,12 @@ setup(
             "flake8>=3.8.0",
             "mypy>=0.812",
         ],
+        "monitor": [
+            "psutil>=5.8.0",
+        ],
+        "async": [
+            "websockets>=10.0",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -9,7 +9,7 @@ import asyncio
 from pathlib import Path
 
 from fastmcp import FastMCP
-from toutiao_mcp_server.server import mcp, initialize_services
+from toutiao_mcp_server.server import mcp, initialize_services, prefill_driver_pools, start_session_refresh
 
 # 配置日志
 logging.basicConfig(
@@ -37,6 +37,11 @@ def main():
         logger.error("服务初始化失败，无法启动服务器")
         return
     
+    # 后台预热浏览器驱动池，避免首次发布时冷启动
+    prefill_driver_pools()
+    # 登录会话到期前自动续期
+    start_session_refresh()
+    
     # 使用改进的启动方式，确保正确的生命周期管理
     try:
         if args.transport == "streamable-http":
@@ -0,0 +1,428 @@
+"""
+本地模拟的 mp.toutiao.com 接口服务器，用于在测试和基准测试中走真实的 HTTP 请求
+
+覆盖 TOUTIAO_URLS 中的上传、发布、文章列表、删除和登录状态接口，以及 ANALYTICS_PATHS 中仅供测试的
+数据分析接口，支持配置响应延迟、随机错误率和文章列表分页。图文和微头条发布页返回 fixtures/editor
+下的模拟编辑器页面，可在无头浏览器中离线走完整的发布流程。
+"""
+
+import base64
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+from toutiao_mcp_server.config import TOUTIAO_URLS
+
+HOMEPAGE_HTML = (
+    "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>头条号 - 创作者中心</title></head>"
+    "<body><div id=\"root\" class=\"profile-v4\"><nav>首页 发布 我的作品 数据</nav></div></body></html>"
+)
+LOGIN_HTML = (
+    "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>登录</title></head>"
+    "<body><div id=\"login-form\">login</div></body></html>"
+)
+
+FIXTURE_DIR = Path(__file__).parent / 'fixtures' / 'editor'
+FIXTURE_TYPES = {'.html': 'text/html; charset=utf-8', '.js': 'application/javascript', '.css': 'text/css'}
+# 文章发布成功后跳转的作品管理页
+AFTER_PUBLISH_PATH = '/profile_v4/manage/content/all'
+# /img/ 下的图片统一返回 1x1 的 PNG
+PIXEL_PNG = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=='
+)
+
+# 数据分析接口没有对应的生产地址（TOUTIAO_URLS 中未配置），测试中由 urls() 补充这些本地路径
+ANALYTICS_PATHS = {
+    'analytics_overview': '/fake/statistic/overview/',
+    'article_stats': '/fake/statistic/article/',
+    'trending_analysis': '/fake/statistic/trend/',
+    'content_performance': '/fake/statistic/rank/',
+    'audience_analysis': '/fake/statistic/fans/',
+}
+
+CATEGORIES = ['科技', '财经', '体育', '娱乐', '美食', '旅游']
+STATUSES = ['published', 'published', 'published', 'draft', 'review']
+
+
+class FakeToutiaoServer:
+    """按 TOUTIAO_URLS 中的路径响应请求的本地服务器"""
+
+    def __init__(self,
+                 latency: Union[float, Tuple[float, float]] = 0.0,
+                 error_rate: float = 0.0,
+                 article_count: int = 45,
+                 seed: int = 0,
+                 page_delays: Optional[Dict[str, float]] = None,
+                 page_options: Optional[Dict[str, bool]] = None):
+        """
+        初始化服务器，绑定本机随机端口
+
+        Args:
+            latency: 每个请求的响应延迟（秒），传入 (最小, 最大) 时在区间内随机
+            error_rate: 随机返回 500 错误的比例（0~1）
+            article_count: 预置的文章数量，用于文章列表分页和数据分析
+            seed: 随机数种子，保证生成的数据可复现
+            page_delays: 模拟编辑器页面各环节的延迟（秒）：editor 编辑器挂载、upload 每张图片上传、
+                dialog 弹窗出现、publish 点击确认到提交发布
+            page_options: 模拟编辑器页面的开关：guide_mask 打开页面时显示引导遮罩，
+                micro_confirm 微头条点击发布后弹出确认框
+        """
+        self.requests: List[Dict[str, Any]] = []
+        # 按路径覆盖的响应：(状态码, 响应体)，响应体为 dict 时按 JSON 返回
+        self.overrides: Dict[str, Tuple[int, Any]] = {}
+        self.latency = latency
+        self.error_rate = error_rate
+        # 未登录时首页返回登录页，用户信息接口返回未登录
+        self.logged_in = True
+        self.page_delays = {'editor': 0.0, 'upload': 0.0, 'dialog': 0.0, 'publish': 0.0, **(page_delays or {})}
+        self.page_options = {'guide_mask': False, 'micro_confirm': True, **(page_options or {})}
+        self._random = random.Random(seed)
+        self._next_id = 7300000000000000000
+        self._lock = threading.Lock()
+        self._paths = {**{key: urlsplit(url).path for key, url in TOUTIAO_URLS.items()}, **ANALYTICS_PATHS}
+        self.articles: List[Dict[str, Any]] = [self._make_article(i) for i in range(article_count)]
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """服务器地址"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self) -> Dict[str, str]:
+        """把 TOUTIAO_URLS 的域名替换为本地服务器地址并补充数据分析接口，用于 patch.dict"""
+        local = urlsplit(self.base_url)
+        urls = {
+            key: urlunsplit((local.scheme, local.netloc, parts.path, parts.query, parts.fragment))
+            for key, parts in ((key, urlsplit(url)) for key, url in TOUTIAO_URLS.items())
+        }
+        urls.update({key: f"{self.base_url}{path}" for key, path in ANALYTICS_PATHS.items()})
+        return urls
+
+    def start(self) -> "FakeToutiaoServer":
+        """在后台线程中启动服务器"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止服务器"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def requests_to(self, key: str) -> List[Dict[str, Any]]:
+        """返回发往 TOUTIAO_URLS[key] 的请求记录"""
+        return [r for r in self.requests if r['path'] == self._paths[key]]
+
+    def _new_id(self) -> str:
+        with self._lock:
+            self._next_id += 1
+            return str(self._next_id)
+
+    def _make_article(self, index: int) -> Dict[str, Any]:
+        """生成一篇带阅读数据的预置文章，越靠前发布时间越新"""
+        article_id = self._new_id()
+        read_count = self._random.randint(50, 200000)
+        publish_time = datetime(2024, 6, 30, 20, 0) - timedelta(hours=13 * index)
+        category = self._random.choice(CATEGORIES)
+        return {
+            'id': article_id,
+            'title': f"{category}观察：第 {index + 1} 期",
+            'status': self._random.choice(STATUSES),
+            'category': category,
+            'tags': [category, self._random.choice(CATEGORIES)],
+            'read_count': read_count,
+            'comment_count': read_count // self._random.randint(80, 400),
+            'like_count': read_count // self._random.randint(20, 60),
+            'share_count': read_count // self._random.randint(100, 800),
+            'collect_count': read_count // self._random.randint(60, 200),
+            'play_duration': self._random.randint(20, 300),
+            'completion_rate': round(self._random.uniform(0.2, 0.9), 2),
+            'publish_time': publish_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'create_time': int(publish_time.timestamp()),
+            'article_url': f"https://www.toutiao.com/article/{article_id}/"
+        }
+
+    def _delay(self) -> float:
+        """本次请求的响应延迟"""
+        if isinstance(self.latency, (tuple, list)):
+            with self._lock:
+                return self._random.uniform(*self.latency)
+        return self.latency
+
+    def _should_fail(self) -> bool:
+        """按错误率决定本次请求是否返回服务器错误"""
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def _find_article(self, article_id: Any) -> Optional[Dict[str, Any]]:
+        return next((a for a in self.articles if a['id'] == str(article_id)), None)
+
+    def editor_page(self, kind: str) -> str:
+        """
+        生成模拟编辑器页面，注入当前的延迟和开关配置
+
+        Args:
+            kind: article 或 micro
+        """
+        publish_key = 'publish_article' if kind == 'article' else 'publish_micro'
+        config = {
+            'delays': self.page_delays,
+            'options': self.page_options,
+            'publish_url': self._paths[publish_key],
+            'after_publish_url': AFTER_PUBLISH_PATH
+        }
+        page = (FIXTURE_DIR / f"{kind}.html").read_text(encoding='utf-8')
+        script = f"<script>window.FIXTURE_CONFIG = {json.dumps(config)};</script>"
+        return page.replace('<!--FIXTURE_CONFIG-->', script)
+
+    def static(self, path: str) -> Optional[Tuple[int, bytes, str]]:
+        """
+        编辑器页面引用的静态资源、图片和发布后的跳转页
+
+        Returns:
+            Tuple: (状态码, 响应体, Content-Type)，不是静态资源时返回 None
+        """
+        if path.startswith('/fixtures/editor/'):
+            target = FIXTURE_DIR / path.rsplit('/', 1)[-1]
+            if not target.is_file():
+                return 404, b'not found', 'text/plain'
+            return 200, target.read_bytes(), FIXTURE_TYPES.get(target.suffix, 'application/octet-stream')
+        if path.startswith('/img/'):
+            return 200, PIXEL_PNG, 'image/png'
+        if path == AFTER_PUBLISH_PATH:
+            return 200, "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>作品管理</title></head>" \
+                        "<body>作品管理</body></html>".encode('utf-8'), 'text/html; charset=utf-8'
+        return None
+
+    def respond(self, key: Optional[str], form: Dict[str, Any]) -> Tuple[int, Any]:
+        """
+        生成默认响应
+
+        Args:
+            key: 请求路径对应的 TOUTIAO_URLS 键，未知路径为 None
+            form: GET 请求的查询参数或 POST 请求的表单
+
+        Returns:
+            Tuple: (状态码, 响应体)
+        """
+        if key == 'upload':
+            image_id = self._new_id()
+            return 200, {'message': 'success', 'data': {
+                'url': f"{self.base_url}/img/{image_id}.jpg",
+                'web_uri': f"tos-cn-i-0000/{image_id}",
+                'width': 800,
+                'height': 600
+            }}
+        if key == 'publish_article':
+            article_id = self._new_id()
+            now = datetime.now()
+            article = {
+                'id': article_id, 'title': form.get('title', ''), 'status': 'review',
+                'category': form.get('category') or '', 'tags': [], 'read_count': 0,
+                'comment_count': 0, 'like_count': 0, 'share_count': 0, 'collect_count': 0,
+                'play_duration': 0, 'completion_rate': 0.0,
+                'publish_time': now.strftime('%Y-%m-%d %H:%M:%S'), 'create_time': int(now.timestamp()),
+                'article_url': f"https://www.toutiao.com/article/{article_id}/"
+            }
+            with self._lock:
+                self.articles.insert(0, article)
+            return 200, {'message': 'success', 'data': {
+                'id': article_id,
+                'article_url': article['article_url']
+            }}
+        if key == 'publish_micro':
+            return 200, {'message': 'success', 'data': {'thread_id': self._new_id()}}
+        if key in ('article_page', 'micro_page'):
+            if not self.logged_in:
+                return 200, LOGIN_HTML
+            return 200, self.editor_page('article' if key == 'article_page' else 'micro')
+        if key == 'homepage':
+            return 200, HOMEPAGE_HTML if self.logged_in else LOGIN_HTML
+        if key == 'user_info':
+            if not self.logged_in:
+                return 200, {'message': 'error', 'reason': '用户未登录', 'data': {'is_login': False}}
+            return 200, {'message': 'success', 'data': {
+                'is_login': True,
+                'user_id': '1234567890',
+                'media_id': '1700000000000001',
+                'screen_name': '测试头条号',
+                'avatar_url': f"{self.base_url}/img/avatar.jpg",
+                'followers_count': 12800,
+                'following_count': 56
+            }}
+        if key == 'article_list':
+            return 200, self._article_list(form)
+        if key == 'delete_article':
+            article = self._find_article(form.get('id'))
+            if article is None:
+                return 200, {'message': '文章不存在'}
+            with self._lock:
+                self.articles.remove(article)
+            return 200, {'message': 'success', 'data': {}}
+        if key in ANALYTICS_PATHS:
+            return 200, self._analytics(key, form)
+        return 404, {'message': 'not found'}
+
+    def _article_list(self, form: Dict[str, Any]) -> Dict[str, Any]:
+        """按状态过滤并分页返回文章列表"""
+        page = max(int(form.get('page') or 1), 1)
+        page_size = max(int(form.get('page_size') or 20), 1)
+        status = form.get('status') or 'all'
+        articles = [a for a in self.articles if status == 'all' or a['status'] == status]
+        items = articles[(page - 1) * page_size:page * page_size]
+        return {'message': 'success', 'data': {
+            'list': items,
+            'total': len(articles),
+            'page': page,
+            'page_size': page_size,
+            'has_more': page * page_size < len(articles)
+        }}
+
+    def _analytics(self, key: str, form: Dict[str, Any]) -> Dict[str, Any]:
+        """根据预置文章生成数据分析接口的响应"""
+        articles = self.articles
+        total_read = sum(a['read_count'] for a in articles)
+        if key == 'analytics_overview':
+            return {'message': 'success', 'data': {
+                'followers_count': 12800,
+                'total_articles': len(articles),
+                'total_read_count': total_read,
+                'total_comment_count': sum(a['comment_count'] for a in articles),
+                'total_share_count': sum(a['share_count'] for a in articles),
+                'total_like_count': sum(a['like_count'] for a in articles),
+                'month_read_count': total_read // 6,
+                'week_read_count': total_read // 26,
+                'yesterday_read_count': total_read // 180
+            }}
+        if key == 'article_stats':
+            article = self._find_article(form.get('article_id'))
+            if article is None:
+                return {'message': '文章不存在'}
+            return {'message': 'success', 'data': {
+                **{field: article[field] for field in (
+                    'read_count', 'comment_count', 'share_count', 'like_count',
+                    'collect_count', 'play_duration', 'completion_rate', 'publish_time')},
+                'last_update_time': datetime(2024, 7, 1, 8, 0).strftime('%Y-%m-%d %H:%M:%S'),
+                'status': article['status']
+            }}
+        if key == 'trending_analysis':
+            days = max(int(form.get('days') or 7), 1)
+            end = datetime(2024, 7, 1)
+            trend_list = []
+            for offset in range(days, 0, -1):
+                read_count = total_read // 180 + offset * 37 % 500
+                trend_list.append({
+                    'date': (end - timedelta(days=offset)).strftime('%Y-%m-%d'),
+                    'read_count': read_count,
+                    'comment_count': read_count // 150,
+                    'share_count': read_count // 400,
+                    'like_count': read_count // 40,
+                    'followers_increase': read_count // 1000
+                })
+            peak = max(trend_list, key=lambda item: item['read_count'])
+            first, last = trend_list[0]['read_count'], trend_list[-1]['read_count']
+            return {'message': 'success', 'data': {
+                'trend_list': trend_list,
+                'total_read_increase': sum(item['read_count'] for item in trend_list),
+                'total_followers_increase': sum(item['followers_increase'] for item in trend_list),
+                'avg_daily_read': sum(item['read_count'] for item in trend_list) // days,
+                'peak_day': peak['date'],
+                'growth_rate': round((last - first) / first, 4) if first else 0.0
+            }}
+        if key == 'content_performance':
+            limit = max(int(form.get('limit') or 10), 1)
+            sort_by = form.get('sort_by') or 'read_count'
+            ranked = sorted(articles, key=lambda a: a.get(sort_by, 0), reverse=True)[:limit]
+            return {'message': 'success', 'data': {'articles': ranked}}
+        return {'message': 'success', 'data': {
+            'gender_distribution': {'male': 0.62, 'female': 0.38},
+            'age_distribution': {'18-23': 0.12, '24-30': 0.31, '31-40': 0.33, '41-50': 0.17, '50+': 0.07},
+            'region_distribution': {'广东': 0.14, '北京': 0.09, '浙江': 0.08, '江苏': 0.08, '其他': 0.61},
+            'device_distribution': {'android': 0.58, 'ios': 0.39, 'pc': 0.03},
+            'interest_tags': ['科技', '数码', '财经', '汽车'],
+            'active_time': {str(hour): round(0.02 + (hour in (8, 12, 21)) * 0.06, 2) for hour in range(24)},
+            'follower_growth': [{'date': f"2024-06-{day:02d}", 'count': 12000 + day * 26} for day in range(1, 31)]
+        }}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # 支持长连接，便于测量会话连接复用的效果
+            protocol_version = 'HTTP/1.1'
+            # 响应头和响应体分两次写出，关闭 Nagle 避免长连接上的延迟确认等待
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _form(self) -> Dict[str, Any]:
+                content_type = self.headers.get('Content-Type', '')
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                if content_type.startswith('multipart/form-data'):
+                    message = BytesParser(policy=policy.default).parsebytes(
+                        f"Content-Type: {content_type}\r\n\r\n".encode('utf-8') + body
+                    )
+                    form = {}
+                    for part in message.iter_parts():
+                        name = part.get_param('name', header='content-disposition')
+                        filename = part.get_filename()
+                        form[name] = filename if filename else part.get_content().strip()
+                    return form
+                return {key: values[-1] for key, values in parse_qs(body.decode('utf-8')).items()}
+
+            def _handle(self, method: str) -> None:
+                parts = urlsplit(self.path)
+                path = parts.path
+                if method == 'POST':
+                    form = self._form()
+                else:
+                    form = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+                server.requests.append({'method': method, 'path': path, 'form': form,
+                                        'cookies': self.headers.get('Cookie', '')})
+                key = next((k for k, p in server._paths.items() if p == path), None)
+                delay = server._delay()
+                if delay > 0:
+                    time.sleep(delay)
+                static = server.static(path) if key is None else None
+                if static:
+                    status, payload, content_type = static
+                    self._send(status, payload, content_type)
+                    return
+                if key in server.overrides:
+                    status, body = server.overrides[key]
+                elif server._should_fail():
+                    status, body = 500, {'message': '服务繁忙，请稍后再试'}
+                else:
+                    status, body = server.respond(key, form)
+                is_json = isinstance(body, dict)
+                payload = json.dumps(body, ensure_ascii=False).encode('utf-8') if is_json else str(body).encode('utf-8')
+                self._send(status, payload, 'application/json' if is_json else 'text/html; charset=utf-8')
+
+            def _send(self, status: int, payload: bytes, content_type: str) -> None:
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+        return Handler
@@ -0,0 +1,210 @@
+/*
+ * 头条号发布编辑器模拟页面的交互脚本
+ *
+ * 模拟图文发布页（data-page="article"）和微头条发布页（data-page="micro"）中发布流程依赖的行为：
+ * 编辑器延迟挂载、粘贴插入 HTML、封面上传弹窗、图片上传进度、预览发布弹窗、确认弹窗和发布成功提示。
+ * 各环节的延迟（秒）和开关由服务器注入的 window.FIXTURE_CONFIG 提供。
+ */
+(function () {
+    var config = window.FIXTURE_CONFIG || {};
+    var delays = config.delays || {};
+    var options = config.options || {};
+
+    function later(seconds, fn) { setTimeout(fn, Math.round((seconds || 0) * 1000)); }
+    function $(selector, root) { return (root || document).querySelector(selector); }
+    function show(el) { el.style.display = ''; }
+    function hide(el) { el.style.display = 'none'; }
+    function setEnabled(button, enabled) {
+        button.disabled = !enabled;
+        button.classList.toggle('byte-btn-disabled', !enabled);
+    }
+
+    function toast(text) {
+        var message = $('.byte-message');
+        message.textContent = text;
+        show(message);
+        later(2, function () { hide(message); });
+    }
+
+    function post(url, data) {
+        return fetch(url, {
+            method: 'POST',
+            credentials: 'same-origin',
+            headers: { 'Content-Type': 'application/x-www-form-urlencoded' },
+            body: new URLSearchParams(data).toString()
+        }).then(function (response) { return response.json(); });
+    }
+
+    function isEmpty(editor) {
+        return !(editor.innerText || '').trim() && !editor.querySelector('img');
+    }
+
+    // ProseMirror 风格的编辑器：处理粘贴的 HTML，维护占位符，内容变化时通知页面
+    function setupEditor(editor, onChange) {
+        var placeholder = $('.syl-placeholder');
+        var changed = function () {
+            if (placeholder) { placeholder.style.display = isEmpty(editor) ? '' : 'none'; }
+            if (onChange) { onChange(); }
+        };
+        editor.addEventListener('paste', function (event) {
+            var markup = event.clipboardData && event.clipboardData.getData('text/html');
+            if (!markup) { return; }
+            event.preventDefault();
+            if (isEmpty(editor)) { editor.innerHTML = ''; }
+            editor.appendChild(document.createRange().createContextualFragment(markup));
+            editor.dispatchEvent(new Event('input', { bubbles: true }));
+        });
+        editor.addEventListener('input', changed);
+    }
+
+    // 单页应用挂载完成前编辑区域不可见
+    function mount(onMounted) {
+        var app = $('.editor-app');
+        later(delays.editor, function () {
+            show(app);
+            if (onMounted) { onMounted(); }
+        });
+    }
+
+    // 选择文件后显示上传进度，延迟后渲染缩略图；图片无法解码时标记为上传失败
+    function addUploads(list, files, onRendered) {
+        Array.prototype.forEach.call(files, function (file, index) {
+            var item = document.createElement('div');
+            item.className = 'byte-upload-list-item';
+            item.innerHTML = '<span class="byte-upload-progress">上传中</span><span class="upload-remove">×</span>';
+            item.querySelector('.upload-remove').addEventListener('click', function () { item.remove(); });
+            list.appendChild(item);
+            later((delays.upload || 0) * (index + 1), function () {
+                var img = document.createElement('img');
+                img.onload = function () { if (onRendered) { onRendered(img); } };
+                img.onerror = function () { item.classList.add('byte-upload-list-item-error'); };
+                img.src = URL.createObjectURL(file);
+                item.querySelector('.byte-upload-progress').replaceWith(img);
+            });
+        });
+    }
+
+    function setupArticle() {
+        var title = $('textarea.title-input');
+        var editor = $('.ProseMirror');
+        setupEditor(editor);
+        mount(function () {
+            if (options.guide_mask) { show($('.byte-drawer-mask')); }
+        });
+        $('.byte-drawer-mask').addEventListener('click', function () { hide(this); });
+
+        // 封面弹窗：可从正文图片中选择，或上传本地图片
+        var coverModal = $('.cover-modal');
+        var coverConfirm = $("button[data-e2e='imageUploadConfirm-btn']");
+        var candidates = $('.cover-candidates', coverModal);
+        var uploads = $('.byte-upload-list', coverModal);
+        var selected = null;
+        var select = function (img) {
+            coverModal.querySelectorAll('img.selected').forEach(function (el) { el.classList.remove('selected'); });
+            img.classList.add('selected');
+            selected = img;
+            setEnabled(coverConfirm, true);
+        };
+        var closeCover = function () {
+            hide(coverModal);
+            hide($('.cover-mask'));
+        };
+        $('.article-cover-add').addEventListener('click', function () {
+            candidates.innerHTML = '';
+            uploads.innerHTML = '';
+            selected = null;
+            setEnabled(coverConfirm, false);
+            editor.querySelectorAll('img').forEach(function (source) {
+                var img = document.createElement('img');
+                img.src = source.src;
+                img.addEventListener('click', function () { select(img); });
+                candidates.appendChild(img);
+            });
+            show($('.cover-mask'));
+            later(delays.dialog, function () { show(coverModal); });
+        });
+        $('.byte-modal-close-icon', coverModal).addEventListener('click', closeCover);
+        $('.btn-upload-handle input[type=file]', coverModal).addEventListener('change', function () {
+            addUploads(uploads, this.files, select);
+        });
+        coverConfirm.addEventListener('click', function () {
+            if (coverConfirm.disabled || !selected) { return; }
+            var cover = $('.article-cover');
+            var img = $('img', cover) || cover.appendChild(document.createElement('img'));
+            img.src = selected.src;
+            hide($('.article-cover-add'));
+            closeCover();
+        });
+
+        // 预览并发布 -> 发布弹窗 -> 确认发布 -> 提交并提示发布成功，随后跳转到作品管理页
+        var publishModal = $('.publish-modal');
+        $('.preview-publish').addEventListener('click', function () {
+            show($('.publish-mask'));
+            later(delays.dialog, function () { show(publishModal); });
+        });
+        $('.publish-btn-last', publishModal).addEventListener('click', function () {
+            var button = this;
+            setEnabled(button, false);
+            later(delays.publish, function () {
+                post(config.publish_url, { title: title.value, content: editor.innerHTML, source: 'fixture' })
+                    .then(function (body) {
+                        hide(publishModal);
+                        hide($('.publish-mask'));
+                        if (body.message !== 'success') {
+                            setEnabled(button, true);
+                            toast(body.reason || body.message || '发布失败');
+                            return;
+                        }
+                        toast('发布成功');
+                        later(0.3, function () { window.location.href = config.after_publish_url; });
+                    });
+            });
+        });
+    }
+
+    function setupMicro() {
+        var editor = $('.ProseMirror');
+        var publishButton = $('.publish-content');
+        var uploads = $('.byte-upload-list');
+        var sync = function () { setEnabled(publishButton, !isEmpty(editor)); };
+        setupEditor(editor, sync);
+        mount(sync);
+
+        $("button[title='图片']").addEventListener('click', function () { show($('.upload-panel')); });
+        $("input[type='file']").addEventListener('change', function () { addUploads(uploads, this.files); });
+
+        var submit = function () {
+            later(delays.publish, function () {
+                post(config.publish_url, {
+                    content: editor.innerText.trim(),
+                    image_count: uploads.querySelectorAll('img').length,
+                    source: 'fixture'
+                }).then(function (body) {
+                    if (body.message !== 'success') {
+                        toast(body.reason || body.message || '发布失败');
+                        return;
+                    }
+                    editor.innerHTML = '<p><br></p>';
+                    uploads.innerHTML = '';
+                    hide($('.upload-panel'));
+                    sync();
+                    toast('发布成功');
+                });
+            });
+        };
+        var confirmModal = $('.confirm-modal');
+        publishButton.addEventListener('click', function () {
+            if (publishButton.disabled) { return; }
+            if (!options.micro_confirm) { submit(); return; }
+            later(delays.dialog, function () { show(confirmModal); });
+        });
+        $('button.confirm-ok', confirmModal).addEventListener('click', function () {
+            hide(confirmModal);
+            submit();
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        if (document.body.getAttribute('data-page') === 'article') { setupArticle(); } else { setupMicro(); }
+    });
+})();
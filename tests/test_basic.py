@@ -3,9 +3,13 @@
 今日头条MCP服务器基本功能测试
 """
 
+import json
+import os
 import unittest
 import sys
 import tempfile
+import threading
+import time
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -13,9 +17,22 @@ from unittest.mock import Mock, patch
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from toutiao_mcp_server.auth import TouTiaoAuth
+from toutiao_mcp_server.cookie_store import CookieStore
+from toutiao_mcp_server.accounts import AccountRegistry, parse_accounts
 from toutiao_mcp_server.publisher import TouTiaoPublisher
 from toutiao_mcp_server.analytics import TouTiaoAnalytics
 from toutiao_mcp_server.config import TOUTIAO_URLS, DEFAULT_HEADERS
+from toutiao_mcp_server.driver_pool import DriverPool
+from toutiao_mcp_server.chromedriver import ChromeDriverResolver
+from toutiao_mcp_server.waits import LOGIN_REQUIRED, PUBLISH_SUCCEEDED, PageWaiter
+from toutiao_mcp_server.profiles import ChromeProfileManager, profile_key
+from toutiao_mcp_server.tabs import TabScheduler
+from toutiao_mcp_server.timing import StepTimer, TimingAggregator
+from toutiao_mcp_server.debug_artifacts import DebugArtifactStore
+from toutiao_mcp_server.content import render_blocks, chunk_blocks, text_length, insert_blocks
+from toutiao_mcp_server.async_cdp import AsyncBrowser, AsyncPage, CDPConnection, CDPError
+from selenium.common.exceptions import TimeoutException
+from tests.fake_server import FakeToutiaoServer
 
 class TestTouTiaoAuth(unittest.TestCase):
     """测试认证模块"""
@@ -42,6 +59,135 @@ class TestTouTiaoAuth(unittest.TestCase):
             result = self.auth.check_login_status()
             self.assertFalse(result)
     
+    def _user_info_response(self):
+        response = Mock()
+        response.status_code = 200
+        response.json.return_value = {'message': 'success', 'data': {
+            'is_login': True, 'user_id': 123, 'screen_name': '测试号', 'followers_count': 10
+        }}
+        return response
+    
+    def test_login_status_cached(self):
+        """测试登录状态在 TTL 内复用，登出和强制检查时重新请求"""
+        with patch.object(self.auth.session, 'get', return_value=self._user_info_response()) as mock_get:
+            self.assertTrue(self.auth.check_login_status())
+            self.assertTrue(self.auth.check_login_status())
+            self.assertEqual(mock_get.call_count, 1)
+            
+            self.assertTrue(self.auth.check_login_status(force=True))
+            self.assertEqual(mock_get.call_count, 2)
+            
+            self.auth.logout()
+            self.auth.check_login_status()
+            self.assertEqual(mock_get.call_count, 3)
+    
+    def test_login_cache_expires_with_cookie(self):
+        """测试最早的 Cookie 到期后重新检查登录状态"""
+        self.auth.session.cookies.set('sessionid', 'abc', domain='.toutiao.com', expires=int(time.time()) + 60)
+        with patch.object(self.auth.session, 'get', return_value=self._user_info_response()) as mock_get:
+            self.auth.check_login_status()
+            with patch('toutiao_mcp_server.auth.time.time', return_value=time.time() + 120):
+                self.auth.check_login_status()
+            
+            self.assertEqual(mock_get.call_count, 2)
+    
+    def test_login_status_error_not_cached(self):
+        """测试网络异常时不缓存登录状态"""
+        error = Exception("timeout")
+        with patch.object(self.auth.session, 'get', side_effect=[error, error, self._user_info_response()]):
+            self.assertFalse(self.auth.check_login_status())
+            self.assertTrue(self.auth.check_login_status())
+    
+    def test_user_info_from_login_probe(self):
+        """测试登录检查同时取得用户信息，get_user_info 不再重复请求"""
+        with patch.object(self.auth.session, 'get', return_value=self._user_info_response()) as mock_get:
+            self.assertTrue(self.auth.check_login_status())
+            user_info = self.auth.get_user_info()
+            
+            self.assertEqual(mock_get.call_count, 1)
+            self.assertEqual(mock_get.call_args[0][0], TOUTIAO_URLS['user_info'])
+        self.assertEqual(user_info['user_id'], '123')
+        self.assertEqual(user_info['nickname'], '测试号')
+        self.assertEqual(user_info['followers_count'], 10)
+    
+    def _write_cookies(self, expiry):
+        self.cookies_file.write_text(json.dumps({'cookies': [
+            {'name': 'sessionid', 'value': 'abc', 'domain': '.toutiao.com', 'path': '/',
+             'expiry': expiry, 'secure': True, 'httpOnly': True, 'sameSite': 'Lax'},
+            {'name': 'tt_webid', 'value': '1', 'domain': '.toutiao.com', 'path': '/'}
+        ], 'timestamp': time.time()}))
+    
+    def test_load_cookies_keeps_expiry(self):
+        """测试加载 Cookie 时保留过期时间和标记并建立关键 Cookie 索引"""
+        expiry = int(time.time()) + 3600
+        self._write_cookies(expiry)
+        with patch.dict('toutiao_mcp_server.config.AUTH_CONFIG', {'auto_refresh': False}):
+            auth = TouTiaoAuth(str(self.cookies_file))
+        
+        cookie = next(c for c in auth.session.cookies if c.name == 'sessionid')
+        self.assertEqual(cookie.expires, expiry)
+        self.assertTrue(cookie.secure)
+        self.assertTrue(cookie.has_nonstandard_attr('HttpOnly'))
+        self.assertEqual(auth.critical_cookies, {'sessionid': expiry})
+        self.assertEqual(auth.session_expiry(), expiry)
+        self.assertFalse(auth.is_session_expired())
+    
+    def test_expired_session_no_network(self):
+        """测试关键 Cookie 已过期时不发请求直接判定未登录"""
+        self._write_cookies(int(time.time()) - 10)
+        with patch.dict('toutiao_mcp_server.config.AUTH_CONFIG', {'auto_refresh': False}):
+            auth = TouTiaoAuth(str(self.cookies_file))
+        
+        with patch.object(auth.session, 'get') as mock_get:
+            self.assertTrue(auth.is_session_expired())
+            self.assertFalse(auth.check_login_status(force=True))
+            mock_get.assert_not_called()
+    
+    def test_refresh_session(self):
+        """测试在到期前安排续期，续期取得新 Cookie 后写回文件"""
+        expiry = int(time.time()) + 3 * 86400
+        self._write_cookies(expiry)
+        with patch.dict('toutiao_mcp_server.config.AUTH_CONFIG', {'auto_refresh': False}):
+            auth = TouTiaoAuth(str(self.cookies_file))
+        
+        delay = auth.schedule_refresh(margin=86400)
+        self.assertAlmostEqual(delay, 2 * 86400, delta=5)
+        auth.cancel_refresh()
+        
+        extended = expiry + 30 * 86400
+        def probe(*args, **kwargs):
+            auth.session.cookies.set('sessionid', 'new', domain='.toutiao.com', expires=extended)
+            auth._index_critical_cookies()
+            return self._user_info_response()
+        with patch.object(auth.session, 'get', side_effect=probe):
+            self.assertTrue(auth.refresh_session())
+        auth.cancel_refresh()
+        
+        saved = json.loads(self.cookies_file.read_text())['cookies']
+        self.assertIn({'name': 'sessionid', 'value': 'new', 'expiry': extended},
+                      [{k: c.get(k) for k in ('name', 'value', 'expiry')} for c in saved])
+    
+    def test_auto_refresh_starts_explicitly(self):
+        """测试创建认证对象不启动续期定时器，由 start_auto_refresh 开启"""
+        self._write_cookies(int(time.time()) + 3 * 86400)
+        with patch.dict('toutiao_mcp_server.config.AUTH_CONFIG', {'auto_refresh': True}):
+            auth = TouTiaoAuth(str(self.cookies_file))
+            self.assertIsNone(auth._refresh_timer)
+            
+            self.assertIsNotNone(auth.start_auto_refresh())
+            self.assertIsNotNone(auth._refresh_timer)
+        auth.cancel_refresh()
+    
+    def test_cookies_version_changes_within_second(self):
+        """测试同一秒内两次保存 Cookie 得到不同的版本"""
+        auth = TouTiaoAuth(str(self.cookies_file))
+        auth._save_cookies([{'name': 'sessionid', 'value': 'a', 'domain': '.toutiao.com'}])
+        first = auth.cookies_version
+        auth._save_cookies([{'name': 'sessionid', 'value': 'b', 'domain': '.toutiao.com'}])
+        
+        self.assertGreater(auth.cookies_version, first)
+        self.assertEqual(TouTiaoAuth(str(self.cookies_file)).cookies_version, auth.cookies_version)
+    
     def test_logout(self):
         """测试登出功能"""
         result = self.auth.logout()
@@ -70,6 +216,313 @@ class TestTouTiaoPublisher(unittest.TestCase):
         result = self.publisher._upload_image("nonexistent.jpg")
         self.assertIsNone(result)
     
+    def test_micro_editor_selector_remembered(self):
+        """测试上次命中的编辑器选择器优先尝试"""
+        default = self.publisher._micro_editor_selectors()
+        self.publisher._micro_editor_selector = "textarea"
+        
+        selectors = self.publisher._micro_editor_selectors()
+        
+        self.assertEqual(selectors[0], "textarea")
+        self.assertEqual(sorted(selectors), sorted(default))
+    
+    def test_transfer_cookies_via_cdp(self):
+        """测试通过一次CDP调用写入全部Cookie且不打开页面"""
+        import requests
+        jar = requests.cookies.RequestsCookieJar()
+        jar.set('sessionid', 'abc', domain='.toutiao.com', path='/', secure=True,
+                expires=2000000000, rest={'HttpOnly': None})
+        jar.set('other', 'x', domain='.example.com')
+        self.publisher.session = Mock()
+        self.publisher.session.cookies = jar
+        driver = Mock()
+        
+        self.publisher._transfer_cookies_to_driver(driver)
+        
+        driver.get.assert_not_called()
+        driver.add_cookie.assert_not_called()
+        command, params = driver.execute_cdp_cmd.call_args[0]
+        self.assertEqual(command, 'Network.setCookies')
+        self.assertEqual(len(params['cookies']), 1)
+        cookie = params['cookies'][0]
+        self.assertEqual(cookie['name'], 'sessionid')
+        self.assertEqual(cookie['expires'], 2000000000)
+        self.assertTrue(cookie['secure'])
+        self.assertTrue(cookie['httpOnly'])
+    
+    def test_transfer_cookies_fallback(self):
+        """测试CDP不可用时回退到逐个添加Cookie"""
+        import requests
+        jar = requests.cookies.RequestsCookieJar()
+        jar.set('sessionid', 'abc', domain='.toutiao.com')
+        self.publisher.session = Mock()
+        self.publisher.session.cookies = jar
+        driver = Mock()
+        driver.execute_cdp_cmd.side_effect = Exception("not supported")
+        
+        with patch('toutiao_mcp_server.publisher.time.sleep'):
+            self.publisher._transfer_cookies_to_driver(driver)
+        
+        driver.get.assert_called_once_with("https://mp.toutiao.com")
+        driver.add_cookie.assert_called_once()
+    
+    def test_insert_text_via_cdp(self):
+        """测试整段文本通过一次 Input.insertText 写入，不逐字符输入"""
+        from toutiao_mcp_server import cdp
+        driver = Mock()
+        element = Mock()
+        text = "今日头条" * 500
+        
+        method = cdp.insert_text(driver, element, text)
+        
+        self.assertEqual(method, 'cdp')
+        driver.execute_cdp_cmd.assert_called_once_with('Input.insertText', {'text': text})
+        element.send_keys.assert_not_called()
+        self.assertEqual(driver.execute_script.call_args_list[-1][0][1:], (element,))
+        for call in driver.execute_script.call_args_list:
+            self.assertNotIn('Composition', call[0][0])
+    
+    def test_insert_text_script_fallback(self):
+        """测试CDP不可用时改用脚本写入"""
+        from toutiao_mcp_server import cdp
+        driver = Mock(spec=['execute_script'])
+        element = Mock()
+        
+        method = cdp.insert_text(driver, element, "内容")
+        
+        self.assertEqual(method, 'script')
+        self.assertEqual(driver.execute_script.call_count, 3)
+        self.assertIn('getOwnPropertyDescriptor', driver.execute_script.call_args_list[1][0][0])
+    
+    def test_lean_profile_blocks_requests(self):
+        """测试精简发布配置：无头、eager加载并屏蔽非必要请求"""
+        self.publisher.session = Mock()
+        self.publisher.session.headers = {'User-Agent': 'test-agent'}
+        driver = Mock()
+        
+        with patch.dict('toutiao_mcp_server.publisher.SELENIUM_CONFIG', {'publish_profile': 'lean'}), \
+                patch('toutiao_mcp_server.publisher.create_chrome_driver', return_value=driver) as create:
+            self.publisher._setup_driver()
+        
+        options = create.call_args[0][0]
+        self.assertEqual(options.page_load_strategy, 'eager')
+        self.assertIn('--headless', options.arguments)
+        commands = [c[0][0] for c in driver.execute_cdp_cmd.call_args_list]
+        self.assertEqual(commands, ['Network.enable', 'Network.setBlockedURLs'])
+        blocked = driver.execute_cdp_cmd.call_args_list[1][0][1]['urls']
+        self.assertIn('*.woff2', blocked)
+    
+    def test_upload_micro_images_batch(self):
+        """测试微头条配图一次提交全部路径并报告每张图片耗时"""
+        temp_dir = Path(tempfile.mkdtemp())
+        paths = []
+        for name in ('a.jpg', 'b.jpg'):
+            (temp_dir / name).write_bytes(b'x')
+            paths.append(str(temp_dir / name))
+        file_input = Mock()
+        waiter = Mock()
+        waiter.upload_snapshot.return_value = {'rendered': 0, 'uploading': 0, 'failed': 0}
+        waiter.until_js.return_value = file_input
+        waiter.uploads_finished.return_value = {'completed': [1.5], 'failed': 1}
+        driver = Mock()
+        
+        report = self.publisher._upload_micro_images(driver, waiter, paths + ['missing.jpg'])
+        
+        file_input.send_keys.assert_called_once_with("\n".join(str(Path(p).resolve()) for p in paths))
+        waiter.uploads_finished.assert_called_once()
+        self.assertEqual(report['mode'], 'batch')
+        self.assertEqual(report['uploaded'], 1)
+        self.assertEqual(report['failed_count'], 2)
+        # 一次提交时无法确定哪张图片上传失败，只列出不存在的文件
+        self.assertEqual(report['failed'], ['missing.jpg'])
+        self.assertEqual(report['completed_seconds'], [1.5])
+    
+    def test_upload_micro_images_sequential(self):
+        """测试逐张上传时失败归属到对应文件，之后的文件标记为未提交"""
+        temp_dir = Path(tempfile.mkdtemp())
+        paths = []
+        for name in ('a.jpg', 'b.jpg', 'c.jpg'):
+            (temp_dir / name).write_bytes(b'x')
+            paths.append(str((temp_dir / name).resolve()))
+        file_input = Mock()
+        file_input.send_keys.side_effect = [Exception('不支持多文件'), None, None]
+        waiter = Mock()
+        waiter.upload_snapshot.return_value = {'rendered': 0, 'uploading': 0, 'failed': 0}
+        waiter.until_js.return_value = file_input
+        waiter.uploads_finished.side_effect = [
+            {'completed': [1.0], 'failed': 0},
+            {'completed': [1.0], 'failed': 1},
+        ]
+        
+        report = self.publisher._upload_micro_images(Mock(), waiter, paths)
+        
+        self.assertEqual(report['mode'], 'sequential')
+        self.assertEqual(report['uploaded'], 1)
+        self.assertEqual(report['failed_count'], 2)
+        self.assertEqual(report['failed'], paths[1:])
+        self.assertEqual([item['error'] for item in report['details'][1:]], ['上传失败或超时', '未提交'])
+    
+    def test_publish_concurrently(self):
+        """测试多标签页并发发布汇总各任务结果"""
+        pooled = Mock()
+        pooled.driver = FakeTabDriver()
+        self.publisher._acquire_driver = Mock(return_value=pooled)
+        self.publisher.driver_pool = Mock()
+        self.publisher._publish_article_flow = Mock(return_value={'success': True})
+        self.publisher._publish_micro_post_flow = Mock(side_effect=Exception("tab crashed"))
+        
+        result = self.publisher.publish_concurrently([
+            {'type': 'article', 'title': '标题', 'content': '正文'},
+            {'type': 'micro_post', 'content': '微头条'},
+        ], max_tabs=2)
+        
+        self.assertFalse(result['success'])
+        self.assertEqual(result['succeeded'], 1)
+        self.assertEqual(result['results'][0]['type'], 'article')
+        self.assertIn('tab crashed', result['results'][1]['message'])
+        self.assertIn('timings', result['results'][0])
+        self.assertIn('total', result['timings'])
+        self.publisher.driver_pool.release.assert_called_once_with(pooled)
+    
+    def test_hot_editor_reuses_publish_pages(self):
+        """测试复用已打开的发布页面：每种类型一个标签页，页面内重置代替重新打开"""
+        driver = FakeTabDriver()
+        driver.current_url = "about:blank"
+        driver.execute_script = Mock(return_value=True)
+        pooled = Mock()
+        pooled.driver = driver
+        pooled.state = {}
+        waiter = Mock()
+        micro_url, article_url = TOUTIAO_URLS['micro_page'], TOUTIAO_URLS['article_page']
+        
+        with patch.dict('toutiao_mcp_server.publisher.SELENIUM_CONFIG', {'publish_profile': 'standard'}):
+            first = self.publisher._open_publish_page(pooled, waiter, 'micro_post', micro_url, hot_editor=True)
+            driver.current_url = micro_url
+            second = self.publisher._open_publish_page(pooled, waiter, 'micro_post', micro_url, hot_editor=True)
+            article = self.publisher._open_publish_page(pooled, waiter, 'article', article_url, hot_editor=True)
+            driver.current_url = micro_url
+            third = self.publisher._open_publish_page(pooled, waiter, 'micro_post', micro_url, hot_editor=True)
+        
+        self.assertEqual((first, second, article, third), (False, True, False, True))
+        self.assertEqual(pooled.state['hot_tabs'], {'micro_post': 'main', 'article': 'tab-1'})
+        self.assertEqual(driver.current_window_handle, 'main')
+        self.assertEqual([c[0][0] for c in waiter.navigate.call_args_list], [micro_url, article_url])
+    
+    def test_batch_failure_closes_hot_tab(self):
+        """测试批量发布中任务失败后关闭其发布标签页并切回剩余标签页"""
+        driver = FakeTabDriver()
+        driver.switch_to.new_window('tab')
+        pooled = Mock()
+        pooled.driver = driver
+        pooled.state = {'hot_tabs': {'micro_post': 'main', 'article': 'tab-1'}}
+        self.publisher._acquire_driver = Mock(return_value=pooled)
+        self.publisher.driver_pool = Mock()
+        self.publisher._run_job = Mock(return_value={'success': False, 'message': '失败'})
+        
+        self.publisher.publish_batch([{'type': 'article', 'title': '标题', 'content': '正文'}], hot_editor=True)
+        
+        self.assertEqual(driver.closed, ['tab-1'])
+        self.assertEqual(driver.current_window_handle, 'main')
+    
+    def test_publish_batch_groups_records_by_type(self):
+        """测试批量发布时同类记录排在一起，结果按原顺序返回"""
+        import asyncio
+        from toutiao_mcp_server.multi_platform_publisher import MultiPlatformPublisher
+        from unittest.mock import AsyncMock
+        publisher = Mock()
+        publisher.publish_batch_async = AsyncMock(side_effect=lambda jobs, interval: {
+            'results': [{'success': True, 'message': job['type']} for job in jobs]
+        })
+        multi = MultiPlatformPublisher(self.auth_mock, publisher=publisher)
+        self.auth_mock.check_login_status.return_value = True
+        records = [
+            {'title': '一', 'content': '短内容'},
+            {'title': '二', 'content': '长' * 3000},
+            {'title': '三', 'content': '短内容'},
+            {'title': '四', 'content': ''},
+        ]
+        
+        results = asyncio.run(multi.process_xiaohongshu_records(records, tempfile.mkdtemp()))
+        
+        jobs = publisher.publish_batch_async.call_args[0][0]
+        self.assertEqual([job['type'] for job in jobs], ['micro_post', 'micro_post', 'article'])
+        self.assertEqual([r['index'] for r in results], [1, 2, 3, 4])
+        self.assertEqual([r['publish_result']['message'] for r in results],
+                         ['micro_post', 'article', 'micro_post', '内容不能为空'])
+    
+    def test_preupload_overlaps_driver_acquire(self):
+        """测试图片在借出浏览器的同时并发预上传，结果交给发布流程"""
+        import threading
+        uploading = threading.Event()
+        
+        def upload(path):
+            uploading.set()
+            return {'success': True, 'url': f'https://p3.toutiaoimg.com/{path}', 'web_uri': f'tos/{path}'}
+        
+        def acquire(timer=None):
+            self.assertTrue(uploading.wait(2), "借出浏览器时图片尚未开始上传")
+            return Mock()
+        
+        self.publisher._upload_image = Mock(side_effect=upload)
+        self.publisher._acquire_driver = Mock(side_effect=acquire)
+        self.publisher.driver_pool = Mock()
+        self.publisher._publish_article_flow = Mock(return_value={'success': True})
+        
+        with patch.dict('toutiao_mcp_server.publisher.PUBLISH_CONFIG', {'preupload_images': True}):
+            result = self.publisher.publish_article(title="标题", content="正文", images=['a.jpg', 'b.jpg'])
+        
+        self.assertTrue(result['success'])
+        preuploads = self.publisher._publish_article_flow.call_args[1]['preuploads']
+        uploaded = self.publisher._collect_preuploads(preuploads)
+        self.assertEqual(uploaded['b.jpg']['web_uri'], 'tos/b.jpg')
+        self.assertEqual(self.publisher._upload_image.call_count, 2)
+        self.publisher.close()
+    
+    def test_preupload_skips_cover_outside_images(self):
+        """测试不在正文图片中的封面不预上传"""
+        self.publisher._start_preupload = Mock(return_value={})
+        
+        with patch.dict('toutiao_mcp_server.publisher.PUBLISH_CONFIG', {'preupload_images': True}):
+            self.publisher._start_article_preupload(['a.jpg'], 'cover.jpg')
+        
+        self.publisher._start_preupload.assert_called_once_with(['a.jpg'])
+    
+    def test_select_cover_by_uri_closes_dialog_on_failure(self):
+        """测试从正文图片选择封面失败时先关闭弹窗再回退"""
+        driver = Mock()
+        waiter = Mock()
+        waiter.until_js.side_effect = TimeoutException("未找到图片")
+        waiter.mask_gone.return_value = True
+        
+        selected = self.publisher._select_article_cover_by_uri(driver, waiter, {'url': 'https://p3/x', 'web_uri': 'tos/x'})
+        
+        self.assertFalse(selected)
+        self.assertIn('byte-modal-close-icon', driver.execute_script.call_args_list[-1][0][0])
+        waiter.mask_gone.assert_called_once()
+    
+    def test_redirected_to_login_result(self):
+        """测试发布后跳转到登录页时返回失败并清除登录缓存"""
+        self.publisher.auth.invalidate_login_cache = Mock()
+        
+        result = self.publisher._redirected_to_login_result(title="标题")
+        
+        self.assertFalse(result['success'])
+        self.assertTrue(result['outcome_unknown'])
+        self.assertEqual(result['title'], "标题")
+        self.publisher.auth.invalidate_login_cache.assert_called_once()
+    
+    def test_format_uploaded_images(self):
+        """测试已上传图片按地址插入正文，跳过上传失败的图片"""
+        formatted = self.publisher._format_uploaded_images([
+            {'url': 'https://p3.toutiaoimg.com/a?x=1&y="2"', 'web_uri': 'tos/a'},
+            None,
+        ])
+        
+        self.assertEqual(
+            formatted,
+            '<p><img src="https://p3.toutiaoimg.com/a?x=1&amp;y=&quot;2&quot;" web_uri="tos/a"></p>'
+        )
+    
     def test_publish_article_basic(self):
         """测试基本的文章发布功能"""
         # 模拟成功响应
@@ -92,6 +545,262 @@ class TestTouTiaoPublisher(unittest.TestCase):
         self.assertTrue(result['success'])
         self.assertEqual(result['article_id'], '12345')
 
+class TestApiTransport(unittest.TestCase):
+    """测试通过发布接口直接发布（本地模拟服务器）"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        import requests
+        self.server = FakeToutiaoServer().start()
+        self.urls_patch = patch.dict('toutiao_mcp_server.publisher.TOUTIAO_URLS', self.server.urls())
+        self.urls_patch.start()
+        self.auth_mock = Mock(spec=TouTiaoAuth)
+        self.auth_mock.session = requests.Session()
+        self.auth_mock.session.cookies.set('sessionid', 'abc', domain='127.0.0.1')
+        self.publisher = TouTiaoPublisher(self.auth_mock, driver_pool=Mock())
+        self.publisher._publish_article_flow = Mock(return_value={'success': True, 'message': '浏览器发布'})
+        self.publisher._publish_micro_post_flow = Mock(return_value={'success': True, 'message': '浏览器发布'})
+        self.publisher._acquire_driver = Mock()
+        self.image = Path(tempfile.mkdtemp()) / "cover.jpg"
+        self.image.write_bytes(b'\xff\xd8fake-jpeg')
+    
+    def tearDown(self):
+        """清理测试环境"""
+        self.urls_patch.stop()
+        self.server.stop()
+    
+    def test_publish_article_via_api(self):
+        """测试文章通过发布接口发布，不启动浏览器"""
+        result = self.publisher.publish_article(
+            title="测试文章", content="第一段\n第二段", images=[str(self.image)], tags=["科技"], transport="api"
+        )
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['transport'], 'api')
+        self.assertTrue(result['article_id'])
+        self.publisher._acquire_driver.assert_not_called()
+        form = self.server.requests_to('publish_article')[0]['form']
+        self.assertEqual(form['title'], "测试文章")
+        self.assertEqual(form['content'], "<p>第一段</p><p>第二段</p>")
+        self.assertIn('tos-cn-i-0000', form['pgc_feed_covers'])
+        self.assertIn('sessionid=abc', self.server.requests_to('publish_article')[0]['cookies'])
+        self.assertEqual(self.server.requests_to('upload')[0]['form']['image'], "cover.jpg")
+    
+    def test_publish_micro_post_via_api(self):
+        """测试微头条通过发布接口发布"""
+        result = self.publisher.publish_micro_post(content="内容", topic="科技", transport="api")
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['transport'], 'api')
+        self.assertEqual(self.server.requests_to('publish_micro')[0]['form']['content'], "#科技# 内容")
+    
+    def test_business_failure_not_fallback(self):
+        """测试接口明确返回失败时直接返回，不回退浏览器"""
+        self.server.overrides['publish_article'] = (200, {'message': 'error', 'reason': '标题过长'})
+        
+        result = self.publisher.publish_article(title="标题", content="正文", transport="api")
+        
+        self.assertFalse(result['success'])
+        self.assertIn('标题过长', result['message'])
+        self.publisher._publish_article_flow.assert_not_called()
+    
+    def test_batch_honors_transport_and_preupload(self):
+        """测试批量发布按 transport 走发布接口，浏览器发布的文章预上传图片"""
+        jobs = [
+            {'type': 'micro_post', 'content': "接口发布", 'transport': 'api'},
+            {'type': 'article', 'title': "浏览器发布", 'content': "正文", 'images': [str(self.image)],
+             'transport': 'selenium'}
+        ]
+        with patch.dict('toutiao_mcp_server.config.PUBLISH_CONFIG', {'preupload_images': True}):
+            result = self.publisher.publish_batch(jobs)
+        
+        self.assertEqual([r['transport'] for r in result['results']], ['api', 'selenium'])
+        self.assertEqual(self.server.requests_to('publish_micro')[0]['form']['content'], "接口发布")
+        self.publisher._publish_micro_post_flow.assert_not_called()
+        preuploads = self.publisher._publish_article_flow.call_args[1]['preuploads']
+        self.assertIn(str(self.image), preuploads)
+    
+    def test_rejected_request_falls_back(self):
+        """测试请求确定未被受理（4xx）时回退到浏览器发布"""
+        self.server.overrides['publish_micro'] = (404, '<html>Not Found</html>')
+        
+        result = self.publisher.publish_micro_post(content="内容", transport="api")
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['transport'], 'selenium')
+        self.assertIn('404', result['fallback_reason'])
+        self.publisher._publish_micro_post_flow.assert_called_once()
+    
+    def test_server_error_outcome_unknown(self):
+        """测试 5xx 时发布结果未知，不回退浏览器重复发布"""
+        self.server.overrides['publish_micro'] = (502, '<html>Bad Gateway</html>')
+        
+        result = self.publisher.publish_micro_post(content="内容", transport="api")
+        
+        self.assertFalse(result['success'])
+        self.assertTrue(result['outcome_unknown'])
+        self.assertIn('502', result['message'])
+        self.publisher._publish_micro_post_flow.assert_not_called()
+    
+    def test_read_timeout_outcome_unknown(self):
+        """测试请求已发出后读取超时，不回退浏览器重复发布"""
+        self.server.latency = 0.5
+        with patch.dict('toutiao_mcp_server.config.PUBLISH_CONFIG', {'api_timeout': 0.2}):
+            result = self.publisher.publish_article(title="标题", content="正文", transport="api")
+        
+        self.assertFalse(result['success'])
+        self.assertTrue(result['outcome_unknown'])
+        self.assertIn('ReadTimeout', result['message'])
+        self.publisher._publish_article_flow.assert_not_called()
+    
+    def test_connection_error_falls_back(self):
+        """测试连接失败（请求未发出）时回退到浏览器发布"""
+        self.server.stop()
+        
+        result = self.publisher.publish_micro_post(content="内容", transport="api")
+        
+        self.assertEqual(result['transport'], 'selenium')
+        self.assertIn('连接失败', result['fallback_reason'])
+        self.publisher._publish_micro_post_flow.assert_called_once()
+
+class TestFakeServerEndpoints(unittest.TestCase):
+    """测试文章管理、登录状态和数据分析接口（本地模拟服务器）"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.server = FakeToutiaoServer(article_count=45).start()
+        self.urls_patch = patch.dict('toutiao_mcp_server.config.TOUTIAO_URLS', self.server.urls())
+        self.urls_patch.start()
+        self.auth = TouTiaoAuth(str(Path(tempfile.mkdtemp()) / "cookies.json"))
+        self.publisher = TouTiaoPublisher(self.auth, driver_pool=Mock())
+        self.analytics = TouTiaoAnalytics(self.auth)
+    
+    def tearDown(self):
+        """清理测试环境"""
+        self.urls_patch.stop()
+        self.server.stop()
+    
+    def test_article_list_pagination(self):
+        """测试文章列表分页"""
+        first = self.publisher.get_article_list(page=1, page_size=20)
+        last = self.publisher.get_article_list(page=3, page_size=20)
+        
+        self.assertTrue(first['success'])
+        self.assertEqual(first['total'], 45)
+        self.assertEqual(len(first['articles']), 20)
+        self.assertEqual(len(last['articles']), 5)
+        self.assertEqual(self.server.requests_to('article_list')[0]['form']['page_size'], '20')
+    
+    def test_delete_article(self):
+        """测试删除文章后列表不再包含该文章"""
+        article_id = self.server.articles[0]['id']
+        
+        self.assertTrue(self.publisher.delete_article(article_id)['success'])
+        self.assertFalse(self.publisher.delete_article(article_id)['success'])
+        self.assertEqual(self.publisher.get_article_list()['total'], 44)
+    
+    def test_upload_image(self):
+        """测试图片上传"""
+        image = Path(tempfile.mkdtemp()) / "photo.jpg"
+        image.write_bytes(b'\xff\xd8fake-jpeg')
+        
+        result = self.publisher._upload_image(str(image), compress=False)
+        
+        self.assertTrue(result['success'])
+        self.assertTrue(result['web_uri'].startswith('tos-cn-i-0000/'))
+    
+    def test_check_login_status(self):
+        """测试登录状态缓存在请求返回鉴权失败后失效"""
+        self.assertTrue(self.auth.check_login_status())
+        self.server.logged_in = False
+        self.assertTrue(self.auth.check_login_status())
+        self.assertEqual(len(self.server.requests_to('user_info')), 1)
+        
+        self.server.overrides['article_list'] = (401, {'message': 'unauthorized'})
+        self.publisher.get_article_list()
+        
+        self.assertFalse(self.auth.check_login_status())
+        self.assertIsNone(self.auth.get_user_info())
+        self.assertEqual(len(self.server.requests_to('user_info')), 3)
+        self.assertEqual(self.server.requests_to('homepage'), [])
+    
+    def test_login_probe_falls_back_to_homepage(self):
+        """测试登录状态接口返回非 JSON 时回退为检查创作者中心首页"""
+        self.server.overrides['user_info'] = (200, '<html>maintenance</html>')
+        
+        self.assertTrue(self.auth.check_login_status())
+        self.assertEqual(len(self.server.requests_to('homepage')), 1)
+    
+    def test_analytics_report(self):
+        """测试数据报告的各项分析数据完整"""
+        result = self.analytics.generate_report('weekly')
+        
+        self.assertTrue(result['success'])
+        report = result['data']
+        self.assertEqual(report['summary']['data_completeness'], 100)
+        self.assertEqual(report['overview']['total_articles'], 45)
+        self.assertEqual(len(report['trending']['trend_data']), 7)
+        self.assertEqual(report['top_content']['total_count'], 20)
+        article_id = report['top_content']['articles'][0]['article_id']
+        self.assertTrue(self.analytics.get_article_stats(article_id)['success'])
+    
+    def test_error_rate_and_latency(self):
+        """测试配置错误率和延迟"""
+        self.server.error_rate = 1.0
+        self.server.latency = 0.05
+        
+        started = time.monotonic()
+        result = self.analytics.get_account_overview()
+        
+        self.assertFalse(result['success'])
+        self.assertIn('500', result['message'])
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+
+class TestEditorFixtures(unittest.TestCase):
+    """测试模拟编辑器页面包含发布流程依赖的元素"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        import requests
+        self.server = FakeToutiaoServer(page_delays={'editor': 0.5}).start()
+        self.urls = self.server.urls()
+        self.session = requests.Session()
+    
+    def tearDown(self):
+        """清理测试环境"""
+        self.server.stop()
+    
+    def _page(self, key):
+        from bs4 import BeautifulSoup
+        response = self.session.get(self.urls[key], timeout=5)
+        self.assertEqual(response.status_code, 200)
+        return BeautifulSoup(response.text, 'html.parser'), response.text
+    
+    def test_article_page(self):
+        """测试图文发布页的标题、封面、预览发布和确认发布元素"""
+        from toutiao_mcp_server.publisher import ARTICLE_TITLE_SELECTOR, ARTICLE_CONFIRM_SELECTOR
+        page, text = self._page('article_page')
+        
+        for selector in (ARTICLE_TITLE_SELECTOR, ARTICLE_CONFIRM_SELECTOR, '.ProseMirror', '.syl-placeholder',
+                         'div.article-cover-add', ".btn-upload-handle.upload-handler input[type='file']",
+                         "button[data-e2e='imageUploadConfirm-btn']", '.byte-drawer-mask'):
+            self.assertTrue(page.select(selector), selector)
+        self.assertIn('预览并发布', [button.get_text(strip=True) for button in page.select('button')])
+        self.assertIn('"editor": 0.5', text)
+        script = self.session.get(f"{self.server.base_url}/fixtures/editor/editor.js", timeout=5)
+        self.assertIn('FIXTURE_CONFIG', script.text)
+    
+    def test_micro_page(self):
+        """测试微头条发布页只有一个文件输入框，且包含图片、发布和确认按钮"""
+        page, _ = self._page('micro_page')
+        
+        self.assertEqual(len(page.select("input[type='file']")), 1)
+        self.assertTrue(page.select("button[title*='图片']"))
+        self.assertEqual(page.select_one('button.publish-content span').get_text(), '发布')
+        self.assertEqual(page.select_one('.confirm-modal button').get_text(), '确定')
+        self.server.logged_in = False
+        self.assertIn('login', self._page('micro_page')[1])
+
 class TestTouTiaoAnalytics(unittest.TestCase):
     """测试分析模块"""
     
@@ -127,6 +836,978 @@ class TestTouTiaoAnalytics(unittest.TestCase):
         self.assertEqual(result['data']['followers_count'], 1000)
         self.assertEqual(result['data']['total_articles'], 50)
 
+class TestDriverPool(unittest.TestCase):
+    """测试浏览器驱动池"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.created = []
+        
+        def factory():
+            driver = Mock()
+            driver.window_handles = ['main']
+            self.created.append(driver)
+            return driver
+        
+        self.pool = DriverPool(factory, min_size=1, max_size=2, acquire_timeout=0.1)
+    
+    def tearDown(self):
+        """清理测试环境"""
+        self.pool.close()
+    
+    def test_prefill_and_reuse(self):
+        """测试预热后借出的驱动会被复用"""
+        self.pool.prefill()
+        self.assertEqual(len(self.created), 1)
+        
+        pooled = self.pool.acquire()
+        self.pool.release(pooled)
+        again = self.pool.acquire()
+        
+        self.assertIs(again, pooled)
+        self.assertEqual(again.use_count, 2)
+        self.assertEqual(len(self.created), 1)
+        pooled.driver.get.assert_called_with("about:blank")
+    
+    def test_concurrent_acquire_respects_max_size(self):
+        """测试健康检查期间借出的驱动已计入容量，其他线程不会超出上限新建驱动"""
+        created = []
+        
+        def factory():
+            driver = Mock()
+            driver.window_handles = ['main']
+            driver.execute_script.side_effect = lambda *args: time.sleep(0.2) or 1
+            created.append(driver)
+            return driver
+        
+        pool = DriverPool(factory, min_size=1, max_size=1, acquire_timeout=0.1)
+        pool.prefill()
+        checking = threading.Thread(target=pool.acquire)
+        checking.start()
+        time.sleep(0.05)
+        
+        with self.assertRaises(TimeoutError):
+            pool.acquire()
+        checking.join()
+        pool.close()
+        
+        self.assertEqual(len(created), 1)
+    
+    def test_initialize_services_does_not_prefill(self):
+        """测试初始化服务（导入 server 模块时执行）不启动浏览器，预热由启动入口调用"""
+        from toutiao_mcp_server import server
+        with patch.object(DriverPool, 'prefill') as mock_prefill:
+            self.assertTrue(server.initialize_services())
+            mock_prefill.assert_not_called()
+            server.prefill_driver_pools()
+            mock_prefill.assert_called_once_with(background=True)
+    
+    def test_max_size_timeout(self):
+        """测试达到最大容量后等待超时"""
+        self.pool.acquire()
+        self.pool.acquire()
+        with self.assertRaises(TimeoutError):
+            self.pool.acquire()
+    
+    def test_unhealthy_driver_replaced(self):
+        """测试健康检查失败的驱动被丢弃并重建"""
+        self.pool.prefill()
+        broken = self.created[0]
+        broken.execute_script.side_effect = Exception("chrome not reachable")
+        
+        pooled = self.pool.acquire()
+        
+        self.assertIsNot(pooled.driver, broken)
+        broken.quit.assert_called_once()
+    
+    def _wait_idle(self, pool, count):
+        """等待后台替换驱动就绪"""
+        import time
+        deadline = time.monotonic() + 2
+        while pool.stats()['idle'] < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+    
+    def test_recycle_after_max_uses(self):
+        """测试达到发布次数上限后回收，并在后台准备好替换驱动"""
+        pool = DriverPool(self.pool.factory, min_size=1, max_size=1, acquire_timeout=1,
+                          max_uses=2, max_rss_mb=0, max_age=0, watchdog_interval=0)
+        first = pool.acquire()
+        pool.release(first)
+        pool.acquire()
+        pool.release(first)
+        self._wait_idle(pool, 1)
+        
+        replacement = pool.acquire()
+        
+        self.assertIsNot(replacement, first)
+        first.driver.quit.assert_called_once()
+        self.assertEqual(pool.stats()['recycled'], 1)
+        pool.release(replacement)
+        pool.close()
+    
+    def test_watchdog_recycles_idle_over_memory(self):
+        """测试空闲驱动的进程树内存超出上限时被回收"""
+        probe = Mock(side_effect=lambda driver: 2048 * 1024 * 1024 if driver is self.created[0] else 100)
+        pool = DriverPool(self.pool.factory, min_size=1, max_size=1, acquire_timeout=1,
+                          max_uses=0, max_rss_mb=1500, max_age=0, watchdog_interval=0, rss_probe=probe)
+        pool.prefill()
+        
+        self.assertEqual(pool.check_idle(), 1)
+        self._wait_idle(pool, 1)
+        
+        self.assertEqual(len(self.created), 2)
+        self.assertEqual(pool.check_idle(), 0)
+        self.assertIs(pool.acquire().driver, self.created[1])
+        pool.close()
+    
+    def test_close_quits_idle_drivers(self):
+        """测试关闭驱动池时退出空闲浏览器"""
+        self.pool.prefill()
+        self.pool.close()
+        self.created[0].quit.assert_called_once()
+        with self.assertRaises(RuntimeError):
+            self.pool.acquire()
+
+class TestChromeDriverResolver(unittest.TestCase):
+    """测试 ChromeDriver 解析缓存"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_file = str(Path(self.temp_dir) / "chromedriver.json")
+        self.driver_file = Path(self.temp_dir) / "chromedriver"
+        self.driver_file.write_text("")
+        self.install_info = {
+            'driver_path': str(self.driver_file),
+            'chrome_binary': None,
+            'chrome_version': '120.0.0.0',
+            'chrome_mtime': None,
+            'resolved_at': 0
+        }
+    
+    def test_resolve_once_per_process(self):
+        """测试同一进程内只解析一次"""
+        resolver = ChromeDriverResolver(self.cache_file)
+        with patch.object(resolver, '_install', return_value=self.install_info) as mock_install:
+            resolver.resolve()
+            resolver.resolve()
+            self.assertEqual(mock_install.call_count, 1)
+    
+    def test_reuse_disk_cache_offline(self):
+        """测试重启后直接复用磁盘缓存，不再联网解析"""
+        first = ChromeDriverResolver(self.cache_file)
+        with patch.object(first, '_install', return_value=self.install_info):
+            first.resolve()
+        
+        second = ChromeDriverResolver(self.cache_file)
+        with patch.object(second, '_install', side_effect=Exception("offline")) as mock_install:
+            info = second.resolve()
+            mock_install.assert_not_called()
+        self.assertEqual(info['driver_path'], str(self.driver_file))
+        self.assertEqual(info['chrome_version'], '120.0.0.0')
+    
+    def test_missing_driver_invalidates_cache(self):
+        """测试驱动文件被删除后重新解析"""
+        first = ChromeDriverResolver(self.cache_file)
+        with patch.object(first, '_install', return_value=self.install_info):
+            first.resolve()
+        self.driver_file.unlink()
+        
+        second = ChromeDriverResolver(self.cache_file)
+        with patch.object(second, '_install', side_effect=Exception("offline")):
+            info = second.resolve()
+        self.assertIsNone(info['driver_path'])
+    
+    def test_failed_resolve_cached_until_retry_interval(self):
+        """测试解析失败后在重试间隔内不再联网解析"""
+        resolver = ChromeDriverResolver(self.cache_file, retry_interval=60)
+        with patch.object(resolver, '_install', side_effect=Exception("offline")) as mock_install:
+            resolver.resolve()
+            info = resolver.resolve()
+            self.assertEqual(mock_install.call_count, 1)
+        self.assertIsNone(info['driver_path'])
+        
+        resolver.retry_interval = 0
+        with patch.object(resolver, '_install', return_value=self.install_info) as mock_install:
+            info = resolver.resolve()
+            resolver.resolve()
+            self.assertEqual(mock_install.call_count, 1)
+        self.assertEqual(info['driver_path'], str(self.driver_file))
+    
+    def test_create_driver_invalidates_only_on_driver_failure(self):
+        """测试只有驱动版本不匹配时清除缓存重试，用户目录被占用等其他失败直接抛出"""
+        from selenium.common.exceptions import SessionNotCreatedException
+        from toutiao_mcp_server import chromedriver
+        resolver = Mock()
+        resolver.resolve.return_value = {'driver_path': str(self.driver_file)}
+        
+        with patch.object(chromedriver, '_resolver', resolver), \
+                patch.object(chromedriver.webdriver, 'Chrome') as chrome:
+            chrome.side_effect = SessionNotCreatedException("user data directory is already in use")
+            with self.assertRaises(SessionNotCreatedException):
+                chromedriver.create_chrome_driver(Mock())
+            resolver.invalidate.assert_not_called()
+            
+            chrome.side_effect = [
+                SessionNotCreatedException("This version of ChromeDriver only supports Chrome version 120"),
+                'driver'
+            ]
+            self.assertEqual(chromedriver.create_chrome_driver(Mock()), 'driver')
+            resolver.invalidate.assert_called_once()
+
+class TestChromeProfileManager(unittest.TestCase):
+    """测试持久化浏览器用户目录管理"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = ChromeProfileManager(self.temp_dir, "account", max_slots=2)
+    
+    def test_profile_locking(self):
+        """测试同一用户目录不会被两个浏览器同时使用"""
+        first = self.manager.acquire()
+        second = self.manager.acquire()
+        self.assertNotEqual(first.path, second.path)
+        
+        # 另一个管理器（模拟另一进程）无法获得已加锁的目录
+        other = ChromeProfileManager(self.temp_dir, "account", max_slots=2)
+        with self.assertRaises(RuntimeError):
+            other.acquire()
+        
+        self.manager.release(first)
+        self.assertEqual(other.acquire().path, first.path)
+    
+    def test_cookie_seed_roundtrip(self):
+        """测试Cookie注入记录的读写和清除"""
+        slot = self.manager.acquire()
+        self.assertIsNone(slot.read_seed())
+        
+        slot.write_seed([1700000000, 0])
+        self.assertEqual(slot.read_seed(), [1700000000, 0])
+        
+        self.manager.invalidate_seeds()
+        self.assertIsNone(slot.read_seed())
+    
+    def test_profile_key_distinguishes_same_basename(self):
+        """测试不同目录下同名Cookie文件使用不同的用户目录"""
+        first = profile_key(str(Path(self.temp_dir) / "a" / "cookies.json"))
+        second = profile_key(str(Path(self.temp_dir) / "b" / "cookies.json"))
+        self.assertNotEqual(first, second)
+        self.assertTrue(first.startswith("cookies-"))
+        self.assertEqual(first, profile_key(str(Path(self.temp_dir) / "a" / ".." / "a" / "cookies.json")))
+
+class TestCookieStore(unittest.TestCase):
+    """测试共享 Cookie 文件的加锁读写和热加载"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cookies_file = str(Path(self.temp_dir) / "cookies.json")
+    
+    def test_write_read_changed(self):
+        """测试原子写入后读取，并检测其他实例（模拟另一进程）的修改"""
+        store = CookieStore(self.cookies_file, check_interval=0)
+        other = CookieStore(self.cookies_file, check_interval=0)
+        self.assertIsNone(store.read())
+        self.assertFalse(store.changed())
+        
+        store.write({'cookies': [{'name': 'sessionid', 'value': 'a'}], 'timestamp': 1})
+        self.assertFalse(store.changed())
+        self.assertEqual(other.read()['cookies'][0]['value'], 'a')
+        self.assertEqual(list(Path(self.temp_dir).glob("*.tmp")), [])
+        
+        other.write({'cookies': [], 'timestamp': 2})
+        self.assertTrue(store.changed())
+        self.assertEqual(store.read()['timestamp'], 2)
+        self.assertFalse(store.changed())
+        
+        other.delete()
+        self.assertTrue(store.changed())
+    
+    def test_concurrent_reads_never_torn(self):
+        """测试并发写入时读取方总能读到完整的文件"""
+        store = CookieStore(self.cookies_file, check_interval=0)
+        store.write({'cookies': [], 'timestamp': 0})
+        errors = []
+        
+        def writer():
+            writer_store = CookieStore(self.cookies_file)
+            for index in range(50):
+                writer_store.write({'cookies': [{'name': f"c{n}", 'value': 'x' * 200} for n in range(50)],
+                                    'timestamp': index})
+        
+        def reader():
+            reader_store = CookieStore(self.cookies_file)
+            for _ in range(50):
+                try:
+                    reader_store.read()
+                except ValueError as e:
+                    errors.append(e)
+        
+        threads = [threading.Thread(target=writer), threading.Thread(target=reader),
+                   threading.Thread(target=reader)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+    
+    def test_auth_hot_reload(self):
+        """测试另一进程重新登录或登出后，认证实例不重启即加载新 Cookie"""
+        config = {'auto_refresh': False, 'cookie_reload_interval': 0}
+        with patch.dict('toutiao_mcp_server.config.AUTH_CONFIG', config):
+            auth = TouTiaoAuth(self.cookies_file)
+            other = TouTiaoAuth(self.cookies_file)
+            other._save_cookies([{'name': 'sessionid', 'value': 'fresh', 'domain': '.toutiao.com'}])
+            
+            self.assertTrue(auth.reload_cookies_if_changed())
+            self.assertEqual(auth.session.cookies.get('sessionid'), 'fresh')
+            self.assertEqual(auth.cookies_version, other.cookies_version)
+            self.assertFalse(auth.reload_cookies_if_changed())
+            
+            other.logout()
+            self.assertTrue(auth.reload_cookies_if_changed())
+            self.assertEqual(len(auth.session.cookies), 0)
+
+class TestAccountRegistry(unittest.TestCase):
+    """测试多账号注册表和批量任务路由"""
+    
+    def _context(self, name, cookies_file, logged_in=True):
+        context = Mock()
+        context.name = name
+        context.in_flight = 0
+        context.auth.check_login_status.return_value = logged_in
+        context.publisher.publish_batch.side_effect = lambda jobs, **kwargs: {
+            'results': [{'success': True, 'title': job['title'], 'account_seen': name} for job in jobs]
+        }
+        return context
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.registry = AccountRegistry(
+            {'a': '/tmp/a.json', 'b': '/tmp/b.json', 'c': '/tmp/c.json'},
+            factory=lambda name, path: self._context(name, path, logged_in=name != 'c')
+        )
+    
+    def test_parse_accounts(self):
+        """测试账号配置解析"""
+        accounts = parse_accounts("main=/data/main.json, brand")
+        self.assertEqual(list(accounts), ['main', 'brand'])
+        self.assertEqual(accounts['main'], '/data/main.json')
+        self.assertTrue(accounts['brand'].endswith('toutiao_cookies_brand.json'))
+        self.assertEqual(list(parse_accounts("")), ['default'])
+        with self.assertRaises(ValueError):
+            parse_accounts("a,a")
+    
+    def test_get_account(self):
+        """测试按账号名获取服务，未指定时使用默认账号"""
+        self.assertEqual(self.registry.default_account, 'a')
+        self.assertIs(self.registry.get(), self.registry.get('a'))
+        self.assertEqual(self.registry.get('b').name, 'b')
+        with self.assertRaises(ValueError):
+            self.registry.get('unknown')
+    
+    def test_route_spreads_across_logged_in_accounts(self):
+        """测试任务平均分配到已登录账号，指定账号的任务不参与分配"""
+        jobs = [{'type': 'article', 'title': str(i)} for i in range(5)]
+        jobs[0]['account'] = 'a'
+        plan = self.registry.route(jobs)
+        self.assertEqual(plan, {'a': [0, 2, 4], 'b': [1, 3]})
+        
+        # 正在执行批量任务的账号分到的任务更少
+        self.registry.get('a').in_flight = 2
+        plan = self.registry.route([{'type': 'article', 'title': str(i)} for i in range(3)])
+        self.assertEqual(plan, {'b': [0, 1], 'a': [2]})
+    
+    def test_run_batch_keeps_job_order(self):
+        """测试多账号批量发布的结果与任务顺序一致并标明账号"""
+        jobs = [{'type': 'article', 'title': str(i)} for i in range(4)]
+        result = self.registry.run_batch(jobs)
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['accounts'], {'a': 2, 'b': 2})
+        self.assertEqual([r['title'] for r in result['results']], ['0', '1', '2', '3'])
+        for r in result['results']:
+            self.assertEqual(r['account'], r['account_seen'])
+        self.assertEqual(self.registry.get('a').in_flight, 0)
+    
+    def test_run_batch_without_logged_in_accounts(self):
+        """测试没有已登录账号时返回失败"""
+        result = self.registry.run_batch([{'type': 'article', 'title': 't'}], accounts=['c'])
+        self.assertFalse(result['success'])
+        self.assertIn('没有已登录的账号', result['message'])
+    
+    def test_start_auto_refresh_covers_all_accounts(self):
+        """测试开启自动续期后已加载和之后加载的账号都开启续期"""
+        self.registry.get('a')
+        self.registry.start_auto_refresh()
+        
+        for name in ('a', 'b', 'c'):
+            self.registry.get(name).auth.start_auto_refresh.assert_called_once()
+    
+    def test_run_batch_empty_jobs(self):
+        """测试没有任务时返回空的成功汇总"""
+        result = self.registry.run_batch([])
+        self.assertTrue(result['success'])
+        self.assertEqual((result['total'], result['succeeded'], result['results']), (0, 0, []))
+
+class TestPageWaiter(unittest.TestCase):
+    """测试基于DOM状态的等待器"""
+    
+    def test_until_records_actual_wait(self):
+        """测试条件满足后立即返回并记录实际等待"""
+        driver = Mock()
+        driver.execute_script.side_effect = [None, None, "editor"]
+        waiter = PageWaiter(driver, poll_interval=0.01)
+        
+        result = waiter.until_js("editor_ready", "return null;", 5)
+        
+        self.assertEqual(result, "editor")
+        self.assertEqual(driver.execute_script.call_count, 3)
+        record = waiter.records[0]
+        self.assertEqual(record['name'], "editor_ready")
+        self.assertTrue(record['satisfied'])
+        self.assertLess(record['waited'], 5)
+    
+    def test_until_timeout(self):
+        """测试超时后抛出异常或返回None"""
+        driver = Mock()
+        driver.execute_script.return_value = False
+        waiter = PageWaiter(driver, poll_interval=0.01)
+        
+        with self.assertRaises(TimeoutException):
+            waiter.until_js("publish_dialog_visible", "return false;", 0.05)
+        self.assertIsNone(waiter.until_js("mask_gone", "return false;", 0.05, required=False))
+        self.assertEqual([r['satisfied'] for r in waiter.records], [False, False])
+    
+    def test_publish_outcome_login_redirect(self):
+        """测试发布后跳转到登录页时返回 LOGIN_REQUIRED，而不是视为成功"""
+        driver = Mock()
+        driver.execute_script.return_value = LOGIN_REQUIRED
+        waiter = PageWaiter(driver, poll_interval=0.01)
+        
+        self.assertEqual(waiter.publish_outcome("https://mp.toutiao.com/profile_v4/graphic/publish", 1), LOGIN_REQUIRED)
+        script, start_url, succeeded, login = driver.execute_script.call_args[0]
+        self.assertEqual((succeeded, login), (PUBLISH_SUCCEEDED, LOGIN_REQUIRED))
+        self.assertIn('passport', script)
+        self.assertIn('manage|graphic', script)
+    
+    def test_cover_applied_requires_image(self):
+        """测试封面区域没有图片时不视为封面已应用"""
+        driver = Mock()
+        driver.execute_script.return_value = False
+        waiter = PageWaiter(driver, poll_interval=0.01)
+        
+        self.assertFalse(waiter.cover_applied(timeout=0.05))
+        self.assertIn("return !!img &&", driver.execute_script.call_args[0][0])
+
+    def test_first_visible_of_single_call(self):
+        """测试一次脚本调用检查全部候选选择器并返回命中项"""
+        driver = Mock()
+        editor = Mock()
+        driver.execute_script.return_value = ["textarea", editor]
+        waiter = PageWaiter(driver)
+        
+        result = waiter.first_visible_of("micro_editor_ready", [".ProseMirror", "textarea"], 5)
+        
+        self.assertEqual(result, ("textarea", editor))
+        driver.execute_script.assert_called_once()
+        self.assertEqual(driver.execute_script.call_args[0][1], [".ProseMirror", "textarea"])
+    
+    def test_uploads_finished_counts_thumbnails(self):
+        """测试按新增缩略图数量判断批量上传完成"""
+        driver = Mock()
+        driver.execute_script.side_effect = [
+            {'rendered': 1, 'uploading': 3, 'failed': 0},
+            {'rendered': 2, 'uploading': 2, 'failed': 0},
+            {'rendered': 3, 'uploading': 0, 'failed': 1},
+        ]
+        waiter = PageWaiter(driver, poll_interval=0.01)
+        
+        outcome = waiter.uploads_finished(3, {'rendered': 1, 'uploading': 0, 'failed': 0}, 5)
+        
+        self.assertEqual(len(outcome['completed']), 2)
+        self.assertEqual(outcome['failed'], 1)
+        self.assertEqual(driver.execute_script.call_count, 3)
+        self.assertFalse(waiter.records[0]['satisfied'])
+    
+    def test_uploads_finished_per_image_timeout(self):
+        """测试长时间无进展时按单张超时停止等待"""
+        driver = Mock()
+        driver.execute_script.return_value = {'rendered': 0, 'uploading': 1, 'failed': 0}
+        waiter = PageWaiter(driver, poll_interval=0.01)
+        
+        outcome = waiter.uploads_finished(2, {'rendered': 0, 'failed': 0}, 0.05)
+        
+        self.assertEqual(outcome, {'completed': [], 'failed': 0})
+
+class FakeTabDriver:
+    """记录标签页切换的模拟浏览器驱动"""
+    
+    def __init__(self):
+        self.handles = ['main']
+        self.current_window_handle = 'main'
+        self.closed = []
+        self.switch_to = Mock()
+        self.switch_to.new_window.side_effect = self._new_window
+        self.switch_to.window.side_effect = self._switch
+    
+    def _new_window(self, kind):
+        handle = f"tab-{len(self.handles)}"
+        self.handles.append(handle)
+        self.current_window_handle = handle
+    
+    def _switch(self, handle):
+        if handle not in self.handles:
+            raise Exception("no such window")
+        self.current_window_handle = handle
+    
+    @property
+    def window_handles(self):
+        return list(self.handles)
+    
+    def close(self):
+        self.closed.append(self.current_window_handle)
+        self.handles.remove(self.current_window_handle)
+
+class TestTabScheduler(unittest.TestCase):
+    """测试多标签页调度"""
+    
+    def test_flows_interleave_at_wait_points(self):
+        """测试流程只在等待点让出浏览器，且每次操作都在自己的标签页中"""
+        driver = FakeTabDriver()
+        events = []
+        
+        def flow(tab):
+            for step in range(3):
+                events.append((tab.handle, driver.current_window_handle, step))
+                tab.sleep(0.02)
+            return {'success': True, 'handle': tab.handle}
+        
+        results = TabScheduler(driver, max_tabs=2).run([flow, flow])
+        
+        self.assertTrue(all(r['success'] for r in results))
+        self.assertNotEqual(results[0]['handle'], results[1]['handle'])
+        for own, current, _ in events:
+            self.assertEqual(own, current)
+        # 第二个流程在第一个流程结束前就已开始
+        first_done = max(i for i, e in enumerate(events) if e[0] == results[0]['handle'])
+        second_start = min(i for i, e in enumerate(events) if e[0] == results[1]['handle'])
+        self.assertLess(second_start, first_done)
+        self.assertEqual(sorted(driver.closed), sorted(r['handle'] for r in results))
+        self.assertEqual(driver.handles, ['main'])
+    
+    def test_crashed_tab_isolated(self):
+        """测试单个标签页崩溃只影响对应流程"""
+        driver = FakeTabDriver()
+        
+        def crashing(tab):
+            tab.sleep(0.01)
+            driver.handles.remove(tab.handle)
+            tab.scheduler._current_handle = None
+            tab.sleep(0.01)
+            return {'success': True}
+        
+        def healthy(tab):
+            for _ in range(3):
+                tab.sleep(0.01)
+            return {'success': True}
+        
+        results = TabScheduler(driver, max_tabs=4).run([crashing, healthy, healthy])
+        
+        self.assertFalse(results[0]['success'])
+        self.assertIn('no such window', results[0]['message'])
+        self.assertTrue(results[1]['success'])
+        self.assertTrue(results[2]['success'])
+    
+    def test_max_tabs_cap(self):
+        """测试同时打开的标签页不超过上限"""
+        driver = FakeTabDriver()
+        peak = []
+        
+        def flow(tab):
+            peak.append(len(driver.handles) - 1)
+            tab.sleep(0.01)
+            return {'success': True}
+        
+        TabScheduler(driver, max_tabs=2).run([flow] * 5)
+        
+        self.assertLessEqual(max(peak), 2)
+
+class TestTiming(unittest.TestCase):
+    """测试发布步骤耗时统计"""
+    
+    def test_step_timer_timeline(self):
+        """测试开始新步骤时自动结束上一步骤，同名步骤累加"""
+        with patch('toutiao_mcp_server.timing.time.monotonic', side_effect=[0.0, 0.0, 1.0, 1.0, 3.0, 3.0, 3.5, 4.0]):
+            timer = StepTimer()
+            timer.start('navigation')
+            timer.start('editor_ready')
+            timer.start('navigation')
+            timings = timer.as_dict()
+        
+        self.assertEqual(timings, {'navigation': 1.5, 'editor_ready': 2.0, 'total': 4.0})
+        self.assertEqual(list(timings)[:2], ['navigation', 'editor_ready'])
+    
+    def test_aggregator_summary(self):
+        """测试进程级汇总各步骤的耗时分布"""
+        aggregator = TimingAggregator(max_samples=3)
+        for seconds in (1.0, 2.0, 3.0, 4.0):
+            aggregator.record('article', {'editor_ready': seconds, 'total': seconds * 2}, success=seconds > 1)
+        
+        summary = aggregator.summary()['article']
+        
+        self.assertEqual(summary['runs'], 4)
+        self.assertEqual(summary['succeeded'], 3)
+        self.assertEqual(summary['steps']['editor_ready']['count'], 3)
+        self.assertEqual(summary['steps']['editor_ready']['mean'], 3.0)
+        self.assertEqual(summary['steps']['editor_ready']['max'], 4.0)
+        aggregator.reset()
+        self.assertEqual(aggregator.summary(), {})
+
+class TestDebugArtifactStore(unittest.TestCase):
+    """测试调试文件记录"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        import base64
+        self.temp_dir = tempfile.mkdtemp()
+        self.driver = Mock()
+        self.driver.current_url = "https://mp.toutiao.com/profile_v4/weitoutiao/publish"
+        self.driver.get_screenshot_as_base64.return_value = base64.b64encode(b'png-bytes' * 100).decode()
+        self.driver.page_source = "<html>" + "x" * 1000 + "</html>"
+    
+    def test_capture_writes_in_background(self):
+        """测试每次记录写入独立目录，页面源代码可压缩"""
+        import gzip
+        store = DebugArtifactStore(root=self.temp_dir, max_bytes=10 ** 6, compress=True, enabled=True)
+        
+        first = store.capture(self.driver, 'micro_post', 'no_editor', page_source=True)
+        second = store.capture(self.driver, 'micro_post', 'no_editor', page_source=True)
+        store.flush()
+        
+        self.assertNotEqual(first, second)
+        self.driver.save_screenshot.assert_not_called()
+        self.assertEqual((Path(first) / "screenshot.png").read_bytes(), b'png-bytes' * 100)
+        self.assertEqual(gzip.decompress((Path(first) / "page_source.html.gz").read_bytes()).decode(),
+                         self.driver.page_source)
+        self.assertIn('weitoutiao', (Path(first) / "meta.json").read_text(encoding='utf-8'))
+    
+    def test_ring_buffer_limit(self):
+        """测试超出总大小上限时删除最早的记录"""
+        store = DebugArtifactStore(root=self.temp_dir, max_bytes=2500, compress=False, enabled=True)
+        
+        paths = [store.capture(self.driver, 'article', f'step{i}') for i in range(4)]
+        store.flush()
+        
+        remaining = sorted(p.name for p in Path(self.temp_dir).iterdir())
+        self.assertLess(len(remaining), 4)
+        self.assertIn(Path(paths[-1]).name, remaining)
+        self.assertNotIn(Path(paths[0]).name, remaining)
+    
+    def test_prune_orders_by_mtime_and_skips_unfinished(self):
+        """测试按写入时间而非目录名淘汰，且不删除仍在写入的记录"""
+        store = DebugArtifactStore(root=self.temp_dir, max_bytes=1500, compress=False, enabled=True)
+        root = Path(self.temp_dir)
+        # 目录名排序与写入顺序相反（例如同一秒内不同进程的记录）
+        for name, mtime in (("b-older", 1000), ("a-newer", 2000)):
+            (root / name).mkdir()
+            (root / name / "screenshot.png").write_bytes(b'x' * 1000)
+            (root / name / "meta.json").write_text("{}", encoding='utf-8')
+            os.utime(root / name / "meta.json", (mtime, mtime))
+        # 尚未写入 meta.json 的记录
+        (root / "0-writing").mkdir()
+        (root / "0-writing" / "screenshot.png").write_bytes(b'x' * 1000)
+        
+        store._prune()
+        
+        self.assertEqual(sorted(p.name for p in root.iterdir()), ["0-writing", "a-newer"])
+    
+    def test_disabled(self):
+        """测试关闭后不抓取任何数据"""
+        store = DebugArtifactStore(root=self.temp_dir, enabled=False)
+        
+        self.assertIsNone(store.capture(self.driver, 'article', 'x'))
+        self.driver.get_screenshot_as_base64.assert_not_called()
+
+class TestContent(unittest.TestCase):
+    """测试正文转换和分批插入"""
+    
+    def test_render_text_escapes(self):
+        """测试纯文本逐行成段并转义特殊字符"""
+        blocks = render_blocks("a < b & `c`\n\n<script>x</script>", 'text')
+        
+        self.assertEqual(blocks, ['<p>a &lt; b &amp; `c`</p>', '<p><br></p>', '<p>&lt;script&gt;x&lt;/script&gt;</p>'])
+    
+    def test_render_markdown(self):
+        """测试 Markdown 标题、列表和行内格式"""
+        blocks = render_blocks("# 标题\n\n- 一\n- **二**\n\n正文 *强调* `代码`", 'markdown')
+        
+        self.assertEqual(blocks, [
+            '<h1>标题</h1>',
+            '<ul><li>一</li><li><strong>二</strong></li></ul>',
+            '<p>正文 <em>强调</em> <code>代码</code></p>'
+        ])
+    
+    def test_render_html_keeps_nested_blocks(self):
+        """测试 HTML 按顶层块切分，不拆开嵌套结构"""
+        blocks = render_blocks("<p>一</p><blockquote><p>二</p><p>三</p></blockquote><p>四<br>五</p>")
+        
+        self.assertEqual(blocks, ['<p>一</p>', '<blockquote><p>二</p><p>三</p></blockquote>', '<p>四<br>五</p>'])
+    
+    def test_chunk_blocks_keeps_order(self):
+        """测试分批保持顺序且不超过上限"""
+        blocks = [f'<p>{i:03d}</p>' for i in range(100)]
+        
+        chunks = chunk_blocks(blocks, max_chars=100)
+        
+        self.assertEqual(''.join(chunks), ''.join(blocks))
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+        self.assertEqual(text_length(''.join(chunks)), 300)
+    
+    def test_insert_blocks_verifies_length(self):
+        """测试分批插入后按字数校验"""
+        driver = Mock()
+        driver.execute_script.side_effect = [True, 'paste', 'paste', 6]
+        
+        result = insert_blocks(driver, Mock(), ['<p>一二三</p>', '<p>四 五&amp;</p>'], max_chars=10)
+        
+        self.assertEqual(result, {'expected': 6, 'actual': 6, 'chunks': 2, 'method': 'paste', 'matched': True})
+    
+    def test_insert_blocks_falls_back_to_inner_html(self):
+        """测试编辑器不接受分批插入时整体设置，字数差异超出允许范围时报告"""
+        driver = Mock()
+        driver.execute_script.side_effect = [True, None, None, 2]
+        block = '<p>' + '字' * 100 + '</p>'
+        
+        result = insert_blocks(driver, Mock(), [block])
+        
+        self.assertEqual(result['method'], 'innerHTML')
+        self.assertFalse(result['matched'])
+        self.assertIn(block, driver.execute_script.call_args_list[2][0])
+    
+    def test_insert_blocks_tolerates_small_difference(self):
+        """测试编辑器字数与源文本有少量差异时仍视为一致"""
+        driver = Mock()
+        driver.execute_script.side_effect = [True, 'paste', 98]
+        
+        result = insert_blocks(driver, Mock(), ['<p>' + '字' * 100 + '</p>'])
+        
+        self.assertEqual((result['expected'], result['actual']), (100, 98))
+        self.assertTrue(result['matched'])
+    
+    def test_insert_blocks_clears_existing_content(self):
+        """测试编辑器中已有草稿内容时先清空再插入，字数校验通过"""
+        from toutiao_mcp_server import content
+        editor = {'text': '恢复的草稿内容'}
+        
+        def execute_script(script, element, *args):
+            if script == content._CLEAR_EDITOR_SCRIPT:
+                editor['text'] = ''
+                return True
+            if script == content._INSERT_CHUNK_SCRIPT:
+                editor['text'] += args[1]
+                return 'paste'
+            return len(editor['text'].replace(' ', ''))
+        
+        driver = Mock()
+        driver.execute_script.side_effect = execute_script
+        
+        result = insert_blocks(driver, Mock(), ['<p>一二三</p>'])
+        
+        self.assertEqual(editor['text'], '一二三')
+        self.assertEqual((result['expected'], result['actual']), (3, 3))
+        self.assertEqual(driver.execute_script.call_args_list[0][0][0], content._CLEAR_EDITOR_SCRIPT)
+    
+    def test_render_markdown_keeps_urls_intact(self):
+        """测试链接和图片地址中的 _、* 不被行内格式改写"""
+        blocks = render_blocks("**粗** [a_b](https://x.com/a_b*c*) ![图](https://x.com/__x__.png)", 'markdown')
+        
+        self.assertEqual(blocks, [
+            '<p><strong>粗</strong> <a href="https://x.com/a_b*c*">a_b</a> '
+            '<img src="https://x.com/__x__.png" alt="图"></p>'
+        ])
+    
+    def test_text_length_skips_non_rendered(self):
+        """测试字数统计不含脚本、样式和注释"""
+        markup = '<p>一二</p><script>var a = 1;</script><style>p { color: red; }</style><!-- 注释 --><p>三&nbsp;</p>'
+        
+        self.assertEqual(text_length(markup), 3)
+    
+    def test_render_markdown_drops_unsafe_urls(self):
+        """测试 Markdown 链接和图片只保留 http(s) 及 data:image 地址"""
+        blocks = render_blocks(
+            "[好](https://a.com) [坏](javascript:void) ![图](data:image/png;base64,AA) ![脚本](JavaScript:x)",
+            'markdown'
+        )
+        
+        self.assertEqual(blocks, [
+            '<p><a href="https://a.com">好</a> 坏 <img src="data:image/png;base64,AA" alt="图"> 脚本</p>'
+        ])
+
+class FakeCDPTransport:
+    """按处理函数回复命令的模拟 CDP websocket"""
+    
+    def __init__(self, handler):
+        import asyncio
+        self.handler = handler
+        self.sent = []
+        self._queue = asyncio.Queue()
+    
+    async def send(self, raw):
+        import json
+        message = json.loads(raw)
+        self.sent.append(message)
+        await self._queue.put(json.dumps(dict(self.handler(message), id=message['id'])))
+    
+    async def recv(self):
+        return await self._queue.get()
+    
+    async def close(self):
+        pass
+
+class TestAsyncCDP(unittest.TestCase):
+    """测试异步 CDP 后端"""
+    
+    def _run_page(self, handler, coroutine_factory):
+        """在新事件循环中创建页面并执行协程"""
+        import asyncio
+        
+        async def main():
+            transport = FakeCDPTransport(handler)
+            connection = CDPConnection(transport).start()
+            page = AsyncPage(connection, 'target-1', 'session-1', poll_interval=0)
+            try:
+                return await coroutine_factory(page), transport
+            finally:
+                await connection.close()
+        
+        return asyncio.run(main())
+    
+    def test_evaluate_passes_arguments(self):
+        """测试脚本按 execute_script 的语义接收参数并按值返回"""
+        result, transport = self._run_page(
+            lambda message: {'result': {'result': {'value': 42}}},
+            lambda page: page.evaluate("return arguments[0].length + arguments[1];", "ab", 40)
+        )
+        
+        self.assertEqual(result, 42)
+        message = transport.sent[0]
+        self.assertEqual(message['method'], 'Runtime.evaluate')
+        self.assertEqual(message['sessionId'], 'session-1')
+        self.assertIn('.apply(null, ["ab", 40])', message['params']['expression'])
+        self.assertIn('var firstVisible', message['params']['expression'])
+    
+    def test_command_error_raised(self):
+        """测试命令返回错误时抛出 CDPError"""
+        with self.assertRaises(CDPError):
+            self._run_page(
+                lambda message: {'error': {'message': 'No target with given id'}},
+                lambda page: page.send('Page.navigate', {'url': 'about:blank'})
+            )
+    
+    def test_wait_js_polls_until_ready(self):
+        """测试条件等待轮询到满足为止并记录等待"""
+        values = iter([None, None, 'ready'])
+        
+        async def wait(page):
+            value = await page.wait_js("editor_ready", "return null;", 5)
+            return value, page.records
+        
+        (value, records), transport = self._run_page(
+            lambda message: {'result': {'result': {'value': next(values)}}}, wait
+        )
+        
+        self.assertEqual(value, 'ready')
+        self.assertEqual(len(transport.sent), 3)
+        self.assertTrue(records[0]['satisfied'])
+    
+    def test_async_publish_without_backend_runs_in_thread(self):
+        """测试未启用异步后端时在线程池中执行同步发布"""
+        import asyncio
+        import threading
+        auth = Mock(spec=TouTiaoAuth)
+        auth.session = Mock()
+        publisher = TouTiaoPublisher(auth, driver_pool=Mock())
+        publisher.publish_micro_post = Mock(side_effect=lambda *args, **kwargs: {
+            'success': True, 'thread': threading.current_thread().name
+        })
+        
+        with patch.dict('toutiao_mcp_server.publisher.PUBLISH_CONFIG', {'backend': 'selenium'}):
+            result = asyncio.run(publisher.publish_micro_post_async("内容", topic="科技"))
+        
+        self.assertTrue(result['success'])
+        self.assertNotEqual(result['thread'], threading.current_thread().name)
+        self.assertEqual(publisher.publish_micro_post.call_args[1]['topic'], "科技")
+    
+    def test_batch_runs_concurrently_in_one_browser(self):
+        """测试异步后端在一个浏览器的多个页面中并发发布"""
+        import asyncio
+        import time
+        from unittest.mock import AsyncMock
+        auth = Mock(spec=TouTiaoAuth)
+        auth.session = Mock()
+        publisher = TouTiaoPublisher(auth, driver_pool=Mock())
+        browser = Mock()
+        browser.close = AsyncMock()
+        publisher.launch_async_browser = AsyncMock(return_value=browser)
+        
+        async def open_page(active):
+            page = Mock()
+            page.records = []
+            page.close = AsyncMock()
+            return page
+        
+        async def flow(page, content, images, topic, timer):
+            await asyncio.sleep(0.1)
+            return {'success': True, 'message': content}
+        
+        publisher._open_async_page = open_page
+        publisher._publish_micro_post_flow_async = flow
+        jobs = [{'type': 'micro_post', 'content': f'内容{i}'} for i in range(4)]
+        
+        start = time.monotonic()
+        with patch.dict('toutiao_mcp_server.publisher.PUBLISH_CONFIG', {'backend': 'async_cdp'}):
+            result = asyncio.run(publisher.publish_batch_async(jobs, max_concurrency=4))
+        elapsed = time.monotonic() - start
+        
+        self.assertEqual(result['succeeded'], 4)
+        self.assertEqual([r['message'] for r in result['results']], [job['content'] for job in jobs])
+        self.assertEqual(result['results'][0]['transport'], 'async_cdp')
+        self.assertLess(elapsed, 0.3)
+        publisher.launch_async_browser.assert_awaited_once()
+        browser.close.assert_awaited_once()
+    
+    def test_batch_api_transport_skips_async_browser(self):
+        """测试发布方式为 api 时异步批量发布与单条异步发布一致，走 publish_batch"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        auth = Mock(spec=TouTiaoAuth)
+        auth.session = Mock()
+        publisher = TouTiaoPublisher(auth, driver_pool=Mock())
+        publisher.launch_async_browser = AsyncMock()
+        publisher.publish_batch = Mock(return_value={'success': True, 'results': []})
+        jobs = [{'type': 'micro_post', 'content': '内容'}]
+        
+        with patch.dict('toutiao_mcp_server.publisher.PUBLISH_CONFIG', {'backend': 'async_cdp', 'transport': 'api'}):
+            asyncio.run(publisher.publish_batch_async(jobs))
+        
+        publisher.publish_batch.assert_called_once_with(jobs, interval=0)
+        publisher.launch_async_browser.assert_not_awaited()
+    
+    def test_read_devtools_endpoint(self):
+        """测试从用户目录的 DevToolsActivePort 文件读取 DevTools 地址"""
+        user_data_dir = tempfile.mkdtemp()
+        self.assertIsNone(AsyncBrowser.read_devtools_endpoint(user_data_dir))
+        
+        port_file = Path(user_data_dir) / "DevToolsActivePort"
+        port_file.write_text("9222\n")
+        self.assertIsNone(AsyncBrowser.read_devtools_endpoint(user_data_dir))
+        
+        port_file.write_text("9222\n/devtools/browser/abc\n")
+        self.assertEqual(AsyncBrowser.read_devtools_endpoint(user_data_dir),
+                         "ws://127.0.0.1:9222/devtools/browser/abc")
+
 class TestConfiguration(unittest.TestCase):
     """测试配置模块"""
     
@@ -173,6 +173,8 @@ if __name__ == "__main__":
     
     # 初始化服务
     if initialize_services():
+        # 登录会话到期前自动续期
+        auth_manager.start_auto_refresh()
         print("服务初始化成功，启动HTTP API服务器...")
         uvicorn.run(app, host="0.0.0.0", port=8003)
     else:
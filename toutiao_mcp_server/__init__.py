@@ -19,6 +19,7 @@ from .server import mcp
 from .auth import TouTiaoAuth
 from .publisher import TouTiaoPublisher
 from .analytics import TouTiaoAnalytics
+from .accounts import AccountRegistry
 
 __version__ = "1.0.0"
 __author__ = "TouTiao MCP Developer"
@@ -27,5 +28,6 @@ __all__ = [
     "mcp",
     "TouTiaoAuth", 
     "TouTiaoPublisher",
-    "TouTiaoAnalytics"
+    "TouTiaoAnalytics",
+    "AccountRegistry"
 ]
\ No newline at end of file
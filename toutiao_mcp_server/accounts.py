@@ -0,0 +1,274 @@
+"""
+多账号管理模块
+
+每个头条号拥有独立的 Cookie 文件、认证会话（HTTP 连接池）、发布器（浏览器驱动池）和分析器。
+平台对单个账号的发布频率有限制，批量任务由 AccountRegistry.run_batch 分配到多个已登录账号并行发布。
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .auth import TouTiaoAuth
+from .publisher import TouTiaoPublisher
+from .analytics import TouTiaoAnalytics
+from .multi_platform_publisher import MultiPlatformPublisher
+from .config import ACCOUNTS_CONFIG, get_account_cookies_file_path, get_cookies_file_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACCOUNT = "default"
+
+
+def parse_accounts(spec: str) -> Dict[str, str]:
+    """
+    解析账号配置（ACCOUNTS_CONFIG['accounts']）
+
+    Args:
+        spec: 逗号分隔的“账号名=Cookie 文件”列表，只写账号名时使用 toutiao_cookies_<账号名>.json
+
+    Returns:
+        Dict: {账号名: Cookie 文件完整路径}，保持配置顺序；未配置时只有 default 账号
+
+    Raises:
+        ValueError: 账号名为空或重复
+    """
+    accounts: Dict[str, str] = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        name, _, cookies_file = item.partition('=')
+        name = name.strip()
+        if not name:
+            raise ValueError(f"账号配置缺少账号名: {item.strip()}")
+        if name in accounts:
+            raise ValueError(f"账号重复: {name}")
+        accounts[name] = get_account_cookies_file_path(name, cookies_file.strip() or None)
+    return accounts or {DEFAULT_ACCOUNT: get_cookies_file_path()}
+
+
+class AccountContext:
+    """一个账号的认证、发布和分析服务"""
+
+    def __init__(self, name: str, cookies_file: str):
+        """
+        初始化账号服务
+
+        Args:
+            name: 账号名
+            cookies_file: 账号的 Cookie 文件路径
+        """
+        self.name = name
+        self.auth = TouTiaoAuth(cookies_file)
+        self.publisher = TouTiaoPublisher(self.auth)
+        self.analytics = TouTiaoAnalytics(self.auth)
+        # 多平台发布器与发布器共享浏览器驱动池
+        self.multi_platform_publisher = MultiPlatformPublisher(self.auth, self.publisher)
+        # 正在执行的批量任务数，路由时优先分配给空闲账号
+        self.in_flight = 0
+
+    def close(self) -> None:
+        """关闭账号的浏览器并取消登录续期"""
+        self.publisher.close()
+        self.auth.cancel_refresh()
+
+
+class AccountRegistry:
+    """账号注册表：按账号名创建并缓存 AccountContext，并把批量任务路由到各账号"""
+
+    def __init__(self,
+                 accounts: Optional[Dict[str, str]] = None,
+                 default_account: Optional[str] = None,
+                 factory: Callable[[str, str], AccountContext] = AccountContext):
+        """
+        初始化账号注册表
+
+        Args:
+            accounts: {账号名: Cookie 文件路径}，默认按 ACCOUNTS_CONFIG['accounts'] 解析
+            default_account: 未指定账号时使用的账号，默认为 ACCOUNTS_CONFIG['default_account'] 或第一个账号
+            factory: 创建账号服务的函数
+
+        Raises:
+            ValueError: 默认账号不在账号列表中
+        """
+        self.accounts = accounts or parse_accounts(ACCOUNTS_CONFIG['accounts'])
+        self.default_account = default_account or ACCOUNTS_CONFIG['default_account'] or next(iter(self.accounts))
+        if self.default_account not in self.accounts:
+            raise ValueError(f"默认账号未配置: {self.default_account}")
+        self._factory = factory
+        self._contexts: Dict[str, AccountContext] = {}
+        self._lock = threading.Lock()
+        # start_auto_refresh 调用后，之后加载的账号也开启登录会话自动续期
+        self._auto_refresh = False
+
+    def names(self) -> List[str]:
+        """按配置顺序返回所有账号名"""
+        return list(self.accounts)
+
+    def get(self, account: Optional[str] = None) -> AccountContext:
+        """
+        获取账号服务，首次使用时创建（浏览器驱动池在借出时才启动浏览器）
+
+        Args:
+            account: 账号名，默认使用默认账号
+
+        Returns:
+            AccountContext: 账号服务
+
+        Raises:
+            ValueError: 账号未配置
+        """
+        account = account or self.default_account
+        if account not in self.accounts:
+            raise ValueError(f"未知账号: {account}，可用账号: {', '.join(self.accounts)}")
+        with self._lock:
+            context = self._contexts.get(account)
+            if context is None:
+                context = self._factory(account, self.accounts[account])
+                self._contexts[account] = context
+                logger.info(f"已加载账号 {account}: {self.accounts[account]}")
+                if self._auto_refresh:
+                    context.auth.start_auto_refresh()
+            return context
+
+    def start_auto_refresh(self) -> None:
+        """为所有账号开启登录会话自动续期（AUTH_CONFIG['auto_refresh']），由服务启动入口调用"""
+        with self._lock:
+            self._auto_refresh = True
+            loaded = list(self._contexts.values())
+        for context in loaded:
+            context.auth.start_auto_refresh()
+        # 尚未加载的账号在 get() 创建时开启
+        for name in self.names():
+            self.get(name)
+
+    def logged_in(self, accounts: Optional[List[str]] = None) -> List[str]:
+        """
+        返回已登录的账号（登录状态按 AUTH_CONFIG['login_cache_ttl'] 缓存）
+
+        Args:
+            accounts: 候选账号，默认全部账号
+        """
+        return [name for name in (accounts or self.names()) if self.get(name).auth.check_login_status()]
+
+    def route(self, jobs: List[Dict[str, Any]], accounts: Optional[List[str]] = None) -> Dict[str, List[int]]:
+        """
+        把批量任务分配到账号
+
+        指定了 account 的任务交给该账号；其余任务逐个分配给当前负载（正在执行的批量任务数
+        加本次已分配任务数）最小的已登录账号，负载相同时按账号顺序。
+
+        Args:
+            jobs: 发布任务列表，格式同 TouTiaoPublisher.publish_batch，可带 account 字段
+            accounts: 参与分配的账号，默认全部已登录账号
+
+        Returns:
+            Dict: {账号名: 分配到的任务下标列表}
+
+        Raises:
+            ValueError: 没有可用的已登录账号，或任务指定的账号未配置
+        """
+        plan: Dict[str, List[int]] = {}
+        pending = []
+        for index, job in enumerate(jobs):
+            if job.get('account'):
+                self.get(job['account'])
+                plan.setdefault(job['account'], []).append(index)
+            else:
+                pending.append(index)
+        if not pending:
+            return plan
+
+        candidates = self.logged_in(accounts)
+        if not candidates:
+            raise ValueError("没有已登录的账号")
+        with self._lock:
+            load = {name: self._contexts[name].in_flight + len(plan.get(name, [])) for name in candidates}
+        for index in pending:
+            name = min(candidates, key=lambda n: load[n])
+            plan.setdefault(name, []).append(index)
+            load[name] += 1
+        return plan
+
+    def run_batch(self,
+                  jobs: List[Dict[str, Any]],
+                  accounts: Optional[List[str]] = None,
+                  hot_editor: Optional[bool] = None,
+                  interval: float = 0) -> Dict[str, Any]:
+        """
+        把批量任务分配到多个账号，各账号在自己的浏览器中并行执行 publish_batch
+
+        Args:
+            jobs: 发布任务列表，格式同 TouTiaoPublisher.publish_batch，可带 account 字段指定账号
+            accounts: 参与分配的账号，默认全部已登录账号
+            hot_editor: 是否复用已加载的发布页面，见 publish_batch
+            interval: 同一账号相邻两次发布之间的间隔（秒）
+
+        Returns:
+            Dict: 汇总结果，results 与 jobs 顺序一致，每条结果带 account 字段；
+                accounts 为各账号分到的任务数
+        """
+        if not jobs:
+            return {'success': True, 'message': '没有需要发布的任务', 'total': 0, 'succeeded': 0,
+                    'accounts': {}, 'results': []}
+        try:
+            plan = self.route(jobs, accounts)
+        except ValueError as e:
+            return {'success': False, 'message': str(e), 'total': len(jobs), 'succeeded': 0, 'results': []}
+
+        def run(name: str, indexes: List[int]) -> Dict[str, Any]:
+            context = self.get(name)
+            with self._lock:
+                context.in_flight += 1
+            try:
+                return context.publisher.publish_batch(
+                    [{k: v for k, v in jobs[i].items() if k != 'account'} for i in indexes],
+                    hot_editor=hot_editor,
+                    interval=interval
+                )
+            except Exception as e:
+                logger.error(f"账号 {name} 批量发布异常: {e}")
+                return {'success': False, 'message': f'批量发布异常: {str(e)}', 'results': []}
+            finally:
+                with self._lock:
+                    context.in_flight -= 1
+
+        logger.info(f"批量发布 {len(jobs)} 个任务，分配到账号: "
+                    + ", ".join(f"{name}({len(indexes)})" for name, indexes in plan.items()))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        with ThreadPoolExecutor(max_workers=len(plan), thread_name_prefix="account-batch") as executor:
+            futures = {name: executor.submit(run, name, indexes) for name, indexes in plan.items()}
+            for name, future in futures.items():
+                batch = future.result()
+                batch_results = batch.get('results', [])
+                for position, index in enumerate(plan[name]):
+                    if position < len(batch_results):
+                        result = dict(batch_results[position])
+                    else:
+                        result = {'success': False, 'type': jobs[index].get('type'),
+                                  'message': batch.get('message', '未执行')}
+                    result['account'] = name
+                    results[index] = result
+
+        succeeded = sum(1 for result in results if result.get('success'))
+        logger.info(f"多账号批量发布完成: 成功 {succeeded}/{len(jobs)}")
+        return {
+            'success': succeeded == len(jobs),
+            'message': f'成功发布 {succeeded}/{len(jobs)} 个任务',
+            'total': len(jobs),
+            'succeeded': succeeded,
+            'accounts': {name: len(indexes) for name, indexes in plan.items()},
+            'results': results
+        }
+
+    def close(self) -> None:
+        """关闭所有已加载账号的浏览器"""
+        with self._lock:
+            contexts = list(self._contexts.values())
+            self._contexts.clear()
+        for context in contexts:
+            try:
+                context.close()
+            except Exception as e:
+                logger.warning(f"关闭账号 {context.name} 失败: {e}")
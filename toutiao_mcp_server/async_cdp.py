@@ -0,0 +1,379 @@
+"""
+异步 DevTools 协议（CDP）浏览器后端
+
+在 asyncio 中通过 websocket 直接与 Chrome 通信，不经过 chromedriver。一个事件循环中
+可以同时驱动多个页面，等待页面状态时只占用一次 asyncio.sleep，不占用线程。
+需要安装可选依赖 websockets（pip install .[async]）。
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from .cdp import _COMMIT_INPUT_SCRIPT, _FOCUS_AND_SELECT_SCRIPT
+from .waits import _JS_HELPERS
+
+try:
+    import websockets
+except ImportError:  # websockets 为可选依赖
+    websockets = None
+
+logger = logging.getLogger(__name__)
+
+# 常见的 Chrome/Chromium 可执行文件名
+CHROME_BINARY_NAMES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+
+# Chrome 以 --remote-debugging-port=0 启动后把实际端口和浏览器 websocket 路径写入用户目录下的该文件
+DEVTOOLS_PORT_FILE = "DevToolsActivePort"
+
+
+class CDPError(Exception):
+    """CDP 命令返回错误"""
+
+
+class CDPConnection:
+    """一条 CDP websocket 连接，按消息 id 匹配命令和响应"""
+
+    def __init__(self, transport: Any):
+        """
+        初始化连接
+
+        Args:
+            transport: 已建立的 websocket 连接，需提供 send(str)、recv() 和 close() 协程
+        """
+        self.transport = transport
+        self._next_id = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    def start(self) -> "CDPConnection":
+        """在当前事件循环中启动读取任务"""
+        self._reader = asyncio.get_running_loop().create_task(self._read())
+        return self
+
+    async def send(self,
+                   method: str,
+                   params: Optional[Dict[str, Any]] = None,
+                   session_id: Optional[str] = None,
+                   timeout: float = 30) -> Dict[str, Any]:
+        """
+        发送一条 CDP 命令并等待响应
+
+        Args:
+            method: 命令名，如 Runtime.evaluate
+            params: 命令参数
+            session_id: 目标页面的会话 ID，浏览器级命令不需要
+            timeout: 等待响应的最长时间（秒）
+
+        Returns:
+            Dict: 命令结果
+
+        Raises:
+            CDPError: 命令返回错误
+            ConnectionError: 连接已断开
+        """
+        self._next_id += 1
+        message: Dict[str, Any] = {'id': self._next_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = future
+        try:
+            await self.transport.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message['id'], None)
+
+    async def _read(self) -> None:
+        """读取任务：把响应交给对应的等待者，事件消息直接忽略"""
+        try:
+            while True:
+                message = json.loads(await self.transport.recv())
+                future = self._pending.get(message.get('id'))
+                if future is None or future.done():
+                    continue
+                if 'error' in message:
+                    future.set_exception(CDPError(message['error'].get('message', str(message['error']))))
+                else:
+                    future.set_result(message.get('result', {}))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"CDP 连接已断开: {e}"))
+
+    async def close(self) -> None:
+        """关闭连接"""
+        if self._reader:
+            self._reader.cancel()
+        try:
+            await self.transport.close()
+        except Exception as e:
+            logger.debug(f"关闭 CDP 连接异常: {e}")
+
+
+class AsyncPage:
+    """浏览器中的一个页面（标签页）"""
+
+    def __init__(self, connection: CDPConnection, target_id: str, session_id: str, poll_interval: float = 0.1):
+        """
+        初始化页面
+
+        Args:
+            connection: 浏览器连接
+            target_id: 页面的目标 ID
+            session_id: 页面的会话 ID
+            poll_interval: 条件轮询间隔（秒）
+        """
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+        self.poll_interval = poll_interval
+        # 各等待条件的实际耗时，格式同 PageWaiter.records
+        self.records: List[Dict[str, Any]] = []
+
+    async def send(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """向本页面发送 CDP 命令"""
+        return await self.connection.send(method, params, session_id=self.session_id)
+
+    async def navigate(self, url: str) -> None:
+        """发起跳转，由后续的条件等待判断页面是否就绪"""
+        await self.send('Page.navigate', {'url': url})
+
+    async def evaluate(self, script: str, *args: Any, by_value: bool = True) -> Any:
+        """
+        执行一段脚本，语义与 execute_script 一致（arguments 为传入的参数，需可 JSON 序列化）
+
+        Args:
+            script: 脚本，需以 return 返回结果，可使用 isVisible/firstVisible 等辅助函数
+            *args: 传给脚本的 arguments
+            by_value: 是否按值返回结果；为 False 时返回远程对象 ID（如 DOM 元素）
+
+        Returns:
+            脚本返回值，或远程对象 ID
+        """
+        expression = f"(function() {{ {_JS_HELPERS} {script} }}).apply(null, {json.dumps(args)})"
+        response = await self.send('Runtime.evaluate', {'expression': expression, 'returnByValue': by_value})
+        if 'exceptionDetails' in response:
+            details = response['exceptionDetails']
+            raise CDPError(details.get('exception', {}).get('description') or details.get('text', '脚本执行异常'))
+        result = response.get('result', {})
+        return result.get('value') if by_value else result.get('objectId')
+
+    async def evaluate_on(self, selector: str, script: str, *args: Any) -> Any:
+        """对第一个匹配选择器的可见元素执行脚本，元素作为 arguments[0]，其余参数依次后移"""
+        return await self.evaluate(f"""
+            var el = firstVisible(arguments[0]);
+            if (!el) {{ throw new Error('元素不存在: ' + arguments[0]); }}
+            return (function() {{ {script} }}).apply(null, [el].concat(Array.prototype.slice.call(arguments, 1)));
+        """, selector, *args)
+
+    async def wait_js(self, name: str, script: str, timeout: float, *args: Any, required: bool = True) -> Any:
+        """
+        轮询一段返回真值即满足的脚本，轮询间隔使用 asyncio.sleep，不占用线程
+
+        Args:
+            name: 条件名称
+            script: 条件脚本
+            timeout: 超时时间（秒）
+            *args: 传给脚本的 arguments
+            required: 超时是否抛出 TimeoutError
+
+        Returns:
+            脚本的真值结果，超时且非必需时返回 None
+        """
+        start = time.monotonic()
+        result = None
+        while True:
+            try:
+                result = await self.evaluate(script, *args)
+            except (CDPError, asyncio.TimeoutError) as e:
+                # 页面跳转期间执行上下文会被销毁，视为条件尚未满足
+                logger.debug(f"等待条件 {name} 时脚本执行异常: {e}")
+                result = None
+            if result or time.monotonic() - start >= timeout:
+                break
+            await asyncio.sleep(self.poll_interval)
+
+        elapsed = round(time.monotonic() - start, 3)
+        self.records.append({'name': name, 'timeout': timeout, 'waited': elapsed, 'satisfied': bool(result)})
+        if not result:
+            logger.warning(f"等待条件 {name} 超时（{timeout}秒）")
+            if required:
+                raise TimeoutError(f"等待条件 {name} 超时（{timeout}秒）")
+            return None
+        logger.debug(f"条件 {name} 满足，等待 {elapsed} 秒")
+        return result
+
+    async def click_xpath(self, name: str, xpath: str, timeout: float, required: bool = True) -> bool:
+        """等待匹配 XPath 的第一个可见且可用的元素并点击，返回是否已点击"""
+        return bool(await self.wait_js(name, """
+            var el = firstVisibleXPath(arguments[0]);
+            if (!isEnabled(el)) { return false; }
+            el.scrollIntoView({block: 'center'});
+            el.click();
+            return true;
+        """, timeout, xpath, required=required))
+
+    async def insert_text(self, selector: str, text: str, replace: bool = True) -> None:
+        """
+        通过一次 Input.insertText 把整段文本写入匹配选择器的输入框或可编辑区域，
+        与 cdp.insert_text 相同地触发输入事件
+        """
+        await self.evaluate_on(selector, _FOCUS_AND_SELECT_SCRIPT, replace)
+        await self.send('Input.insertText', {'text': text})
+        await self.evaluate_on(selector, _COMMIT_INPUT_SCRIPT)
+
+    async def set_files(self, selector: str, paths: List[str]) -> None:
+        """把本地文件一次性提交到文件输入框"""
+        object_id = await self.evaluate(
+            "var el = document.querySelector(arguments[0]); if (el) { el.multiple = true; } return el;",
+            selector, by_value=False
+        )
+        if not object_id:
+            raise CDPError(f"未找到文件输入框: {selector}")
+        await self.send('DOM.setFileInputFiles', {'files': paths, 'objectId': object_id})
+
+    async def close(self) -> None:
+        """关闭页面"""
+        try:
+            await self.connection.send('Target.closeTarget', {'targetId': self.target_id})
+        except Exception as e:
+            logger.debug(f"关闭页面异常: {e}")
+
+
+class AsyncBrowser:
+    """通过 CDP 驱动的 Chrome 浏览器"""
+
+    def __init__(self, connection: CDPConnection, process: Any = None, user_data_dir: Optional[str] = None):
+        """
+        初始化浏览器
+
+        Args:
+            connection: 浏览器级 CDP 连接
+            process: 本进程启动的 Chrome 子进程，连接已有浏览器时为 None
+            user_data_dir: 启动时创建的临时用户目录，关闭时删除
+        """
+        self.connection = connection
+        self.process = process
+        self.user_data_dir = user_data_dir
+
+    @staticmethod
+    def find_binary() -> Optional[str]:
+        """在 PATH 中查找 Chrome 可执行文件"""
+        for name in CHROME_BINARY_NAMES:
+            path = shutil.which(name)
+            if path:
+                return path
+        return None
+
+    @classmethod
+    async def connect(cls, ws_url: str, process: Any = None, user_data_dir: Optional[str] = None) -> "AsyncBrowser":
+        """
+        连接到浏览器的 DevTools websocket 地址
+
+        Raises:
+            RuntimeError: 未安装 websockets
+        """
+        if websockets is None:
+            raise RuntimeError("异步 CDP 后端需要安装 websockets：pip install websockets")
+        transport = await websockets.connect(ws_url, max_size=None)
+        return cls(CDPConnection(transport).start(), process, user_data_dir)
+
+    @staticmethod
+    def read_devtools_endpoint(user_data_dir: str) -> Optional[str]:
+        """
+        读取用户目录下 DevToolsActivePort 文件中的 DevTools websocket 地址
+
+        Returns:
+            str: ws://127.0.0.1:<端口><路径>，文件尚未写完整时返回 None
+        """
+        try:
+            with open(os.path.join(user_data_dir, DEVTOOLS_PORT_FILE), 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return None
+        if len(lines) < 2 or not lines[0].strip().isdigit() or not lines[1].startswith('/'):
+            return None
+        return f"ws://127.0.0.1:{lines[0].strip()}{lines[1].strip()}"
+
+    @classmethod
+    async def launch(cls,
+                     arguments: Optional[List[str]] = None,
+                     binary: Optional[str] = None,
+                     headless: bool = True,
+                     timeout: float = 30) -> "AsyncBrowser":
+        """
+        启动 Chrome 并连接其 DevTools 地址
+
+        Args:
+            arguments: 额外的 Chrome 命令行参数
+            binary: Chrome 可执行文件路径，默认在 PATH 中查找
+            headless: 是否无头运行
+            timeout: 等待浏览器写出 DevTools 地址的最长时间（秒）
+
+        Raises:
+            RuntimeError: 未找到 Chrome 或浏览器启动超时
+        """
+        binary = binary or cls.find_binary()
+        if not binary:
+            raise RuntimeError("未找到 Chrome 浏览器，请通过 TOUTIAO_CHROME_BINARY 指定路径")
+        user_data_dir = tempfile.mkdtemp(prefix="toutiao-cdp-")
+        command = [binary, "--remote-debugging-port=0", f"--user-data-dir={user_data_dir}", *(arguments or [])]
+        if headless:
+            command.append("--headless=new")
+        command.append("about:blank")
+        # 输出不接管道：浏览器长时间运行时持续写 stderr，无人读取的管道写满后会阻塞浏览器
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+        )
+
+        async def read_endpoint() -> str:
+            while True:
+                ws_url = cls.read_devtools_endpoint(user_data_dir)
+                if ws_url:
+                    return ws_url
+                if process.returncode is not None:
+                    raise RuntimeError(f"Chrome 启动失败（退出码 {process.returncode}），未写出 DevTools 地址")
+                await asyncio.sleep(0.05)
+
+        try:
+            ws_url = await asyncio.wait_for(read_endpoint(), timeout)
+            logger.info(f"Chrome 已启动，DevTools 地址: {ws_url}")
+            return await cls.connect(ws_url, process, user_data_dir)
+        except BaseException:
+            process.kill()
+            await process.wait()
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise
+
+    async def new_page(self) -> AsyncPage:
+        """打开一个新页面并附加会话"""
+        target = await self.connection.send('Target.createTarget', {'url': 'about:blank'})
+        attached = await self.connection.send(
+            'Target.attachToTarget', {'targetId': target['targetId'], 'flatten': True}
+        )
+        return AsyncPage(self.connection, target['targetId'], attached['sessionId'])
+
+    async def close(self) -> None:
+        """关闭连接；浏览器由本进程启动时同时退出浏览器并删除临时用户目录"""
+        if self.process is not None:
+            try:
+                await self.connection.send('Browser.close', timeout=5)
+            except Exception as e:
+                logger.debug(f"关闭浏览器命令异常: {e}")
+        await self.connection.close()
+        if self.process is not None:
+            try:
+                await asyncio.wait_for(self.process.wait(), 5)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        if self.user_data_dir and os.path.isdir(self.user_data_dir):
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
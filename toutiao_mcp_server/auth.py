@@ -2,31 +2,81 @@
 今日头条认证模块
 """
 
-import json
 import os
 import time
 import logging
-from typing import Dict, Optional, Any
+import threading
+from typing import Dict, Optional, Any, Tuple
 from pathlib import Path
+from urllib.parse import urlsplit
 
 import requests
+from requests.cookies import create_cookie
+from http.cookiejar import Cookie
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 
 from .config import (
     TOUTIAO_URLS, 
+    AUTH_CONFIG,
     DEFAULT_HEADERS, 
     SELENIUM_CONFIG,
     get_cookies_file_path
 )
+from .chromedriver import create_chrome_driver
+from .cookie_store import CookieStore
 
 logger = logging.getLogger(__name__)
 
+
+def cookie_from_dict(cookie: Dict[str, Any]) -> Cookie:
+    """
+    把 Selenium 格式的 Cookie 字典转换为 cookiejar 中的 Cookie
+
+    Args:
+        cookie: driver.get_cookies() 返回的 Cookie 字典
+
+    Returns:
+        Cookie: 保留过期时间、path、secure、httpOnly 和 sameSite 标记的 Cookie
+    """
+    rest: Dict[str, Any] = {}
+    if cookie.get('httpOnly'):
+        rest['HttpOnly'] = None
+    if cookie.get('sameSite'):
+        rest['SameSite'] = cookie['sameSite']
+    expiry = cookie.get('expiry')
+    return create_cookie(
+        cookie['name'],
+        cookie['value'],
+        domain=cookie.get('domain', '.toutiao.com'),
+        path=cookie.get('path') or '/',
+        secure=bool(cookie.get('secure', False)),
+        expires=int(expiry) if expiry else None,
+        rest=rest
+    )
+
+
+def cookie_to_dict(cookie: Cookie) -> Dict[str, Any]:
+    """把 cookiejar 中的 Cookie 转换为与 driver.get_cookies() 相同格式的字典"""
+    data: Dict[str, Any] = {
+        'name': cookie.name,
+        'value': cookie.value,
+        'domain': cookie.domain,
+        'path': cookie.path or '/',
+        'secure': bool(cookie.secure),
+        'httpOnly': cookie.has_nonstandard_attr('HttpOnly')
+    }
+    if cookie.expires:
+        data['expiry'] = cookie.expires
+    same_site = cookie.get_nonstandard_attr('SameSite')
+    if same_site:
+        data['sameSite'] = same_site
+    return data
+
+
 class TouTiaoAuth:
     """今日头条认证管理类"""
     
@@ -35,25 +85,38 @@ class TouTiaoAuth:
         初始化认证管理器
         """
         self.cookies_file = cookies_file or get_cookies_file_path()
+        # 加锁、原子替换的 Cookie 文件，其他进程更新后由 reload_cookies_if_changed 重新加载
+        self.cookie_store = CookieStore(self.cookies_file, AUTH_CONFIG['cookie_reload_interval'])
         self.session = requests.Session()
         self.session.headers.update(DEFAULT_HEADERS)
+        # 当前 Cookie 的版本（保存时写入的纳秒时间戳，逐次递增），浏览器据此判断是否需要重新注入 Cookie
+        self.cookies_version: int = 0
+        # 登录状态缓存：(是否已登录, 检查时的 monotonic 时间)，见 check_login_status
+        self._login_cache: Optional[Tuple[bool, float]] = None
+        # 最近一次 user_info 接口返回的用户信息，与登录状态缓存同时有效
+        self._user_info: Optional[Dict[str, Any]] = None
+        self._login_lock = threading.Lock()
+        # 任何请求返回鉴权失败时使登录状态缓存失效
+        self.session.hooks['response'].append(self._on_response)
+        # 关键登录 Cookie（AUTH_CONFIG['critical_cookies']）的到期时间索引：{名称: Unix 时间戳或 None}
+        self.critical_cookies: Dict[str, Optional[float]] = {}
+        self._refresh_timer: Optional[threading.Timer] = None
+        # 是否已由服务启动入口开启自动续期（start_auto_refresh），创建对象时不启动定时器
+        self._auto_refresh = False
         self._load_cookies()
     
     def _load_cookies(self) -> None:
-        """从文件加载 Cookie"""
+        """从文件加载 Cookie，替换 session 中已有的 Cookie"""
         try:
-            if Path(self.cookies_file).exists():
-                with open(self.cookies_file, 'r', encoding='utf-8') as f:
-                    cookies_data = json.load(f)
-                    
-                # 将 Cookie 添加到 session
+            cookies_data = self.cookie_store.read()
+            if cookies_data is not None:
+                # 将 Cookie 添加到 session，保留过期时间和 secure/httpOnly 等标记
+                self.session.cookies.clear()
                 for cookie in cookies_data.get('cookies', []):
-                    self.session.cookies.set(
-                        cookie['name'], 
-                        cookie['value'],
-                        domain=cookie.get('domain', '.toutiao.com')
-                    )
+                    self.session.cookies.set_cookie(cookie_from_dict(cookie))
+                self._index_critical_cookies()
                     
+                self.cookies_version = cookies_data.get('version') or Path(self.cookies_file).stat().st_mtime_ns
                 logger.info(f"已加载 {len(cookies_data.get('cookies', []))} 个 Cookie")
         except Exception as e:
             logger.warning(f"加载 Cookie 失败: {e}")
@@ -61,16 +124,16 @@ class TouTiaoAuth:
     def _save_cookies(self, cookies: list) -> None:
         """保存 Cookie 到文件"""
         try:
-            # 确保目录存在
-            Path(self.cookies_file).parent.mkdir(parents=True, exist_ok=True)
-            
+            # 同一秒内多次保存也要得到不同的版本，版本随文件保存，其他进程加载后一致
             cookies_data = {
                 'cookies': cookies,
-                'timestamp': int(time.time())
+                'timestamp': int(time.time()),
+                'version': max(time.time_ns(), self.cookies_version + 1)
             }
+            self.cookies_version = cookies_data['version']
+            self.invalidate_login_cache()
             
-            with open(self.cookies_file, 'w', encoding='utf-8') as f:
-                json.dump(cookies_data, f, ensure_ascii=False, indent=2)
+            self.cookie_store.write(cookies_data)
                 
             logger.info(f"已保存 {len(cookies)} 个 Cookie")
         except Exception as e:
@@ -91,11 +154,10 @@ class TouTiaoAuth:
         if SELENIUM_CONFIG.get('headless', False):
             chrome_options.add_argument('--headless')
 
-        # 使用 webdriver-manager 自动管理 ChromeDriver
+        # 使用进程级缓存的 ChromeDriver 路径，避免每次都联网解析
         try:
             logger.info("正在准备 ChromeDriver...")
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
+            driver = create_chrome_driver(chrome_options)
             logger.info("ChromeDriver 初始化成功")
         except Exception as e:
             logger.error(f"ChromeDriver 初始化失败: {e}")
@@ -172,11 +234,10 @@ class TouTiaoAuth:
                 
                 # 更新 session 的 Cookie
                 for cookie in cookies:
-                    self.session.cookies.set(
-                        cookie['name'], 
-                        cookie['value'],
-                        domain=cookie.get('domain', '.toutiao.com')
-                    )
+                    self.session.cookies.set_cookie(cookie_from_dict(cookie))
+                self._index_critical_cookies()
+                if self._auto_refresh:
+                    self.schedule_refresh()
                 
                 logger.info("登录成功，已保存 Cookie")
                 return True
@@ -191,13 +252,202 @@ class TouTiaoAuth:
             if driver:
                 driver.quit()
     
-    def check_login_status(self) -> bool:
+    def _on_response(self, response: requests.Response, *args, **kwargs) -> None:
+        """
+        session 响应钩子：返回 401/403 或被重定向到登录页时使登录状态缓存失效；
+        服务器下发新的关键登录 Cookie 时更新到期时间索引
+        """
+        # 钩子在 session 合并响应 Cookie 之前执行，直接用响应中的 Cookie 更新索引
+        for cookie in response.cookies:
+            if cookie.name in AUTH_CONFIG['critical_cookies']:
+                self.critical_cookies[cookie.name] = cookie.expires or None
+        login_path = urlsplit(TOUTIAO_URLS['login']).path
+        if response.status_code in (401, 403) or urlsplit(response.url or '').path.startswith(login_path):
+            if self._login_cache is not None:
+                logger.info(f"请求返回鉴权失败（{response.status_code} {response.url}），登录状态缓存失效")
+            self.invalidate_login_cache()
+    
+    def reload_cookies_if_changed(self) -> bool:
+        """
+        Cookie 文件被其他进程更新（重新登录、续期）或删除时重新加载
+        
+        检查间隔见 AUTH_CONFIG['cookie_reload_interval']。重新加载后登录状态缓存失效，
+        cookies_version 随文件更新，浏览器下次借出时重新注入 Cookie。
+        
+        Returns:
+            bool: 是否重新加载了 Cookie
+        """
+        if not self.cookie_store.changed():
+            return False
+        logger.info("检测到 Cookie 文件已被其他进程更新，重新加载")
+        if Path(self.cookies_file).exists():
+            self._load_cookies()
+        else:
+            self.session.cookies.clear()
+            self.critical_cookies = {}
+            self.cookies_version = 0
+            self.cookie_store.read()
+        self.invalidate_login_cache()
+        self._user_info = None
+        if self._auto_refresh:
+            self.schedule_refresh()
+        return True
+    
+    def invalidate_login_cache(self) -> None:
+        """使登录状态缓存失效，下次 check_login_status 重新检查"""
+        self._login_cache = None
+    
+    def _index_critical_cookies(self) -> None:
+        """从 session 中重建关键登录 Cookie 的到期时间索引，同名 Cookie 取最晚的到期时间"""
+        index: Dict[str, Optional[float]] = {}
+        for cookie in self.session.cookies:
+            if cookie.name not in AUTH_CONFIG['critical_cookies']:
+                continue
+            if cookie.name in index and (index[cookie.name] is None or not cookie.expires):
+                index[cookie.name] = None
+            else:
+                index[cookie.name] = max(cookie.expires, index.get(cookie.name) or 0) if cookie.expires else None
+        self.critical_cookies = index
+    
+    def session_expiry(self) -> Optional[float]:
+        """
+        登录会话的到期时间：关键登录 Cookie 中最早的到期时间
+        
+        没有关键登录 Cookie 时取 session 中所有设置了过期时间的 Cookie 的最早到期时间。
+        
+        Returns:
+            float: Unix 时间戳，Cookie 均为会话 Cookie 时返回 None
+        """
+        if self.critical_cookies:
+            expiries = [expiry for expiry in self.critical_cookies.values() if expiry]
+        else:
+            expiries = [cookie.expires for cookie in self.session.cookies if cookie.expires]
+        return min(expiries) if expiries else None
+    
+    def is_session_expired(self) -> bool:
+        """不发请求判断登录会话是否已确定过期（有关键登录 Cookie 已到期）"""
+        if not self.critical_cookies:
+            return False
+        expiry = self.session_expiry()
+        return expiry is not None and time.time() >= expiry
+    
+    def _login_cache_valid(self, ttl: float) -> bool:
+        """缓存的登录状态是否仍可使用：未超过 TTL，且已登录时 Cookie 尚未到期"""
+        if self._login_cache is None or ttl <= 0:
+            return False
+        logged_in, checked_at = self._login_cache
+        if time.monotonic() - checked_at >= ttl:
+            return False
+        expiry = self.session_expiry()
+        if logged_in and expiry is not None and time.time() >= expiry:
+            logger.info("登录 Cookie 已到期，重新检查登录状态")
+            return False
+        return True
+    
+    def check_login_status(self, force: bool = False) -> bool:
         """
         检查当前登录状态
         
+        优先请求 user_info JSON 接口读取登录标记（同时缓存用户信息），接口无法判断时
+        回退为检查创作者中心首页。结果按 AUTH_CONFIG['login_cache_ttl'] 缓存，连续调用不再重复请求；
+        最早的 Cookie 到期、请求返回鉴权失败、重新保存 Cookie 或登出时缓存提前失效；
+        网络异常等无法判断的结果不缓存。并发调用时只有一个线程发出请求，其余等待其结果。
+        关键登录 Cookie 已到期时直接返回 False，不发请求。
+        
+        Args:
+            force: 是否忽略缓存重新检查
+            
         Returns:
             bool: 是否已登录
         """
+        ttl = AUTH_CONFIG['login_cache_ttl']
+        self.reload_cookies_if_changed()
+        with self._login_lock:
+            if self.is_session_expired():
+                logger.warning("关键登录 Cookie 已过期，请重新登录")
+                self._login_cache = (False, time.monotonic())
+                self._user_info = None
+                return False
+            if not force and self._login_cache_valid(ttl):
+                return self._login_cache[0]
+            logged_in = self._fetch_login_status()
+            if logged_in is not None and ttl > 0:
+                self._login_cache = (logged_in, time.monotonic())
+            return bool(logged_in)
+    
+    def _fetch_login_status(self) -> Optional[bool]:
+        """
+        请求 user_info 接口判断登录状态，接口无法判断时检查创作者中心首页
+        
+        Returns:
+            bool: 是否已登录，无法判断时返回 None
+        """
+        logged_in = self._probe_user_info()
+        if logged_in is not None:
+            logger.info(f"登录状态接口返回: {'已登录' if logged_in else '未登录'}")
+            return logged_in
+        logger.info("登录状态接口无法判断，改为检查创作者中心首页")
+        return self._scan_homepage()
+    
+    @staticmethod
+    def _parse_user_info(body: Dict[str, Any]) -> Tuple[Optional[bool], Dict[str, Any]]:
+        """
+        解析 user_info 接口的响应
+        
+        Returns:
+            Tuple: (登录标记，响应中没有登录标记时为 None, 用户信息)
+        """
+        data = body.get('data') if isinstance(body.get('data'), dict) else {}
+        flag = next((source[key] for source in (data, body)
+                     for key in ('is_login', 'login_status', 'is_logged_in') if key in source), None)
+        if flag is None:
+            return None, {}
+        logged_in = bool(flag)
+        user_id = data.get('user_id') or data.get('id')
+        return logged_in, {
+            'login_status': logged_in,
+            'user_id': str(user_id) if user_id else None,
+            'media_id': str(data['media_id']) if data.get('media_id') else None,
+            'username': data.get('user_name') or data.get('screen_name') or data.get('name'),
+            'nickname': data.get('screen_name') or data.get('name') or data.get('nickname'),
+            'avatar': data.get('avatar_url') or data.get('avatar'),
+            'followers_count': int(data.get('followers_count') or data.get('fans_count') or 0),
+            'following_count': int(data.get('following_count') or data.get('follow_count') or 0)
+        }
+    
+    def _probe_user_info(self) -> Optional[bool]:
+        """
+        请求 user_info JSON 接口读取登录标记，已登录时更新缓存的用户信息
+        
+        Returns:
+            bool: 是否已登录，接口异常、返回非 JSON 或没有登录标记时返回 None
+        """
+        try:
+            response = self.session.get(TOUTIAO_URLS['user_info'], timeout=AUTH_CONFIG['probe_timeout'])
+            if response.status_code in (401, 403):
+                self._user_info = None
+                return False
+            if response.status_code != 200:
+                logger.warning(f"登录状态接口返回状态码: {response.status_code}")
+                return None
+            body = response.json()
+        except Exception as e:
+            logger.warning(f"请求登录状态接口失败: {e}")
+            return None
+        if not isinstance(body, dict):
+            return None
+        logged_in, user_info = self._parse_user_info(body)
+        if logged_in is not None:
+            self._user_info = user_info if logged_in else None
+        return logged_in
+    
+    def _scan_homepage(self) -> Optional[bool]:
+        """
+        请求创作者中心首页，按页面内容判断登录状态
+        
+        Returns:
+            bool: 是否已登录，服务器错误或网络异常等无法判断时返回 None
+        """
         try:
             # 尝试访问创作者中心首页
             homepage_url = TOUTIAO_URLS['homepage']
@@ -232,44 +482,104 @@ class TouTiaoAuth:
                     return True
             
             logger.warning(f"登录状态验证失败 - 状态码: {response.status_code}")
-            return False
+            return None if response.status_code >= 500 else False
             
         except Exception as e:
             logger.error(f"检查登录状态失败: {e}")
-            return False
+            return None
     
-    def get_user_info(self) -> Optional[Dict[str, Any]]:
+    def get_user_info(self, refresh: bool = False) -> Optional[Dict[str, Any]]:
         """
         获取当前登录用户信息
         
+        与 check_login_status 共用 user_info 接口的同一次请求：登录状态缓存有效时直接返回
+        缓存的用户信息，否则请求接口并同时更新登录状态缓存。
+        
+        Args:
+            refresh: 是否忽略缓存重新请求
+            
         Returns:
-            Dict: 用户信息字典，失败时返回 None
+            Dict: 用户信息字典，未登录或获取失败时返回 None
         """
-        try:
-            response = self.session.get(TOUTIAO_URLS['user_info'], timeout=10)
+        ttl = AUTH_CONFIG['login_cache_ttl']
+        self.reload_cookies_if_changed()
+        with self._login_lock:
+            if not refresh and self._user_info and self._login_cache_valid(ttl) and self._login_cache[0]:
+                return dict(self._user_info)
+            logged_in = self._probe_user_info()
+            if logged_in is not None and ttl > 0:
+                self._login_cache = (logged_in, time.monotonic())
+            user_info = dict(self._user_info) if logged_in and self._user_info else None
+        
+        if logged_in is None:
+            logger.error("获取用户信息失败：登录状态接口无法判断")
+        elif user_info:
+            logger.info(f"获取用户信息成功: {user_info.get('nickname')}")
+        return user_info
+    
+    def start_auto_refresh(self) -> Optional[float]:
+        """
+        按 AUTH_CONFIG['auto_refresh'] 开启自动续期，之后重新登录或重新加载 Cookie 时自动重新安排
+
+        由服务启动入口调用，创建认证对象时不启动续期定时器。
+
+        Returns:
+            float: 距离续期的秒数；未开启或没有可续期的会话时返回 None
+        """
+        if not AUTH_CONFIG['auto_refresh']:
+            return None
+        self._auto_refresh = True
+        return self.schedule_refresh()
+    
+    def schedule_refresh(self, margin: Optional[float] = None) -> Optional[float]:
+        """
+        在登录会话到期前 margin 秒安排一次续期（refresh_session），替换已安排的续期
+        
+        Args:
+            margin: 提前的秒数，默认使用 AUTH_CONFIG['refresh_margin']
             
-            if response.status_code == 200:
-                # 这里需要根据实际的页面结构来解析用户信息
-                # 由于今日头条的页面结构可能变化，这里提供一个基本框架
-                user_info = {
-                    'login_status': True,
-                    'user_id': None,
-                    'username': None,
-                    'nickname': None,
-                    'avatar': None,
-                    'followers_count': 0,
-                    'following_count': 0
-                }
-                
-                logger.info("获取用户信息成功")
-                return user_info
-            else:
-                logger.error(f"获取用户信息失败，状态码: {response.status_code}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"获取用户信息异常: {e}")
+        Returns:
+            float: 距离续期的秒数；没有到期时间或会话已过期时不安排，返回 None
+        """
+        self.cancel_refresh()
+        expiry = self.session_expiry()
+        if expiry is None or time.time() >= expiry:
             return None
+        margin = AUTH_CONFIG['refresh_margin'] if margin is None else margin
+        delay = max(expiry - margin - time.time(), 0)
+        self._refresh_timer = threading.Timer(delay, self.refresh_session)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+        logger.info(f"登录会话将于 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(expiry))} 到期，"
+                    f"{delay:.0f} 秒后尝试续期")
+        return delay
+    
+    def cancel_refresh(self) -> None:
+        """取消已安排的续期"""
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+    
+    def refresh_session(self) -> bool:
+        """
+        请求登录状态接口续期登录会话
+        
+        服务器下发到期时间更晚的关键登录 Cookie 时写回 Cookie 文件并按新的到期时间安排下一次续期；
+        未能延长时记录警告，需要重新运行登录脚本。
+        
+        Returns:
+            bool: 是否延长了登录会话
+        """
+        before = self.session_expiry()
+        logged_in = self.check_login_status(force=True)
+        after = self.session_expiry()
+        if logged_in and after and (before is None or after > before):
+            self._save_cookies([cookie_to_dict(cookie) for cookie in self.session.cookies])
+            logger.info(f"登录会话已续期至 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(after))}")
+            self.schedule_refresh()
+            return True
+        logger.warning("登录会话未能续期，到期后需要重新运行登录脚本")
+        return False
     
     def logout(self) -> bool:
         """
@@ -281,10 +591,13 @@ class TouTiaoAuth:
         try:
             # 清除 session 中的 Cookie
             self.session.cookies.clear()
+            self.invalidate_login_cache()
+            self._user_info = None
+            self.critical_cookies = {}
+            self.cancel_refresh()
             
             # 删除本地 Cookie 文件
-            if Path(self.cookies_file).exists():
-                Path(self.cookies_file).unlink()
+            self.cookie_store.delete()
                 
             logger.info("已清除登录信息")
             return True
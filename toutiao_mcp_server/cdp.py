@@ -0,0 +1,149 @@
+"""
+Chrome DevTools 协议（CDP）辅助模块
+
+封装发布流程中用到的 CDP 命令，单次调用完成原本需要多次 WebDriver 往返的操作。
+"""
+
+import logging
+from http.cookiejar import Cookie
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def supports_cdp(driver: Any) -> bool:
+    """驱动是否支持执行 CDP 命令（仅 Chromium 系驱动支持）"""
+    return callable(getattr(driver, 'execute_cdp_cmd', None))
+
+
+def cookie_to_cdp(cookie: Cookie) -> Dict[str, Any]:
+    """
+    将 requests/cookiejar 中的 Cookie 转换为 Network.setCookies 的参数格式
+
+    Args:
+        cookie: cookiejar 中的 Cookie
+
+    Returns:
+        Dict: CDP CookieParam，保留过期时间、httpOnly 和 secure 标记
+    """
+    param: Dict[str, Any] = {
+        'name': cookie.name,
+        'value': cookie.value or '',
+        'domain': cookie.domain,
+        'path': cookie.path or '/',
+        'secure': bool(cookie.secure),
+        'httpOnly': cookie.has_nonstandard_attr('HttpOnly') or cookie.has_nonstandard_attr('httponly'),
+    }
+    if cookie.expires:
+        param['expires'] = cookie.expires
+    same_site = cookie.get_nonstandard_attr('SameSite')
+    if same_site and same_site.capitalize() in ('Strict', 'Lax', 'None'):
+        param['sameSite'] = same_site.capitalize()
+    return param
+
+
+def set_cookies(driver: Any, cookies: Iterable[Cookie], domain_keyword: Optional[str] = None) -> int:
+    """
+    通过一次 Network.setCookies 调用把 Cookie 全部写入浏览器，无需先打开页面
+
+    Args:
+        driver: 浏览器驱动
+        cookies: Cookie 集合（如 requests 的 cookie jar）
+        domain_keyword: 仅写入域名包含该关键字的 Cookie
+
+    Returns:
+        int: 写入的 Cookie 数量
+
+    Raises:
+        Exception: 驱动不支持 CDP 或命令执行失败
+    """
+    params: List[Dict[str, Any]] = [
+        cookie_to_cdp(cookie) for cookie in cookies
+        if cookie.domain and (not domain_keyword or domain_keyword in cookie.domain)
+    ]
+    if params:
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': params})
+    return len(params)
+
+
+def set_blocked_urls(driver: Any, patterns: List[str]) -> None:
+    """
+    屏蔽匹配的网络请求（统计上报、字体、广告等），对当前标签页后续的所有请求生效
+
+    Args:
+        driver: 浏览器驱动
+        patterns: URL 匹配模式列表，支持 * 通配符
+
+    Raises:
+        Exception: 驱动不支持 CDP 或命令执行失败
+    """
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+
+
+# 聚焦元素并选中已有内容，后续插入的文本替换选区
+_FOCUS_AND_SELECT_SCRIPT = """
+var el = arguments[0], replace = arguments[1];
+el.focus();
+if (el.tagName === 'TEXTAREA' || el.tagName === 'INPUT') {
+    if (replace) { el.select(); } else { el.selectionStart = el.selectionEnd = el.value.length; }
+} else {
+    var range = document.createRange();
+    range.selectNodeContents(el);
+    if (!replace) { range.collapse(false); }
+    var selection = window.getSelection();
+    selection.removeAllRanges();
+    selection.addRange(range);
+}
+"""
+
+# 触发框架监听的输入事件
+_COMMIT_INPUT_SCRIPT = """
+var el = arguments[0];
+el.dispatchEvent(new Event('input', { bubbles: true }));
+el.dispatchEvent(new Event('change', { bubbles: true }));
+"""
+
+# 不支持 CDP 时的脚本回退：输入框通过原生 value 属性写入（兼容 React 受控组件），
+# 可编辑区域通过 insertText 命令写入
+_SCRIPT_INSERT_SCRIPT = """
+var el = arguments[0], text = arguments[1];
+if (el.tagName === 'TEXTAREA' || el.tagName === 'INPUT') {
+    var proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    var start = el.selectionStart, end = el.selectionEnd;
+    var value = el.value.slice(0, start) + text + el.value.slice(end);
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+} else if (!document.execCommand('insertText', false, text)) {
+    el.textContent = text;
+}
+"""
+
+
+def insert_text(driver: Any, element: Any, text: str, replace: bool = True) -> str:
+    """
+    通过一次 Input.insertText 命令把整段文本写入输入框或可编辑区域
+
+    与逐字符的 send_keys 相比只需一次 WebDriver 往返；文本按输入法提交的方式插入，
+    中文不会被拆成按键事件，插入后触发 input 和 change 事件通知页面框架。
+
+    Args:
+        driver: 浏览器驱动
+        element: 输入框（textarea/input）或 contenteditable 元素
+        text: 要写入的文本
+        replace: 是否替换元素中已有的内容，否则追加到末尾
+
+    Returns:
+        str: 使用的写入方式，cdp 或 script（驱动不支持 CDP 或命令失败时的脚本回退）
+    """
+    driver.execute_script(_FOCUS_AND_SELECT_SCRIPT, element, replace)
+    method = 'script'
+    if supports_cdp(driver):
+        try:
+            driver.execute_cdp_cmd('Input.insertText', {'text': text})
+            method = 'cdp'
+        except Exception as e:
+            logger.warning(f"Input.insertText 执行失败，改用脚本写入: {e}")
+    if method == 'script':
+        driver.execute_script(_SCRIPT_INSERT_SCRIPT, element, text)
+    driver.execute_script(_COMMIT_INPUT_SCRIPT, element)
+    return method
@@ -0,0 +1,252 @@
+"""
+ChromeDriver 解析与缓存模块
+
+每个进程只解析一次 ChromeDriver 路径和 Chrome 版本，并持久化到磁盘，
+重启后直接复用，解析完成后无需联网即可创建浏览器驱动。
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from selenium import webdriver
+from selenium.common import exceptions as selenium_exceptions
+from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
+from selenium.webdriver.chrome.service import Service
+
+from .config import CHROMEDRIVER_CACHE_FILE, CHROMEDRIVER_RETRY_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# 常见的 Chrome 可执行文件位置
+_CHROME_COMMANDS = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+_CHROME_PATHS = [
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+]
+
+
+class ChromeDriverResolver:
+    """解析并缓存 ChromeDriver 路径"""
+
+    def __init__(self, cache_file: Optional[str] = None, retry_interval: Optional[float] = None):
+        """
+        初始化解析器
+
+        Args:
+            cache_file: 解析结果的持久化文件路径
+            retry_interval: 解析失败后重新尝试的间隔（秒），默认 CHROMEDRIVER_RETRY_INTERVAL
+        """
+        self.cache_file = cache_file or CHROMEDRIVER_CACHE_FILE
+        self.retry_interval = CHROMEDRIVER_RETRY_INTERVAL if retry_interval is None else retry_interval
+        self._info: Optional[Dict[str, Any]] = None
+        # 最近一次解析失败的时间（monotonic），成功解析后为 None
+        self._failed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def find_chrome_binary() -> Optional[str]:
+        """查找本机 Chrome 可执行文件"""
+        for command in _CHROME_COMMANDS:
+            path = shutil.which(command)
+            if path:
+                return path
+        for path in _CHROME_PATHS:
+            if os.path.exists(path):
+                return path
+        return None
+
+    @staticmethod
+    def get_chrome_version(chrome_binary: Optional[str]) -> Optional[str]:
+        """读取 Chrome 版本号（Windows 下 --version 不可用，返回 None）"""
+        if not chrome_binary or sys.platform.startswith("win"):
+            return None
+        try:
+            output = subprocess.run(
+                [chrome_binary, "--version"],
+                capture_output=True, text=True, timeout=10
+            ).stdout
+            match = re.search(r"(\d+\.\d+\.\d+\.\d+)", output)
+            return match.group(1) if match else None
+        except Exception as e:
+            logger.debug(f"读取 Chrome 版本失败: {e}")
+            return None
+
+    @staticmethod
+    def _binary_mtime(chrome_binary: Optional[str]) -> Optional[float]:
+        """Chrome 可执行文件的修改时间，用于判断浏览器是否升级"""
+        try:
+            return os.path.getmtime(os.path.realpath(chrome_binary)) if chrome_binary else None
+        except OSError:
+            return None
+
+    def _load_cache(self) -> Optional[Dict[str, Any]]:
+        """读取磁盘缓存，驱动文件缺失或 Chrome 已升级时视为失效"""
+        try:
+            if not Path(self.cache_file).exists():
+                return None
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+        except Exception as e:
+            logger.warning(f"读取 ChromeDriver 缓存失败: {e}")
+            return None
+
+        driver_path = info.get('driver_path')
+        if not driver_path or not os.path.isfile(driver_path):
+            logger.info("ChromeDriver 缓存中的驱动文件不存在，重新解析")
+            return None
+
+        chrome_binary = info.get('chrome_binary')
+        if chrome_binary and self._binary_mtime(chrome_binary) != info.get('chrome_mtime'):
+            logger.info("检测到 Chrome 已更新，重新解析 ChromeDriver")
+            return None
+
+        return info
+
+    def _save_cache(self, info: Dict[str, Any]) -> None:
+        """保存解析结果到磁盘"""
+        try:
+            Path(self.cache_file).parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(info, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.warning(f"保存 ChromeDriver 缓存失败: {e}")
+
+    def _install(self) -> Dict[str, Any]:
+        """通过 webdriver-manager 解析驱动（可能需要联网）"""
+        chrome_binary = self.find_chrome_binary()
+        chrome_version = self.get_chrome_version(chrome_binary)
+
+        from webdriver_manager.chrome import ChromeDriverManager
+        logger.info("正在解析 ChromeDriver（首次解析可能需要联网）...")
+        driver_path = ChromeDriverManager().install()
+
+        return {
+            'driver_path': driver_path,
+            'chrome_binary': chrome_binary,
+            'chrome_version': chrome_version,
+            'chrome_mtime': self._binary_mtime(chrome_binary),
+            'resolved_at': int(time.time())
+        }
+
+    def resolve(self, refresh: bool = False) -> Dict[str, Any]:
+        """
+        解析 ChromeDriver，优先使用进程内缓存和磁盘缓存
+
+        Args:
+            refresh: 是否忽略缓存重新解析
+
+        Returns:
+            Dict: 包含 driver_path、chrome_version 等信息，
+                  无法解析时 driver_path 为 None（交由 Selenium Manager 处理）
+        """
+        with self._lock:
+            if self._info is not None and not refresh and (
+                    self._failed_at is None or time.monotonic() - self._failed_at < self.retry_interval):
+                return self._info
+
+            override = os.getenv("TOUTIAO_CHROMEDRIVER_PATH")
+            if override:
+                self._info = {'driver_path': override, 'chrome_version': None}
+                return self._info
+
+            info = None if refresh else self._load_cache()
+            if info:
+                logger.info(f"使用缓存的 ChromeDriver: {info['driver_path']}")
+            else:
+                try:
+                    info = self._install()
+                    self._save_cache(info)
+                    logger.info(f"ChromeDriver 解析完成: {info['driver_path']}")
+                except Exception as e:
+                    # 离线且无缓存时交给 Selenium 自带的驱动管理；失败结果在进程内缓存，
+                    # retry_interval 内不再联网重试，避免每次创建驱动都等待网络超时
+                    logger.warning(f"解析 ChromeDriver 失败，使用 Selenium 默认驱动查找"
+                                   f"（{self.retry_interval:.0f} 秒后重试）: {e}")
+                    self._info = {'driver_path': None, 'chrome_version': None}
+                    self._failed_at = time.monotonic()
+                    return self._info
+
+            self._info = info
+            self._failed_at = None
+            return info
+
+    def get_service(self) -> Service:
+        """创建指向已解析驱动的 Service"""
+        driver_path = self.resolve().get('driver_path')
+        return Service(driver_path) if driver_path else Service()
+
+    def invalidate(self) -> None:
+        """清除进程内和磁盘缓存（驱动无法启动时调用）"""
+        with self._lock:
+            self._info = None
+            self._failed_at = None
+            try:
+                Path(self.cache_file).unlink()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"删除 ChromeDriver 缓存失败: {e}")
+
+
+# 进程级共享的解析器
+_resolver = ChromeDriverResolver()
+
+
+def get_chromedriver_resolver() -> ChromeDriverResolver:
+    """获取进程级共享的 ChromeDriver 解析器"""
+    return _resolver
+
+
+def _is_driver_failure(error: Exception) -> bool:
+    """
+    启动失败是否由驱动本身引起（驱动文件缺失、无执行权限或与 Chrome 版本不匹配）
+
+    用户目录被占用、内存不足、Chrome 崩溃等其他失败与缓存的驱动路径无关，不应清除缓存。
+    """
+    if isinstance(error, (FileNotFoundError, PermissionError)):
+        return True
+    # Selenium 4.11 起驱动不可用时抛出 NoSuchDriverException
+    no_such_driver = getattr(selenium_exceptions, 'NoSuchDriverException', None)
+    if no_such_driver and isinstance(error, no_such_driver):
+        return True
+    message = str(getattr(error, 'msg', None) or error).lower()
+    if isinstance(error, SessionNotCreatedException):
+        return 'version' in message
+    if isinstance(error, WebDriverException):
+        return 'executable' in message
+    return False
+
+
+def create_chrome_driver(options: Any) -> webdriver.Chrome:
+    """
+    使用缓存的驱动路径创建 Chrome 驱动，缓存的驱动不可用或版本不匹配时重新解析一次，
+    其他启动失败直接抛出
+
+    Args:
+        options: Chrome 启动选项
+
+    Returns:
+        webdriver.Chrome: 浏览器驱动
+    """
+    driver_path = _resolver.resolve().get('driver_path')
+    try:
+        return webdriver.Chrome(service=_resolver.get_service(), options=options)
+    except Exception as e:
+        # 未使用缓存路径、路径由环境变量指定或失败与驱动无关时，重试没有意义
+        if not driver_path or os.getenv("TOUTIAO_CHROMEDRIVER_PATH") or not _is_driver_failure(e):
+            raise
+        logger.warning(f"使用缓存的 ChromeDriver 启动失败，重新解析后重试: {e}")
+        _resolver.invalidate()
+        return webdriver.Chrome(service=_resolver.get_service(), options=options)
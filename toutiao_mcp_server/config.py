@@ -6,7 +6,7 @@
 
 import os
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # 基础配置
 DEFAULT_COOKIES_FILE = os.getenv("TOUTIAO_COOKIES_FILE", "toutiao_cookies.json")
@@ -27,7 +27,7 @@ TOUTIAO_URLS = {
     "user_info": "https://mp.toutiao.com/mp/agw/media/user_login_status_api/",
     "content_stats": "https://mp.toutiao.com/mp/agw/article/article_read_detail/",
     "article_page": "https://mp.toutiao.com/profile_v4/graphic/publish",
-    "micro_page": "https://mp.toutiao.com/profile_v4/ugc/weitt-new"
+    "micro_page": "https://mp.toutiao.com/profile_v4/weitoutiao/publish?from=toutiao_pc"
 }
 
 # 默认请求头
@@ -42,6 +42,25 @@ DEFAULT_HEADERS = {
     "Sec-Fetch-Site": "same-origin"
 }
 
+# 登录状态配置
+AUTH_CONFIG = {
+    # 登录状态的缓存时间（秒），0 表示每次都重新检查；
+    # 登录 Cookie 到期、请求返回鉴权失败或登出时缓存提前失效
+    "login_cache_ttl": int(os.getenv("TOUTIAO_LOGIN_CACHE_TTL", "300")),
+    # 登录状态接口（user_info）的请求超时时间（秒），接口无法判断时回退为检查创作者中心首页
+    "probe_timeout": 5,
+    # 决定登录会话有效期的关键 Cookie，任一到期即可不发请求判定登录已过期
+    "critical_cookies": [
+        "sessionid", "sessionid_ss", "sid_tt", "sid_guard", "uid_tt", "uid_tt_ss",
+        "sid_ucp_v1", "ssid_ucp_v1"
+    ],
+    # 在登录会话到期前自动请求登录状态接口续期，服务器下发新的 Cookie 时写回 Cookie 文件
+    "auto_refresh": os.getenv("TOUTIAO_AUTO_REFRESH", "1") != "0",
+    "refresh_margin": int(os.getenv("TOUTIAO_REFRESH_MARGIN", str(24 * 3600))),  # 提前续期的秒数
+    # 检查 Cookie 文件是否被其他进程更新的最小间隔（秒），更新后自动重新加载
+    "cookie_reload_interval": float(os.getenv("TOUTIAO_COOKIE_RELOAD_INTERVAL", "1"))
+}
+
 # Selenium 配置
 SELENIUM_CONFIG = {
     "headless": False,  # 改为False，方便用户看到登录过程
@@ -59,15 +78,133 @@ SELENIUM_CONFIG = {
         "--disable-web-security",
         "--allow-running-insecure-content",
         "--disable-features=VizDisplayCompositor"
+    ],
+    # 浏览器用户目录模式：ephemeral 每次使用临时目录；persistent 为每个账号使用受管理的
+    # --user-data-dir，保留 Cookie、localStorage 和页面缓存，发布时无需再传递 Cookie
+    "profile_mode": os.getenv("TOUTIAO_CHROME_PROFILE_MODE", "ephemeral"),
+    "user_data_root": os.getenv(
+        "TOUTIAO_CHROME_PROFILE_ROOT",
+        str(Path.home() / ".toutiao_mcp" / "chrome_profiles")
+    ),
+    # 发布用浏览器配置：standard 加载完整页面；lean 使用 LEAN_PROFILE_CONFIG（无头、屏蔽非必要请求）
+    "publish_profile": os.getenv("TOUTIAO_PUBLISH_PROFILE", "standard")
+}
+
+# 精简发布配置：仅用于发布流程，登录流程始终使用完整的有界面浏览器
+LEAN_PROFILE_CONFIG = {
+    "headless": True,
+    # DOMContentLoaded 后即返回，后续由页面等待模块按 DOM 状态判断编辑器是否就绪
+    "page_load_strategy": "eager",
+    # 通过 CDP Network.setBlockedURLs 屏蔽的请求（支持 * 通配符）。
+    # 上传图片的缩略图和封面来自 toutiaoimg/pstatp 图床，不能屏蔽，否则缩略图等待无法完成
+    "blocked_urls": [
+        # 统计与监控上报
+        "*mcs.snssdk.com*",
+        "*mon.snssdk.com*",
+        "*mon.zijieapi.com*",
+        "*log.snssdk.com*",
+        "*.bytetos.com/*/slardar*",
+        "*hm.baidu.com*",
+        "*google-analytics.com*",
+        # 字体
+        "*.woff",
+        "*.woff2",
+        "*.ttf",
+        "*.otf",
+        # 广告
+        "*ad.oceanengine.com*",
+        "*pangolin-sdk-toutiao*",
+        "*googleads*",
+        # 非必要图片（头像、运营位、页面装饰图）
+        "*p*-passport.byteacctimg.com*",
+        "*/obj/mp-fe*/*.png",
+        "*/obj/mp-fe*/*.jpg",
+        "*/obj/mp-fe*/*.svg"
     ]
-}# 内容发布配置
+}
+
+# ChromeDriver 解析结果缓存文件（保存驱动路径和 Chrome 版本，重启后离线复用）
+CHROMEDRIVER_CACHE_FILE = os.getenv(
+    "TOUTIAO_CHROMEDRIVER_CACHE",
+    str(Path.home() / ".toutiao_mcp" / "chromedriver.json")
+)
+
+# ChromeDriver 解析失败（如离线且无缓存）后重新尝试解析的间隔（秒），期间直接使用 Selenium 默认驱动查找
+CHROMEDRIVER_RETRY_INTERVAL = float(os.getenv("TOUTIAO_CHROMEDRIVER_RETRY_INTERVAL", "600"))
+
+# 浏览器驱动池配置
+DRIVER_POOL_CONFIG = {
+    "min_size": int(os.getenv("TOUTIAO_DRIVER_POOL_MIN_SIZE", "1")),  # 服务初始化时预热的浏览器数
+    "max_size": int(os.getenv("TOUTIAO_DRIVER_POOL_MAX_SIZE", "2")),  # 同时存在的最多浏览器数
+    "acquire_timeout": 120,  # 等待空闲浏览器的最长时间（秒）
+    "max_tabs": int(os.getenv("TOUTIAO_MAX_TABS_PER_BROWSER", "4")),  # 多标签页并发发布时单个浏览器最多打开的标签页数
+    # 浏览器回收条件，满足任一条件时关闭浏览器并在后台启动替换浏览器（0 表示不限制）
+    "max_uses": int(os.getenv("TOUTIAO_DRIVER_MAX_USES", "50")),  # 单个浏览器最多发布次数
+    "max_rss_mb": int(os.getenv("TOUTIAO_DRIVER_MAX_RSS_MB", "1500")),  # chromedriver 及 Chrome 进程树的内存上限（MB）
+    "max_age": int(os.getenv("TOUTIAO_DRIVER_MAX_AGE", "3600")),  # 单个浏览器最长存活时间（秒）
+    "watchdog_interval": 60  # 检查空闲浏览器内存的间隔（秒），0 表示不启动检查线程
+}
+
+# 发布方式配置
+PUBLISH_CONFIG = {
+    # selenium 通过浏览器操作发布页；api 直接通过已登录的 session 调用发布接口，
+    # 请求确定未被受理（连接失败、4xx 等）时回退到浏览器发布；读取超时、5xx 等结果未知时不回退
+    "transport": os.getenv("TOUTIAO_PUBLISH_TRANSPORT", "selenium"),
+    "api_timeout": 15,  # 发布接口请求超时时间（秒）
+    "api_fallback": True,  # api 方式请求确定未被受理时是否回退到浏览器发布
+    # 浏览器发布时先通过上传接口并发上传图片（与借出浏览器同时进行），
+    # 再按图片地址直接插入正文并从正文图片中选择封面，省去页面中的文件上传弹窗
+    "preupload_images": os.getenv("TOUTIAO_PREUPLOAD_IMAGES", "0") == "1",
+    "upload_workers": 4,  # 并发上传图片的线程数
+    "upload_timeout": 60,  # 等待预上传完成的最长时间（秒）
+    # 批量发布时保留已加载的发布页面，下一条同类内容在页面内重置编辑器后直接填写，不再重新打开页面
+    "hot_editor": os.getenv("TOUTIAO_HOT_EDITOR", "1") != "0",
+    # 异步发布接口（publish_*_async）使用的浏览器后端：selenium 在线程池中执行同步发布；
+    # async_cdp 在事件循环中通过 websocket 直接驱动 Chrome（需安装 websockets）
+    "backend": os.getenv("TOUTIAO_PUBLISH_BACKEND", "selenium")
+}
+
+# 异步 CDP 浏览器后端配置
+ASYNC_CDP_CONFIG = {
+    "chrome_binary": os.getenv("TOUTIAO_CHROME_BINARY", ""),  # Chrome 可执行文件路径，默认在 PATH 中查找
+    # 已运行浏览器的 DevTools websocket 地址，设置后直接连接而不启动新浏览器
+    "ws_endpoint": os.getenv("TOUTIAO_CDP_ENDPOINT", ""),
+    "launch_timeout": 30,  # 等待浏览器启动的最长时间（秒）
+    "headless": os.getenv("TOUTIAO_CDP_HEADLESS", "1") != "0"
+}
+
+# 发布失败时的调试文件（截图、页面源代码）配置
+DEBUG_ARTIFACTS_CONFIG = {
+    "enabled": os.getenv("TOUTIAO_DEBUG_ARTIFACTS", "1") != "0",
+    # 每次失败写入该目录下的独立子目录
+    "dir": os.getenv("TOUTIAO_DEBUG_DIR", str(Path.home() / ".toutiao_mcp" / "debug")),
+    # 调试文件总大小上限，超出后删除最早的记录
+    "max_bytes": int(os.getenv("TOUTIAO_DEBUG_MAX_BYTES", str(200 * 1024 * 1024))),
+    # 是否用 gzip 压缩页面源代码（截图本身已是压缩格式）
+    "compress": os.getenv("TOUTIAO_DEBUG_COMPRESS", "0") == "1"
+}
+
+# 内容发布配置
 CONTENT_CONFIG = {
     "max_title_length": 100,
     "max_content_length": 50000,
     "max_weitoutiao_length": 2000,
     "supported_image_types": [".jpg", ".jpeg", ".png", ".gif", ".webp"],
     "max_image_size": 10 * 1024 * 1024,  # 10MB
-    "max_images_per_post": 9
+    "max_images_per_post": 9,
+    # 正文字数校验允许的差异：取字符数与源文本字数比例两者中较大的一个，
+    # 编辑器对空白、实体和特殊字符的处理会带来少量差异，超出时视为插入不完整
+    "content_check_tolerance": 20,
+    "content_check_tolerance_ratio": 0.01
+}
+
+# 多账号配置：TOUTIAO_ACCOUNTS 为逗号分隔的“账号名=Cookie 文件”列表，例如
+# "main=toutiao_cookies.json,brand=cookies/brand.json"；只写账号名时使用 toutiao_cookies_<账号名>.json。
+# 未配置时只有一个 default 账号，使用 TOUTIAO_COOKIES_FILE
+ACCOUNTS_CONFIG = {
+    "accounts": os.getenv("TOUTIAO_ACCOUNTS", ""),
+    "default_account": os.getenv("TOUTIAO_DEFAULT_ACCOUNT", ""),  # 工具未指定账号时使用，默认取第一个账号
+    "prefill_all": os.getenv("TOUTIAO_PREFILL_ALL_ACCOUNTS", "0") == "1"  # 是否为所有账号预热浏览器，默认只预热默认账号
 }
 
 def get_project_root() -> Path:
@@ -78,4 +215,17 @@ def get_cookies_file_path() -> str:
     """获取 Cookie 文件完整路径"""
     if os.path.isabs(DEFAULT_COOKIES_FILE):
         return DEFAULT_COOKIES_FILE
-    return str(get_project_root() / DEFAULT_COOKIES_FILE)
\ No newline at end of file
+    return str(get_project_root() / DEFAULT_COOKIES_FILE)
+
+def get_account_cookies_file_path(account: str, cookies_file: Optional[str] = None) -> str:
+    """
+    获取账号的 Cookie 文件完整路径
+    
+    Args:
+        account: 账号名
+        cookies_file: 配置的 Cookie 文件，相对路径相对项目根目录，默认为 toutiao_cookies_<账号名>.json
+    """
+    cookies_file = cookies_file or f"toutiao_cookies_{account}.json"
+    if os.path.isabs(cookies_file):
+        return cookies_file
+    return str(get_project_root() / cookies_file)
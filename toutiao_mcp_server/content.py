@@ -0,0 +1,390 @@
+"""
+正文内容处理模块
+
+把纯文本、Markdown 或 HTML 正文转换为编辑器的段落块，按块分批插入编辑器，
+并用可见字符数校验插入结果，避免长文章被截断。
+"""
+
+import html
+import logging
+import re
+from typing import Any, Dict, List
+
+from .config import CONTENT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 判断正文是否已是 HTML
+HTML_BLOCK_PATTERN = re.compile(r'<\s*(p|div|img|h[1-6]|ul|ol|br|blockquote|pre|table)\b', re.IGNORECASE)
+
+# 块级标签，HTML 正文只在这些标签闭合且回到顶层时切分
+_BLOCK_TAGS = {'p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'blockquote', 'pre', 'table', 'figure'}
+_TAG_PATTERN = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9]*)\b[^>]*?(/?)>')
+
+# Markdown 行内语法，按顺序替换（已转义后的文本）
+_MD_IMAGE = re.compile(r'!\[([^\]]*)\]\(([^)\s]+)\)')
+_MD_LINK = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
+_MD_CODE = re.compile(r'`([^`]+)`')
+_MD_BOLD = re.compile(r'\*\*([^*]+)\*\*|__([^_]+)__')
+_MD_ITALIC = re.compile(r'(?<![*\w])\*([^*\s][^*]*)\*(?!\*)')
+_MD_HEADING = re.compile(r'^(#{1,6})\s+(.*)$')
+_MD_ULIST = re.compile(r'^[-*+]\s+(.*)$')
+_MD_OLIST = re.compile(r'^\d+[.)]\s+(.*)$')
+
+# Markdown 链接只允许 http(s)，图片另允许 data:image 内联图片
+_SAFE_LINK_URL = re.compile(r'^https?://', re.IGNORECASE)
+_SAFE_IMAGE_URL = re.compile(r'^(https?://|data:image/)', re.IGNORECASE)
+_URL_PLACEHOLDER = re.compile(r'\x00(\d+)\x00')
+
+_WHITESPACE = re.compile(r'\s+')
+_TAG = re.compile(r'<[^>]*>')
+# 不渲染的内容（脚本、样式、模板、注释），innerText 不包含其中的文本
+_NON_RENDERED = re.compile(r'<(script|style|template|noscript)\b[^>]*>.*?</\1\s*>|<!--.*?-->',
+                           re.IGNORECASE | re.DOTALL)
+
+
+def detect_format(content: str) -> str:
+    """根据内容判断格式：包含块级标签时为 html，否则为 text"""
+    return 'html' if HTML_BLOCK_PATTERN.search(content) else 'text'
+
+
+def _render_text(content: str) -> List[str]:
+    """纯文本：每行一个段落，空行保留为空段落"""
+    blocks = []
+    for line in content.split('\n'):
+        line = line.strip()
+        blocks.append(f'<p>{html.escape(line, quote=False)}</p>' if line else '<p><br></p>')
+    return blocks
+
+
+def _render_inline_markdown(text: str) -> str:
+    """转义后处理 Markdown 行内语法"""
+    text = html.escape(text, quote=True)
+    # 链接和图片地址先替换为占位符，避免地址中的 _、*、` 被行内格式改写
+    urls: List[str] = []
+
+    def protect(url: str) -> str:
+        urls.append(url)
+        return f'\x00{len(urls) - 1}\x00'
+
+    # 不安全的地址（如 javascript:）只保留图片说明或链接文字
+    text = _MD_IMAGE.sub(
+        lambda m: f'<img src="{protect(m.group(2))}" alt="{m.group(1)}">'
+        if _SAFE_IMAGE_URL.match(html.unescape(m.group(2))) else m.group(1),
+        text
+    )
+    text = _MD_LINK.sub(
+        lambda m: f'<a href="{protect(m.group(2))}">{m.group(1)}</a>'
+        if _SAFE_LINK_URL.match(html.unescape(m.group(2))) else m.group(1),
+        text
+    )
+    text = _MD_CODE.sub(r'<code>\1</code>', text)
+    text = _MD_BOLD.sub(lambda m: f'<strong>{m.group(1) or m.group(2)}</strong>', text)
+    text = _MD_ITALIC.sub(r'<em>\1</em>', text)
+    return _URL_PLACEHOLDER.sub(lambda m: urls[int(m.group(1))], text)
+
+
+def _render_markdown(content: str) -> List[str]:
+    """Markdown（常用子集）：标题、列表、引用、代码块、行内格式，每个非空行一个段落"""
+    blocks: List[str] = []
+    list_tag = None
+    list_items: List[str] = []
+    code_lines: List[str] = []
+    in_code = False
+
+    def flush_list() -> None:
+        nonlocal list_tag, list_items
+        if list_tag:
+            blocks.append(f'<{list_tag}>' + ''.join(list_items) + f'</{list_tag}>')
+        list_tag, list_items = None, []
+
+    for raw in content.split('\n'):
+        line = raw.rstrip()
+        if line.lstrip().startswith('```'):
+            if in_code:
+                blocks.append('<pre><code>' + html.escape('\n'.join(code_lines), quote=False) + '</code></pre>')
+                code_lines = []
+            else:
+                flush_list()
+            in_code = not in_code
+            continue
+        if in_code:
+            code_lines.append(raw)
+            continue
+
+        line = line.strip()
+        ulist = _MD_ULIST.match(line)
+        olist = None if ulist else _MD_OLIST.match(line)
+        if ulist or olist:
+            tag = 'ul' if ulist else 'ol'
+            if list_tag != tag:
+                flush_list()
+                list_tag = tag
+            list_items.append(f'<li>{_render_inline_markdown((ulist or olist).group(1))}</li>')
+            continue
+        flush_list()
+
+        if not line:
+            continue
+        heading = _MD_HEADING.match(line)
+        if heading:
+            level = len(heading.group(1))
+            blocks.append(f'<h{level}>{_render_inline_markdown(heading.group(2))}</h{level}>')
+        elif line.startswith('>'):
+            blocks.append(f'<blockquote><p>{_render_inline_markdown(line.lstrip("> "))}</p></blockquote>')
+        else:
+            blocks.append(f'<p>{_render_inline_markdown(line)}</p>')
+
+    if in_code and code_lines:
+        blocks.append('<pre><code>' + html.escape('\n'.join(code_lines), quote=False) + '</code></pre>')
+    flush_list()
+    return blocks
+
+
+def _split_html(content: str) -> List[str]:
+    """把 HTML 正文按顶层块切分，不拆开嵌套结构"""
+    blocks: List[str] = []
+    depth = 0
+    start = 0
+    for match in _TAG_PATTERN.finditer(content):
+        closing, tag, self_closing = match.group(1), match.group(2).lower(), match.group(3)
+        if tag not in _BLOCK_TAGS or self_closing:
+            continue
+        if closing:
+            depth = max(0, depth - 1)
+            if depth == 0:
+                block = content[start:match.end()].strip()
+                if block:
+                    blocks.append(block)
+                start = match.end()
+        else:
+            if depth == 0 and content[start:match.start()].strip():
+                # 顶层块之间的游离文本单独成段
+                blocks.append(content[start:match.start()].strip())
+                start = match.start()
+            elif depth == 0:
+                start = match.start()
+            depth += 1
+    tail = content[start:].strip()
+    if tail:
+        blocks.append(tail)
+    return blocks
+
+
+def render_blocks(content: str, content_format: str = 'auto') -> List[str]:
+    """
+    把正文转换为编辑器的段落块（线性时间）
+
+    Args:
+        content: 正文
+        content_format: text（纯文本，逐行成段并转义）、markdown、html（原样保留）或 auto（自动判断）
+
+    Returns:
+        List[str]: 段落块 HTML 列表
+    """
+    if content_format == 'auto':
+        content_format = detect_format(content)
+    content = content.replace('\r\n', '\n')
+    if content_format == 'html':
+        return _split_html(content)
+    if content_format == 'markdown':
+        return _render_markdown(content)
+    return _render_text(content)
+
+
+def chunk_blocks(blocks: List[str], max_chars: int = 8000) -> List[str]:
+    """
+    把段落块按顺序合并为不超过 max_chars 的批次（单个超长块独立成批）
+
+    Args:
+        blocks: 段落块列表
+        max_chars: 每批 HTML 的最大字符数
+
+    Returns:
+        List[str]: 按顺序插入的 HTML 批次
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for block in blocks:
+        if current and size + len(block) > max_chars:
+            chunks.append(''.join(current))
+            current, size = [], 0
+        current.append(block)
+        size += len(block)
+    if current:
+        chunks.append(''.join(current))
+    return chunks
+
+
+def text_length(markup: str) -> int:
+    """HTML 的可见字符数（不含标签、空白和脚本样式等不渲染的内容），与编辑器 innerText 的统计口径一致"""
+    return len(_WHITESPACE.sub('', html.unescape(_TAG.sub('', _NON_RENDERED.sub('', markup)))))
+
+
+def _length_tolerance(expected: int) -> int:
+    """字数校验允许的差异，见 CONTENT_CONFIG['content_check_tolerance']"""
+    return max(int(CONTENT_CONFIG['content_check_tolerance']),
+               int(expected * CONTENT_CONFIG['content_check_tolerance_ratio']))
+
+
+def _content_check(expected: int, actual: int, chunks: int, method: str) -> Dict[str, Any]:
+    """生成字数校验结果：差异在允许范围内视为一致，不完全相同时记录警告"""
+    result = {
+        'expected': expected,
+        'actual': actual,
+        'chunks': chunks,
+        'method': method,
+        'matched': abs(actual - expected) <= _length_tolerance(expected)
+    }
+    if not result['matched']:
+        logger.warning(f"正文字数校验不一致：源文本 {expected} 字，编辑器 {actual} 字（{method}）")
+    elif actual != expected:
+        logger.warning(f"正文字数有少量差异：源文本 {expected} 字，编辑器 {actual} 字（{method}）")
+    else:
+        logger.info(f"正文分 {chunks} 批插入完成（{method}），共 {actual} 字")
+    return result
+
+
+# 清空编辑器（草稿恢复或残留的正文、图片），由编辑器按自身事务删除，不支持时直接重置 DOM，
+# 返回是否已为空；发布页重置脚本复用同一函数
+CLEAR_EDITOR_FUNCTION = """
+function clearEditor(el) {
+    if ((el.innerText || '').trim() || el.querySelector('img')) {
+        el.focus();
+        document.execCommand('selectAll', false, null);
+        if (!document.execCommand('delete', false, null)) { el.innerHTML = '<p><br></p>'; }
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+    }
+    return !(el.innerText || '').trim() && !el.querySelector('img');
+}
+"""
+_CLEAR_EDITOR_SCRIPT = CLEAR_EDITOR_FUNCTION + "return clearEditor(arguments[0]);"
+
+# 在编辑器末尾插入一批 HTML：优先派发粘贴事件由编辑器按自身事务处理，
+# 编辑器未处理时使用 insertHTML 命令
+_INSERT_CHUNK_SCRIPT = """
+var editor = arguments[0], markup = arguments[1], plain = arguments[2];
+editor.focus();
+var selection = window.getSelection();
+var range = document.createRange();
+range.selectNodeContents(editor);
+range.collapse(false);
+selection.removeAllRanges();
+selection.addRange(range);
+var method = null;
+try {
+    var data = new DataTransfer();
+    data.setData('text/html', markup);
+    data.setData('text/plain', plain);
+    var event = new ClipboardEvent('paste', {clipboardData: data, bubbles: true, cancelable: true});
+    editor.dispatchEvent(event);
+    if (event.defaultPrevented) { method = 'paste'; }
+} catch (e) {}
+if (!method && document.execCommand('insertHTML', false, markup)) { method = 'insertHTML'; }
+return method;
+"""
+
+_EDITOR_LENGTH_SCRIPT = "return (arguments[0].innerText || '').replace(/\\s+/g, '').length;"
+
+
+def editor_text_length(driver: Any, editor: Any) -> int:
+    """编辑器当前的可见字符数"""
+    return int(driver.execute_script(_EDITOR_LENGTH_SCRIPT, editor) or 0)
+
+
+def insert_blocks(driver: Any,
+                  editor: Any,
+                  blocks: List[str],
+                  max_chars: int = 8000,
+                  waiter: Any = None) -> Dict[str, Any]:
+    """
+    清空编辑器后按顺序分批把段落块插入编辑器，并校验最终字符数
+
+    编辑器不接受粘贴和 insertHTML 时，回退为一次性设置 innerHTML。
+
+    Args:
+        driver: 浏览器驱动
+        editor: 编辑器元素
+        blocks: render_blocks() 的结果
+        max_chars: 每批 HTML 的最大字符数
+        waiter: 页面等待器，提供时等待编辑器渲染到预期字符数后再校验
+
+    Returns:
+        Dict: expected 源文本字符数，actual 编辑器字符数，chunks 批次数，method 插入方式，
+            matched 差异是否在允许范围内（CONTENT_CONFIG['content_check_tolerance']）
+    """
+    chunks = chunk_blocks(blocks, max_chars)
+    expected = sum(text_length(block) for block in blocks)
+    # 新打开的发布页可能恢复了草稿或残留内容，分批插入前先清空，避免一并发布
+    if not driver.execute_script(_CLEAR_EDITOR_SCRIPT, editor):
+        logger.warning("清空编辑器失败，编辑器中仍有内容")
+    method = None
+    for index, chunk in enumerate(chunks):
+        plain = html.unescape(_TAG.sub('', _NON_RENDERED.sub('', chunk)))
+        method = driver.execute_script(_INSERT_CHUNK_SCRIPT, editor, chunk, plain)
+        if not method:
+            logger.warning(f"第 {index + 1} 批正文插入失败，改为整体设置")
+            break
+
+    if method is None:
+        driver.execute_script("""
+            var editor = arguments[0];
+            editor.innerHTML = arguments[1];
+            editor.dispatchEvent(new Event('input', { bubbles: true }));
+            editor.dispatchEvent(new Event('change', { bubbles: true }));
+        """, editor, ''.join(blocks))
+        method = 'innerHTML'
+
+    if waiter is not None:
+        waiter.until_js(
+            "content_length_matched",
+            "return (arguments[0].innerText || '').replace(/\\s+/g, '').length >= arguments[1];",
+            5, editor, expected - _length_tolerance(expected), required=False
+        )
+    actual = editor_text_length(driver, editor)
+    return _content_check(expected, actual, len(chunks), method)
+
+
+async def insert_blocks_async(page: Any, selector: str, blocks: List[str], max_chars: int = 8000) -> Dict[str, Any]:
+    """
+    insert_blocks 的异步版本，用于异步 CDP 后端的页面（async_cdp.AsyncPage）
+
+    Args:
+        page: 异步页面
+        selector: 编辑器选择器
+        blocks: render_blocks() 的结果
+        max_chars: 每批 HTML 的最大字符数
+
+    Returns:
+        Dict: 格式同 insert_blocks
+    """
+    chunks = chunk_blocks(blocks, max_chars)
+    expected = sum(text_length(block) for block in blocks)
+    if not await page.evaluate_on(selector, _CLEAR_EDITOR_SCRIPT):
+        logger.warning("清空编辑器失败，编辑器中仍有内容")
+    method = None
+    for index, chunk in enumerate(chunks):
+        plain = html.unescape(_TAG.sub('', _NON_RENDERED.sub('', chunk)))
+        method = await page.evaluate_on(selector, _INSERT_CHUNK_SCRIPT, chunk, plain)
+        if not method:
+            logger.warning(f"第 {index + 1} 批正文插入失败，改为整体设置")
+            break
+
+    if method is None:
+        await page.evaluate_on(selector, """
+            var editor = arguments[0];
+            editor.innerHTML = arguments[1];
+            editor.dispatchEvent(new Event('input', { bubbles: true }));
+            editor.dispatchEvent(new Event('change', { bubbles: true }));
+        """, ''.join(blocks))
+        method = 'innerHTML'
+
+    await page.wait_js(
+        "content_length_matched",
+        "var el = firstVisible(arguments[0]); "
+        "return !!el && (el.innerText || '').replace(/\\s+/g, '').length >= arguments[1];",
+        5, selector, expected - _length_tolerance(expected), required=False
+    )
+    actual = int(await page.evaluate_on(selector, _EDITOR_LENGTH_SCRIPT) or 0)
+    return _content_check(expected, actual, len(chunks), method)
@@ -0,0 +1,142 @@
+"""
+Cookie 文件存储模块
+
+MCP 服务器、HTTP API 服务器和 publish.py 等脚本共用同一个 Cookie 文件。读写时对旁路锁文件
+加共享/排他锁，写入先写临时文件再原子替换，读取方不会读到写了一半的文件；
+通过文件的 mtime、大小和 inode 判断文件是否被其他进程更新，以便不重启即可加载新 Cookie。
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+# 文件签名：(st_mtime_ns, st_size, st_ino)，文件不存在时为 None
+Signature = Optional[Tuple[int, int, int]]
+
+
+class CookieStore:
+    """带文件锁和变更检测的 Cookie 文件"""
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        """
+        初始化 Cookie 存储
+
+        Args:
+            path: Cookie 文件路径
+            check_interval: changed() 两次检查文件状态的最小间隔（秒），0 表示每次都检查
+        """
+        self.path = Path(path)
+        self.lock_path = Path(f"{path}.lock")
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._signature: Signature = None
+        self._checked_at = 0.0
+
+    def _stat(self) -> Signature:
+        """读取当前文件签名"""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """
+        对旁路锁文件加锁（阻塞等待），同一进程内的线程由线程锁串行化
+
+        Windows 的 msvcrt 不支持共享锁，读取时同样加排他锁。
+        """
+        with self._lock:
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, 'a+') as lock_file:
+                if os.name == 'nt':
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                else:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    if os.name == 'nt':
+                        lock_file.seek(0)
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+                    else:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """
+        在共享锁下读取 Cookie 文件，并记录文件签名
+
+        Returns:
+            Dict: Cookie 文件内容（cookies、timestamp），文件不存在时返回 None
+
+        Raises:
+            ValueError: 文件内容不是合法的 JSON
+        """
+        if self._stat() is None:
+            self._signature = None
+            return None
+        with self._file_lock(exclusive=False):
+            signature = self._stat()
+            if signature is None:
+                self._signature = None
+                return None
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._signature = signature
+            return data
+
+    def write(self, data: Dict[str, Any]) -> None:
+        """
+        在排他锁下写入 Cookie 文件：写入同目录的临时文件后原子替换
+
+        Args:
+            data: Cookie 文件内容
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._file_lock(exclusive=True):
+            fd, tmp_file = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp", dir=str(self.path.parent))
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.path)
+            except BaseException:
+                if os.path.exists(tmp_file):
+                    os.unlink(tmp_file)
+                raise
+            self._signature = self._stat()
+
+    def delete(self) -> None:
+        """在排他锁下删除 Cookie 文件"""
+        with self._file_lock(exclusive=True):
+            if self.path.exists():
+                self.path.unlink()
+            self._signature = None
+
+    def changed(self) -> bool:
+        """
+        文件是否在上次 read/write/delete 之后被（其他进程）修改、替换或删除
+
+        两次检查间隔小于 check_interval 时直接返回 False，避免每次请求都访问文件系统。
+        """
+        now = time.monotonic()
+        if self.check_interval and now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        return self._stat() != self._signature
@@ -0,0 +1,185 @@
+"""
+调试文件记录模块
+
+发布失败时抓取截图和页面源代码，由后台线程写入独立的记录目录，
+失败路径只承担从浏览器取数据的开销。所有记录的总大小有上限，超出后删除最早的记录。
+"""
+
+import base64
+import gzip
+import itertools
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .config import DEBUG_ARTIFACTS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class DebugArtifactStore:
+    """调试文件存储，后台写入并按总大小循环淘汰"""
+
+    def __init__(self,
+                 root: Optional[str] = None,
+                 max_bytes: Optional[int] = None,
+                 compress: Optional[bool] = None,
+                 enabled: Optional[bool] = None):
+        """
+        初始化调试文件存储
+
+        Args:
+            root: 调试文件根目录，默认使用配置值
+            max_bytes: 所有记录的总大小上限（字节）
+            compress: 是否 gzip 压缩页面源代码
+            enabled: 是否启用，关闭时 capture 不做任何事
+        """
+        self.root = Path(root or DEBUG_ARTIFACTS_CONFIG['dir'])
+        self.max_bytes = DEBUG_ARTIFACTS_CONFIG['max_bytes'] if max_bytes is None else max_bytes
+        self.compress = DEBUG_ARTIFACTS_CONFIG['compress'] if compress is None else compress
+        self.enabled = DEBUG_ARTIFACTS_CONFIG['enabled'] if enabled is None else enabled
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    def capture(self,
+                driver: Any,
+                kind: str,
+                label: str,
+                screenshot: bool = True,
+                page_source: bool = False) -> Optional[str]:
+        """
+        抓取当前页面的截图和源代码，交给后台线程写入
+
+        Args:
+            driver: 浏览器驱动
+            kind: 发布类型（如 article、micro_post）
+            label: 失败场景名称（如 no_editor）
+            screenshot: 是否抓取截图
+            page_source: 是否抓取页面源代码
+
+        Returns:
+            str: 本次记录的目录路径，未启用或抓取失败时返回 None
+        """
+        if not self.enabled:
+            return None
+
+        record: Dict[str, Any] = {'meta': {'kind': kind, 'label': label, 'time': time.strftime("%Y-%m-%d %H:%M:%S")}}
+        try:
+            record['meta']['url'] = driver.current_url
+        except Exception:
+            pass
+        if screenshot:
+            try:
+                # 只取浏览器返回的 base64 数据，解码和写盘放到后台线程
+                record['screenshot'] = driver.get_screenshot_as_base64()
+            except Exception as e:
+                logger.warning(f"抓取截图失败: {e}")
+        if page_source:
+            try:
+                record['page_source'] = driver.page_source
+            except Exception as e:
+                logger.warning(f"抓取页面源代码失败: {e}")
+        if 'screenshot' not in record and 'page_source' not in record:
+            return None
+
+        run_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(self._sequence):04d}-{kind}-{label}"
+        record['path'] = self.root / run_name
+        self._ensure_worker()
+        self._queue.put(record)
+        logger.info(f"调试文件将保存到: {record['path']}")
+        return str(record['path'])
+
+    def _ensure_worker(self) -> None:
+        """按需启动后台写入线程"""
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="debug-artifact-writer", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        """后台线程：依次写入记录并淘汰超出大小上限的旧记录"""
+        while True:
+            record = self._queue.get()
+            try:
+                self._write(record)
+                self._prune()
+            except Exception as e:
+                logger.warning(f"写入调试文件失败: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        """把一条记录写入其目录"""
+        path: Path = record['path']
+        path.mkdir(parents=True, exist_ok=True)
+        if 'screenshot' in record:
+            (path / "screenshot.png").write_bytes(base64.b64decode(record['screenshot']))
+        if 'page_source' in record:
+            data = record['page_source'].encode('utf-8')
+            if self.compress:
+                (path / "page_source.html.gz").write_bytes(gzip.compress(data))
+            else:
+                (path / "page_source.html").write_bytes(data)
+        with open(path / "meta.json", 'w', encoding='utf-8') as f:
+            json.dump(record['meta'], f, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def _dir_size(path: Path) -> int:
+        """目录中所有文件的总大小"""
+        return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+    def _prune(self) -> None:
+        """
+        删除最早的记录，直到总大小不超过上限（始终保留最新一条）
+
+        meta.json 最后写入，记录按它的修改时间排序；没有 meta.json 的目录
+        仍在写入中（可能属于其他进程），不参与统计和淘汰。
+        """
+        finished = []
+        for path in self.root.iterdir():
+            try:
+                finished.append(((path / "meta.json").stat().st_mtime_ns, path.name, path))
+            except OSError:
+                continue
+        runs = [path for _, _, path in sorted(finished)]
+        sizes = {}
+        for run in runs:
+            try:
+                sizes[run] = self._dir_size(run)
+            except OSError:
+                # 已被其他进程删除
+                sizes[run] = 0
+        total = sum(sizes.values())
+        for run in runs[:-1]:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(run, ignore_errors=True)
+            total -= sizes[run]
+            logger.info(f"调试文件超出大小上限，已删除旧记录: {run.name}")
+
+    def flush(self) -> None:
+        """等待所有已提交的记录写入完成"""
+        self._queue.join()
+
+
+# 进程级调试文件存储
+_store: Optional[DebugArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_debug_store() -> DebugArtifactStore:
+    """获取进程级的调试文件存储实例"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DebugArtifactStore()
+        return _store
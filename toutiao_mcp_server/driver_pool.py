@@ -0,0 +1,378 @@
+"""
+浏览器驱动池模块
+
+维护一组预热好的 Chrome 驱动，发布时借出、归还时重置，避免每次发布都冷启动浏览器。
+长期复用的浏览器会逐渐占用更多内存，驱动池按发布次数、进程树内存和存活时间回收浏览器，
+并在后台启动替换浏览器，请求不需要等待浏览器重启。
+"""
+
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .config import DRIVER_POOL_CONFIG
+from .memory import driver_rss
+
+logger = logging.getLogger(__name__)
+
+
+class PooledDriver:
+    """驱动池中的单个驱动及其使用信息"""
+
+    def __init__(self, driver: Any):
+        """
+        初始化池化驱动
+
+        Args:
+            driver: Selenium WebDriver 实例
+        """
+        self.driver = driver
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.use_count = 0
+        # 最近一次采样的进程树常驻内存（字节）
+        self.rss: Optional[int] = None
+        # 供使用方记录与该驱动绑定的状态（如是否已传递 Cookie）
+        self.state: Dict[str, Any] = {}
+
+
+class DriverPool:
+    """Chrome 驱动池，支持最小/最大容量、健康检查和归还重置"""
+
+    def __init__(self,
+                 factory: Callable[[], Any],
+                 min_size: Optional[int] = None,
+                 max_size: Optional[int] = None,
+                 acquire_timeout: Optional[float] = None,
+                 destroy: Optional[Callable[[Any], None]] = None,
+                 max_uses: Optional[int] = None,
+                 max_rss_mb: Optional[int] = None,
+                 max_age: Optional[float] = None,
+                 watchdog_interval: Optional[float] = None,
+                 rss_probe: Optional[Callable[[Any], Optional[int]]] = None):
+        """
+        初始化驱动池
+
+        Args:
+            factory: 创建新驱动的函数
+            min_size: 预热时保持的最少空闲驱动数
+            max_size: 同时存在的最多驱动数
+            acquire_timeout: 借出驱动的最长等待时间（秒）
+            destroy: 关闭驱动的函数，默认调用 driver.quit()
+            max_uses: 单个驱动最多借出次数，达到后回收（0 表示不限制）
+            max_rss_mb: 驱动进程树的内存上限（MB），超出后回收（0 表示不限制）
+            max_age: 单个驱动最长存活时间（秒），超出后回收（0 表示不限制）
+            watchdog_interval: 后台检查空闲驱动的间隔（秒），0 表示不启动检查线程
+            rss_probe: 采样驱动进程树内存（字节）的函数，默认使用 memory.driver_rss
+        """
+        self.factory = factory
+        self.destroy = destroy or (lambda driver: driver.quit())
+        self.min_size = DRIVER_POOL_CONFIG['min_size'] if min_size is None else min_size
+        self.max_size = max(1, DRIVER_POOL_CONFIG['max_size'] if max_size is None else max_size)
+        self.min_size = min(self.min_size, self.max_size)
+        self.acquire_timeout = (DRIVER_POOL_CONFIG['acquire_timeout']
+                                if acquire_timeout is None else acquire_timeout)
+        self.max_uses = DRIVER_POOL_CONFIG['max_uses'] if max_uses is None else max_uses
+        self.max_rss_mb = DRIVER_POOL_CONFIG['max_rss_mb'] if max_rss_mb is None else max_rss_mb
+        self.max_age = DRIVER_POOL_CONFIG['max_age'] if max_age is None else max_age
+        self.watchdog_interval = (DRIVER_POOL_CONFIG['watchdog_interval']
+                                  if watchdog_interval is None else watchdog_interval)
+        self.rss_probe = rss_probe or driver_rss
+
+        self._idle: List[PooledDriver] = []
+        self._in_use: List[PooledDriver] = []
+        # 正在创建中的驱动数量，计入容量以免超过 max_size
+        self._creating = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._recycled = 0
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_watchdog = threading.Event()
+
+        atexit.register(self.close)
+
+    @property
+    def size(self) -> int:
+        """当前池中驱动总数（含创建中）"""
+        with self._cond:
+            return len(self._idle) + len(self._in_use) + self._creating
+
+    def _create(self) -> PooledDriver:
+        """创建新驱动，调用方需已在锁外并预先占用容量"""
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._cond:
+                self._creating -= 1
+                self._cond.notify()
+            raise
+        return PooledDriver(driver)
+
+    def prefill(self, background: bool = False) -> None:
+        """
+        预热驱动池，补足到 min_size 个空闲驱动
+
+        Args:
+            background: 是否在后台线程中预热
+        """
+        if background:
+            threading.Thread(target=self.prefill, name="driver-pool-prefill", daemon=True).start()
+            return
+
+        while True:
+            with self._cond:
+                if self._closed or len(self._idle) + self._creating >= self.min_size:
+                    return
+                if len(self._idle) + len(self._in_use) + self._creating >= self.max_size:
+                    return
+                self._creating += 1
+
+            if not self._create_idle():
+                return
+            logger.info(f"驱动池预热完成一个驱动，当前空闲: {len(self._idle)}")
+
+    def _create_idle(self) -> bool:
+        """创建一个驱动放入空闲列表，调用方需已预先占用容量（_creating）"""
+        try:
+            pooled = self._create()
+        except Exception as e:
+            logger.error(f"创建浏览器驱动失败: {e}")
+            return False
+
+        with self._cond:
+            self._creating -= 1
+            if self._closed:
+                self._quit(pooled)
+                return False
+            self._idle.append(pooled)
+            self._cond.notify()
+        return True
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledDriver:
+        """
+        借出一个健康的驱动，必要时新建
+
+        Args:
+            timeout: 最长等待时间（秒），默认使用配置值
+
+        Returns:
+            PooledDriver: 借出的驱动
+
+        Raises:
+            TimeoutError: 池已满且等待超时
+            RuntimeError: 驱动池已关闭
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        self._ensure_watchdog()
+
+        while True:
+            pooled = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("驱动池已关闭")
+                    # 取出的空闲驱动和新建的驱动在同一锁内计入 _in_use，其他线程不会看到多余的容量
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        self._in_use.append(pooled)
+                        break
+                    if len(self._in_use) + self._creating < self.max_size:
+                        self._creating += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"等待可用浏览器驱动超时（{timeout}秒）")
+                    self._cond.wait(remaining)
+
+            if pooled is None:
+                pooled = self._create()
+                with self._cond:
+                    self._creating -= 1
+                    self._in_use.append(pooled)
+            elif not self._is_healthy(pooled):
+                logger.warning("池中驱动健康检查失败，丢弃并重新获取")
+                self._quit(pooled)
+                self._remove_in_use(pooled)
+                continue
+
+            pooled.use_count += 1
+            pooled.last_used = time.time()
+            return pooled
+
+    def release(self, pooled: PooledDriver, discard: bool = False) -> None:
+        """
+        归还驱动，重置失败或指定丢弃时直接关闭
+
+        Args:
+            pooled: 借出的驱动
+            discard: 是否丢弃该驱动
+        """
+        # 重置和关闭期间驱动仍计入 _in_use，移出时在同一锁内放回空闲列表，其他线程不会看到多余的容量
+        if not discard and not self._closed:
+            reason = self._recycle_reason(pooled)
+            if reason:
+                self._remove_in_use(pooled)
+                self._recycle(pooled, reason)
+                return
+            discard = not self._reset(pooled)
+
+        if discard or self._closed:
+            self._quit(pooled)
+            self._remove_in_use(pooled)
+            return
+
+        pooled.last_used = time.time()
+        with self._cond:
+            self._remove_in_use(pooled)
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    def _remove_in_use(self, pooled: PooledDriver) -> None:
+        """把驱动移出借出列表并唤醒等待的线程"""
+        with self._cond:
+            if pooled in self._in_use:
+                self._in_use.remove(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[PooledDriver]:
+        """借出驱动的上下文管理器，退出时自动归还"""
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled
+        finally:
+            self.release(pooled)
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        """检查驱动对应的浏览器是否仍可响应"""
+        try:
+            pooled.driver.execute_script("return 1;")
+            return bool(pooled.driver.window_handles)
+        except Exception as e:
+            logger.debug(f"驱动健康检查异常: {e}")
+            return False
+
+    def _reset(self, pooled: PooledDriver) -> bool:
+        """关闭多余标签页并回到空白页，保留 Cookie 以便下次复用"""
+        driver = pooled.driver
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            logger.warning(f"重置浏览器驱动失败，将丢弃: {e}")
+            return False
+
+    def _recycle_reason(self, pooled: PooledDriver) -> Optional[str]:
+        """判断驱动是否需要回收，返回原因，无需回收时返回 None"""
+        if self.max_uses and pooled.use_count >= self.max_uses:
+            return f"已借出 {pooled.use_count} 次"
+        age = time.time() - pooled.created_at
+        if self.max_age and age >= self.max_age:
+            return f"已运行 {int(age)} 秒"
+        if self.max_rss_mb:
+            try:
+                pooled.rss = self.rss_probe(pooled.driver)
+            except Exception as e:
+                logger.debug(f"采样浏览器内存失败: {e}")
+                pooled.rss = None
+            if pooled.rss and pooled.rss >= self.max_rss_mb * 1024 * 1024:
+                return f"内存占用 {pooled.rss // (1024 * 1024)}MB"
+        return None
+
+    def _recycle(self, pooled: PooledDriver, reason: str) -> None:
+        """
+        回收驱动：在后台关闭浏览器，同时启动替换驱动放入空闲列表
+
+        调用方需已将驱动移出借出和空闲列表。
+        """
+        logger.info(f"回收浏览器驱动（{reason}），后台启动替换浏览器")
+        with self._cond:
+            self._recycled += 1
+            replace = (not self._closed and
+                       len(self._idle) + len(self._in_use) + self._creating < self.max_size)
+            if replace:
+                self._creating += 1
+        threading.Thread(target=self._quit, args=(pooled,), name="driver-pool-recycle", daemon=True).start()
+        if replace:
+            threading.Thread(target=self._create_idle, name="driver-pool-replace", daemon=True).start()
+
+    def _ensure_watchdog(self) -> None:
+        """按需启动后台检查线程"""
+        if not self.watchdog_interval:
+            return
+        with self._cond:
+            if self._closed or (self._watchdog and self._watchdog.is_alive()):
+                return
+            self._watchdog = threading.Thread(target=self._watch, name="driver-pool-watchdog", daemon=True)
+            self._watchdog.start()
+
+    def _watch(self) -> None:
+        """后台线程：定期检查空闲驱动，回收超出限制的驱动"""
+        while not self._stop_watchdog.wait(self.watchdog_interval):
+            self.check_idle()
+
+    def check_idle(self) -> int:
+        """
+        检查所有空闲驱动，回收达到发布次数、内存或存活时间上限的驱动
+
+        Returns:
+            int: 本次回收的驱动数
+        """
+        with self._cond:
+            idle = list(self._idle)
+        recycled = 0
+        for pooled in idle:
+            reason = self._recycle_reason(pooled)
+            if not reason:
+                continue
+            with self._cond:
+                # 检查期间可能已被借出
+                if pooled not in self._idle:
+                    continue
+                self._idle.remove(pooled)
+            self._recycle(pooled, reason)
+            recycled += 1
+        return recycled
+
+    def _quit(self, pooled: PooledDriver) -> None:
+        """关闭驱动对应的浏览器"""
+        try:
+            self.destroy(pooled.driver)
+        except Exception as e:
+            logger.debug(f"关闭浏览器驱动异常: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """返回驱动池当前状态"""
+        with self._cond:
+            return {
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'creating': self._creating,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'recycled': self._recycled
+            }
+
+    def close(self) -> None:
+        """关闭驱动池及其中所有空闲驱动，借出中的驱动在归还时关闭"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        self._stop_watchdog.set()
+
+        for pooled in idle:
+            self._quit(pooled)
+        if idle:
+            logger.info(f"驱动池已关闭，释放 {len(idle)} 个浏览器")
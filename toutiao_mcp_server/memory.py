@@ -0,0 +1,99 @@
+"""
+浏览器内存采样模块
+
+统计 chromedriver 及其启动的 Chrome 进程树的常驻内存（RSS），供驱动池判断是否需要回收浏览器。
+安装 psutil 时使用 psutil，否则在 Linux 上读取 /proc。
+"""
+
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:  # psutil 为可选依赖
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+def _proc_children() -> Dict[int, List[int]]:
+    """读取 /proc 构建父进程到子进程的映射"""
+    children: Dict[int, List[int]] = {}
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat', 'r') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # 进程名可能包含空格和括号，从最后一个右括号之后解析
+        fields = stat[stat.rfind(')') + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(name))
+    return children
+
+
+def _proc_rss(pid: int) -> int:
+    """从 /proc/<pid>/statm 读取进程的常驻内存（字节）"""
+    try:
+        with open(f'/proc/{pid}/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """
+    统计进程及其所有子进程的常驻内存总和
+
+    Args:
+        pid: 根进程 ID
+
+    Returns:
+        int: 常驻内存总和（字节），无法采样时返回 None
+    """
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            total = root.memory_info().rss
+            for child in root.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            return total
+        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+            logger.debug(f"采样进程 {pid} 内存失败: {e}")
+            return None
+
+    if not os.path.isdir(f'/proc/{pid}'):
+        return None
+    children = _proc_children()
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        total += _proc_rss(current)
+        pending.extend(children.get(current, []))
+    return total
+
+
+def driver_rss(driver: Any) -> Optional[int]:
+    """
+    统计 WebDriver 对应的 chromedriver 进程树（含 Chrome 浏览器及其渲染进程）的常驻内存
+
+    Args:
+        driver: Selenium WebDriver 实例
+
+    Returns:
+        int: 常驻内存总和（字节），无法获取进程 ID 或采样失败时返回 None
+    """
+    try:
+        pid = driver.service.process.pid
+    except AttributeError:
+        return None
+    if not isinstance(pid, int):
+        return None
+    return process_tree_rss(pid)
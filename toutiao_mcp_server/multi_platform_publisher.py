@@ -19,15 +19,16 @@ logger = logging.getLogger(__name__)
 class MultiPlatformPublisher:
     """多平台内容发布管理类 - 兼容小红书数据格式"""
     
-    def __init__(self, auth: TouTiaoAuth):
+    def __init__(self, auth: TouTiaoAuth, publisher: Optional[TouTiaoPublisher] = None):
         """
         初始化多平台发布管理器
         
         Args:
             auth: 认证管理器实例
+            publisher: 共享的发布器实例（复用其浏览器驱动池），默认新建
         """
         self.auth = auth
-        self.publisher = TouTiaoPublisher(auth)
+        self.publisher = publisher or TouTiaoPublisher(auth)
         
     def sanitize_text(self, text: str) -> str:
         """
@@ -208,34 +209,23 @@ class MultiPlatformPublisher:
                     "message": "请先登录今日头条账户"
                 }
             
-            # 验证必要字段
-            if not title:
-                return {
-                    "success": False,
-                    "message": "标题不能为空"
-                }
+            job = self.build_publish_job(title, content, image_paths)
+            if "type" not in job:
+                return job
             
-            if not content:
-                return {
-                    "success": False,
-                    "message": "内容不能为空"
-                }
-            
-            # 检查内容长度，今日头条支持长文本，但微头条有限制
-            is_micro_post = len(content) <= 2000 and len(image_paths) <= 9
-            
-            if is_micro_post:
+            # 异步发布接口按配置的后端执行，不阻塞事件循环
+            if job["type"] == "micro_post":
                 # 发布为微头条
-                result = self.publisher.publish_micro_post(
-                    content=f"{title}\n\n{content}",
-                    images=image_paths
+                result = await self.publisher.publish_micro_post_async(
+                    content=job["content"],
+                    images=job["images"]
                 )
             else:
                 # 发布为图文文章
-                result = self.publisher.publish_article(
-                    title=title,
-                    content=content,
-                    images=image_paths,
+                result = await self.publisher.publish_article_async(
+                    title=job["title"],
+                    content=job["content"],
+                    images=job["images"],
                     original=True
                 )
             
@@ -248,6 +238,37 @@ class MultiPlatformPublisher:
                 "message": f"发布异常: {str(e)}"
             }
     
+    def build_publish_job(self, title: str, content: str, image_paths: List[str]) -> Dict[str, Any]:
+        """
+        校验内容并决定发布类型，生成发布任务
+        
+        Args:
+            title: 标题
+            content: 内容
+            image_paths: 本地图片路径列表
+            
+        Returns:
+            Dict: 发布任务（type 为 micro_post 或 article，格式同 TouTiaoPublisher.publish_batch）；
+                校验失败时返回 {"success": False, "message": ...}
+        """
+        # 验证必要字段
+        if not title:
+            return {
+                "success": False,
+                "message": "标题不能为空"
+            }
+        
+        if not content:
+            return {
+                "success": False,
+                "message": "内容不能为空"
+            }
+        
+        # 检查内容长度，今日头条支持长文本，但微头条有限制
+        if len(content) <= 2000 and len(image_paths) <= 9:
+            return {"type": "micro_post", "content": f"{title}\n\n{content}", "images": image_paths}
+        return {"type": "article", "title": title, "content": content, "images": image_paths}
+    
     async def process_xiaohongshu_records(self, records: List[Dict[str, Any]], 
                                         download_folder: str) -> List[Dict[str, Any]]:
         """
@@ -261,6 +282,8 @@ class MultiPlatformPublisher:
             List[Dict]: 发布结果列表
         """
         results = []
+        # 待发布的记录：(结果项, 发布任务)
+        pending = []
         
         # 确保下载目录存在
         os.makedirs(download_folder, exist_ok=True)
@@ -290,30 +313,20 @@ class MultiPlatformPublisher:
                     else:
                         logger.warning(f"未能下载图片: {toutiao_data['image_url']}")
                 
-                # 发布到今日头条
-                publish_result = await self.publish_to_toutiao_compatible(
-                    toutiao_data['title'],
-                    toutiao_data['content'], 
-                    local_image_paths
-                )
-                
                 # 记录结果
                 result_item = {
                     "index": i + 1,
                     "title": toutiao_data['title'],
-                    "publish_result": publish_result,
                     "image_count": len(local_image_paths)
                 }
                 
-                results.append(result_item)
-                
-                if publish_result.get('success'):
-                    logger.info(f"✓ 记录 {i+1} 发布成功")
+                job = self.build_publish_job(toutiao_data['title'], toutiao_data['content'], local_image_paths)
+                if "type" in job:
+                    pending.append((result_item, job))
                 else:
-                    logger.error(f"✗ 记录 {i+1} 发布失败: {publish_result.get('message')}")
-                
-                # 避免过于频繁的请求
-                await asyncio.sleep(2)
+                    result_item["publish_result"] = job
+                    logger.error(f"✗ 记录 {i+1} 发布失败: {job.get('message')}")
+                results.append(result_item)
                 
             except Exception as e:
                 logger.error(f"处理记录 {i+1} 时发生异常: {e}")
@@ -327,8 +340,43 @@ class MultiPlatformPublisher:
                     "image_count": 0
                 })
         
+        if pending:
+            await self._publish_pending(pending)
+        
         return results
     
+    async def _publish_pending(self, pending: List[Any]) -> None:
+        """
+        按发布类型分组后在同一个浏览器中依次发布，连续的同类记录复用同一个发布页面
+        
+        Args:
+            pending: (结果项, 发布任务) 列表，发布结果写入结果项的 publish_result
+        """
+        if not self.auth.check_login_status():
+            for result_item, _ in pending:
+                result_item["publish_result"] = {"success": False, "message": "请先登录今日头条账户"}
+            return
+        
+        # 同类记录排在一起，类型之间保持首次出现的顺序，同类记录保持原有顺序
+        type_order: Dict[str, int] = {}
+        for _, job in pending:
+            type_order.setdefault(job["type"], len(type_order))
+        grouped = sorted(pending, key=lambda item: type_order[item[1]["type"]])
+        
+        # 相邻两次发布间隔 2 秒，避免过于频繁的请求
+        batch = await self.publisher.publish_batch_async([job for _, job in grouped], interval=2)
+        batch_results = batch.get("results", [])
+        for n, (result_item, _) in enumerate(grouped):
+            publish_result = batch_results[n] if n < len(batch_results) else {
+                "success": False,
+                "message": batch.get("message", "发布未执行")
+            }
+            result_item["publish_result"] = publish_result
+            if publish_result.get('success'):
+                logger.info(f"✓ 记录 {result_item['index']} 发布成功")
+            else:
+                logger.error(f"✗ 记录 {result_item['index']} 发布失败: {publish_result.get('message')}")
+    
     def generate_publish_summary(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         生成发布摘要报告
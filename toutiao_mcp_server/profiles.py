@@ -0,0 +1,164 @@
+"""
+Chrome 持久化用户目录管理模块
+
+为每个账号维护受管理的 --user-data-dir，使浏览器在多次发布之间保留 Cookie、
+localStorage 和页面资源缓存。每个目录同一时间只允许一个浏览器使用。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+# 目录锁文件和 Cookie 注入记录文件名
+LOCK_FILE_NAME = ".toutiao_profile.lock"
+SEED_FILE_NAME = ".toutiao_cookie_seed.json"
+
+
+def profile_key(cookies_file: str) -> str:
+    """
+    根据 Cookie 文件生成账号用户目录名
+
+    仅用文件名会让不同目录下同名的 Cookie 文件共用一个用户目录，
+    因此附加绝对路径的哈希。
+
+    Args:
+        cookies_file: 账号 Cookie 文件路径
+
+    Returns:
+        str: 形如 "<文件名>-<路径哈希>" 的目录名
+    """
+    path = Path(cookies_file).expanduser().resolve()
+    digest = hashlib.sha1(str(path).encode('utf-8')).hexdigest()[:12]
+    return f"{path.stem}-{digest}"
+
+
+class ProfileSlot:
+    """一个已加锁的用户目录"""
+
+    def __init__(self, path: Path, lock_file):
+        """
+        初始化用户目录槽位
+
+        Args:
+            path: 用户目录路径
+            lock_file: 持有锁的文件对象
+        """
+        self.path = path
+        self._lock_file = lock_file
+
+    def read_seed(self) -> Any:
+        """读取该目录上次注入 Cookie 时对应的 Cookie 版本"""
+        try:
+            with open(self.path / SEED_FILE_NAME, 'r', encoding='utf-8') as f:
+                return json.load(f).get('cookies_version')
+        except Exception:
+            return None
+
+    def write_seed(self, cookies_version: Any) -> None:
+        """记录该目录已注入的 Cookie 版本"""
+        try:
+            with open(self.path / SEED_FILE_NAME, 'w', encoding='utf-8') as f:
+                json.dump({'cookies_version': cookies_version}, f)
+        except Exception as e:
+            logger.warning(f"记录用户目录 Cookie 版本失败: {e}")
+
+    def invalidate_seed(self) -> None:
+        """清除注入记录，下次使用时重新注入 Cookie"""
+        try:
+            (self.path / SEED_FILE_NAME).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ChromeProfileManager:
+    """按账号分配并加锁 Chrome 用户目录"""
+
+    def __init__(self, root: str, account: str, max_slots: int = 8):
+        """
+        初始化用户目录管理器
+
+        Args:
+            root: 所有账号用户目录的根目录
+            account: 账号标识，每个账号使用独立的子目录
+            max_slots: 单个账号最多同时使用的目录数
+        """
+        self.base_dir = Path(root) / account
+        self.max_slots = max_slots
+        self._held: Dict[str, ProfileSlot] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _try_lock(lock_path: Path):
+        """尝试对锁文件加排他锁，失败返回 None"""
+        lock_file = open(lock_path, 'a+')
+        try:
+            if os.name == 'nt':
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return lock_file
+        except OSError:
+            lock_file.close()
+            return None
+
+    def acquire(self) -> ProfileSlot:
+        """
+        分配一个未被其他浏览器（包括其他进程）使用的用户目录
+
+        Returns:
+            ProfileSlot: 已加锁的用户目录
+
+        Raises:
+            RuntimeError: 所有目录都在使用中
+        """
+        with self._lock:
+            for index in range(self.max_slots):
+                path = self.base_dir / f"profile-{index}"
+                if str(path) in self._held:
+                    continue
+                path.mkdir(parents=True, exist_ok=True)
+                lock_file = self._try_lock(path / LOCK_FILE_NAME)
+                if lock_file is None:
+                    continue
+                slot = ProfileSlot(path, lock_file)
+                self._held[str(path)] = slot
+                logger.info(f"使用持久化浏览器用户目录: {path}")
+                return slot
+        raise RuntimeError(f"账号用户目录已全部占用（最多 {self.max_slots} 个）: {self.base_dir}")
+
+    def release(self, slot: ProfileSlot) -> None:
+        """释放用户目录的锁"""
+        with self._lock:
+            self._held.pop(str(slot.path), None)
+        try:
+            if os.name == 'nt':
+                slot._lock_file.seek(0)
+                msvcrt.locking(slot._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(slot._lock_file.fileno(), fcntl.LOCK_UN)
+        except OSError as e:
+            logger.debug(f"释放用户目录锁失败: {e}")
+        finally:
+            slot._lock_file.close()
+
+    def invalidate_seeds(self) -> None:
+        """清除该账号所有用户目录的 Cookie 注入记录，强制下次使用时重新注入"""
+        if not self.base_dir.exists():
+            return
+        for path in self.base_dir.glob("profile-*"):
+            try:
+                (path / SEED_FILE_NAME).unlink()
+            except FileNotFoundError:
+                pass
@@ -4,41 +4,141 @@
 使用Selenium自动化操作浏览器发布内容，更加稳定可靠
 """
 
+import asyncio
+import functools
 import json
 import time
 import logging
-import base64
 import os
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
+from urllib.parse import urlsplit
 import mimetypes
+import html
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
 
 import requests
 from PIL import Image
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 
-from .config import TOUTIAO_URLS, CONTENT_CONFIG, SELENIUM_CONFIG
+from .config import (
+    TOUTIAO_URLS,
+    CONTENT_CONFIG,
+    SELENIUM_CONFIG,
+    LEAN_PROFILE_CONFIG,
+    DRIVER_POOL_CONFIG,
+    PUBLISH_CONFIG,
+    ASYNC_CDP_CONFIG
+)
+from . import cdp
+from .async_cdp import AsyncBrowser, AsyncPage
+from .content import CLEAR_EDITOR_FUNCTION, insert_blocks, insert_blocks_async, render_blocks
 from .auth import TouTiaoAuth
+from .chromedriver import create_chrome_driver
+from .driver_pool import DriverPool, PooledDriver
+from .profiles import ChromeProfileManager, ProfileSlot, profile_key
+from .tabs import TabContext, TabScheduler
+from .timing import StepTimer, get_timing_aggregator
+from .debug_artifacts import get_debug_store
+from .waits import (
+    PageWaiter,
+    LOGIN_REQUIRED,
+    MASK_SELECTORS,
+    PUBLISH_SUCCEEDED,
+    PUBLISH_SUCCEEDED_SCRIPT,
+    UPLOAD_ERROR_SELECTORS,
+    UPLOAD_PROGRESS_SELECTORS,
+    UPLOAD_SNAPSHOT_SCRIPT,
+    UPLOAD_THUMBNAIL_SELECTORS
+)
 
 logger = logging.getLogger(__name__)
 
+# 在页面内重置发布页：关闭弹窗、删除已插入的图片、清空标题和编辑器，返回是否已恢复为空白状态
+_RESET_EDITOR_SCRIPT = CLEAR_EDITOR_FUNCTION + """
+var masks = arguments[0];
+document.querySelectorAll('.byte-modal-close-icon, .byte-drawer-close-icon').forEach(function (el) { el.click(); });
+document.querySelectorAll(
+    "[class*='image-item'] [class*='delete'], [class*='img-item'] [class*='close'], .byte-upload-list-item [class*='remove']"
+).forEach(function (el) { el.click(); });
+document.querySelectorAll('textarea, input[type=text]').forEach(function (el) {
+    if (!el.value) { return; }
+    var proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, '');
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+});
+var editors = document.querySelectorAll('.ProseMirror, [contenteditable=true]');
+var clean = Array.prototype.map.call(editors, clearEditor).every(Boolean);
+return clean && !document.querySelector(masks);
+"""
+
+# 文章发布页的标题输入框和预览发布弹窗中的最终确认按钮
+ARTICLE_TITLE_SELECTOR = "textarea[placeholder*='请输入文章标题（2～30个字）']"
+ARTICLE_CONFIRM_SELECTOR = (
+    "button.byte-btn.byte-btn-primary.byte-btn-size-large.byte-btn-shape-square.publish-btn.publish-btn-last"
+)
+
+# 微头条发布页的图片、发布和确认按钮
+MICRO_IMAGE_BUTTON_XPATH = "//button[contains(@title, '图片')] | //span[contains(text(), '图片')]/ancestor::button"
+MICRO_PUBLISH_BUTTON_XPATH = "//span[contains(text(), '发布')]/ancestor::button | //button[contains(text(), '发布')]"
+MICRO_CONFIRM_BUTTON_XPATH = "//button[contains(text(), '确定')] | //button[contains(text(), '确认')]"
+
+# 微头条编辑器候选选择器，按优先级排列
+MICRO_EDITOR_SELECTORS = [
+    # 最常见的编辑器选择器
+    ".ProseMirror",
+    "div.ProseMirror",
+    # 今日头条常用的编辑器类名
+    ".syl-editor .ProseMirror",
+    ".publish-box .ProseMirror",
+    ".wtt-publish-wrap .ProseMirror",
+    # Textarea 元素
+    "textarea",
+    "textarea.byte-textarea-content",
+    # Contenteditable 元素
+    "[contenteditable='true']",
+    "div[contenteditable='true']",
+    # 其他可能的选择器
+    "div[role='textbox']",
+    ".syl-editor",
+    "div[class*='editor']",
+    "div[data-slate-editor='true']",
+]
+
+class PublishOutcomeUnknown(Exception):
+    """发布请求可能已被服务器受理（读取超时、5xx 等），不能回退到浏览器重复发布"""
+
 class TouTiaoPublisher:
     """今日头条内容发布管理类"""
     
-    def __init__(self, auth: TouTiaoAuth):
+    def __init__(self, auth: TouTiaoAuth, driver_pool: Optional[DriverPool] = None):
         """
         初始化发布管理器
         
         Args:
             auth: 认证管理器实例
+            driver_pool: 浏览器驱动池，默认按 DRIVER_POOL_CONFIG 创建
         """
         self.auth = auth
         self.session = auth.session
+        # 持久化用户目录模式下，每个浏览器独占一个账号用户目录
+        self.profiles: Optional[ChromeProfileManager] = None
+        if SELENIUM_CONFIG.get('profile_mode') == 'persistent':
+            self.profiles = ChromeProfileManager(
+                SELENIUM_CONFIG['user_data_root'],
+                profile_key(auth.cookies_file)
+            )
+        self._driver_profiles: Dict[int, ProfileSlot] = {}
+        # 手动要求重新注入Cookie时递增
+        self._cookie_epoch = 0
+        self.driver_pool = driver_pool or DriverPool(self._setup_driver, destroy=self._destroy_driver)
+        # 上次发布微头条时命中的编辑器选择器
+        self._micro_editor_selector: Optional[str] = None
+        # 图片预上传线程池，首次使用时创建
+        self._upload_executor: Optional[ThreadPoolExecutor] = None
     
     def _upload_image(self, image_path: str, compress: bool = True) -> Optional[Dict[str, Any]]:
         """
@@ -160,29 +260,173 @@ class TouTiaoPublisher:
         # 设置用户代理
         chrome_options.add_argument(f"--user-agent={self.session.headers['User-Agent']}")
         
+        # 精简发布配置：无头运行，DOMContentLoaded 后即返回
+        lean = self._is_lean_profile()
+        if lean:
+            chrome_options.page_load_strategy = LEAN_PROFILE_CONFIG['page_load_strategy']
+        
         # 如果配置为无头模式
-        if SELENIUM_CONFIG.get('headless', False):
+        if SELENIUM_CONFIG.get('headless', False) or (lean and LEAN_PROFILE_CONFIG['headless']):
             chrome_options.add_argument('--headless')
         
-        # 使用 webdriver-manager 自动管理 ChromeDriver
+        # 持久化用户目录模式：独占一个账号用户目录
+        slot = None
+        if self.profiles:
+            slot = self.profiles.acquire()
+            chrome_options.add_argument(f"--user-data-dir={slot.path}")
+        
+        # 使用进程级缓存的 ChromeDriver 路径，避免每次都联网解析
         try:
-            from webdriver_manager.chrome import ChromeDriverManager
             logger.info("正在准备 ChromeDriver...")
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
+            driver = create_chrome_driver(chrome_options)
             logger.info("ChromeDriver 初始化成功")
         except Exception as e:
             logger.error(f"ChromeDriver 初始化失败: {e}")
+            if slot:
+                self.profiles.release(slot)
             raise
         
+        if slot:
+            self._driver_profiles[id(driver)] = slot
+        
+        # 屏蔽统计上报、字体、广告和非必要图片，减少编辑页加载的资源
+        if lean:
+            try:
+                cdp.set_blocked_urls(driver, LEAN_PROFILE_CONFIG['blocked_urls'])
+                logger.info(f"已启用精简发布配置，屏蔽 {len(LEAN_PROFILE_CONFIG['blocked_urls'])} 类请求")
+            except Exception as e:
+                logger.warning(f"设置请求屏蔽失败，将加载完整页面: {e}")
+        
         # 设置超时时间
         driver.implicitly_wait(SELENIUM_CONFIG['implicit_wait'])
         
-        # 把当前认证Cookie传递给浏览器
         return driver
     
+    @staticmethod
+    def _is_lean_profile() -> bool:
+        """是否使用精简发布配置"""
+        return SELENIUM_CONFIG.get('publish_profile', 'standard') == 'lean'
+    
+    def _destroy_driver(self, driver: webdriver.Chrome) -> None:
+        """关闭浏览器并释放其占用的用户目录"""
+        try:
+            driver.quit()
+        finally:
+            slot = self._driver_profiles.pop(id(driver), None)
+            if slot:
+                self.profiles.release(slot)
+    
+    def _acquire_driver(self, timer: Optional[StepTimer] = None) -> PooledDriver:
+        """从驱动池借出浏览器，并确保浏览器中的登录Cookie是最新的"""
+        timer = timer or StepTimer()
+        timer.start('driver_acquire')
+        pooled = self.driver_pool.acquire()
+        try:
+            timer.start('cookie_transfer')
+            self.auth.reload_cookies_if_changed()
+            version = (self.auth.cookies_version, self._cookie_epoch)
+            if pooled.state.get('cookies_version') != version:
+                slot = self._driver_profiles.get(id(pooled.driver))
+                if slot and slot.read_seed() == list(version):
+                    logger.info("持久化用户目录中的登录Cookie已是最新，跳过Cookie传递")
+                else:
+                    self._transfer_cookies_to_driver(pooled.driver)
+                    if slot:
+                        slot.write_seed(list(version))
+                pooled.state['cookies_version'] = version
+        except Exception:
+            self.driver_pool.release(pooled, discard=True)
+            raise
+        finally:
+            timer.stop()
+        return pooled
+    
+    def _invalidate_driver_cookies(self, pooled: PooledDriver) -> None:
+        """浏览器登录态失效时清除Cookie注入记录，下次借出时重新传递，并使登录状态缓存失效"""
+        pooled.state.pop('cookies_version', None)
+        self.auth.invalidate_login_cache()
+        slot = self._driver_profiles.get(id(pooled.driver))
+        if slot:
+            slot.invalidate_seed()
+    
+    def reseed_profiles(self) -> None:
+        """
+        要求所有浏览器（含持久化用户目录）在下次使用时重新从Cookie文件注入登录态
+        
+        TouTiaoAuth 重新登录保存Cookie后会自动触发，无需手动调用
+        """
+        self._cookie_epoch += 1
+        if self.profiles:
+            self.profiles.invalidate_seeds()
+    
+    def close(self) -> None:
+        """关闭发布器持有的所有浏览器"""
+        self.driver_pool.close()
+        if self._upload_executor:
+            self._upload_executor.shutdown(wait=False)
+    
+    def _start_preupload(self, paths: List[Optional[str]]) -> Dict[str, Future]:
+        """
+        在后台线程中并发上传图片，调用方可同时借出浏览器
+        
+        Args:
+            paths: 图片路径列表，重复和空路径会被忽略
+            
+        Returns:
+            Dict: {图片路径: 上传任务}
+        """
+        if self._upload_executor is None:
+            self._upload_executor = ThreadPoolExecutor(
+                max_workers=PUBLISH_CONFIG['upload_workers'], thread_name_prefix="image-upload"
+            )
+        futures: Dict[str, Future] = {}
+        for path in paths:
+            if path and path not in futures:
+                futures[path] = self._upload_executor.submit(self._upload_image, path)
+        if futures:
+            logger.info(f"开始并发预上传 {len(futures)} 张图片")
+        return futures
+    
+    def _start_article_preupload(self,
+                                 images: Optional[List[str]],
+                                 cover_image: Optional[str]) -> Optional[Dict[str, Future]]:
+        """
+        按 PUBLISH_CONFIG['preupload_images'] 预上传文章图片，未开启时返回 None
+
+        封面只能从正文图片中按地址选择，不在 images 中的封面不插入正文，不预上传，由封面弹窗上传。
+        """
+        if not PUBLISH_CONFIG['preupload_images']:
+            return None
+        return self._start_preupload(list(images or []))
+    
+    @staticmethod
+    def _collect_preuploads(futures: Dict[str, Future]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        等待预上传完成
+        
+        Returns:
+            Dict: {图片路径: 上传结果}，上传失败或超时的图片为 None
+        """
+        deadline = time.monotonic() + PUBLISH_CONFIG['upload_timeout']
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        for path, future in futures.items():
+            try:
+                results[path] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except Exception as e:
+                logger.warning(f"图片预上传失败: {path}: {e}")
+                results[path] = None
+        return results
+    
     def _transfer_cookies_to_driver(self, driver: webdriver.Chrome):
-        """将session中的Cookie传递给浏览器"""
+        """将session中的Cookie传递给浏览器，优先通过CDP一次性写入"""
+        if cdp.supports_cdp(driver):
+            try:
+                count = cdp.set_cookies(driver, self.session.cookies, domain_keyword='.toutiao.com')
+                logger.info(f"已通过CDP将 {count} 个登录Cookie传递给浏览器")
+                return
+            except Exception as e:
+                logger.warning(f"通过CDP传递Cookie失败，改用逐个添加: {e}")
+        
         # 先访问主域名
         driver.get("https://mp.toutiao.com")
         time.sleep(2)
@@ -202,6 +446,215 @@ class TouTiaoPublisher:
         
         logger.info("已将登录Cookie传递给浏览器")
     
+    def _post_publish_api(self, url: str, data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        通过已登录的 session 调用发布接口
+        
+        Args:
+            url: 发布接口地址
+            data: 表单数据
+            
+        Returns:
+            (接口返回的JSON, '')；请求确定未被受理（连接失败、4xx、被重定向到登录页）时返回 (None, 原因)，
+            调用方可回退到浏览器发布
+            
+        Raises:
+            PublishOutcomeUnknown: 请求已发出但结果未知（读取超时、5xx、无法识别的 200 响应）
+        """
+        try:
+            response = self.session.post(url, data=data, timeout=PUBLISH_CONFIG['api_timeout'])
+        except requests.exceptions.ConnectionError as e:
+            # 包括 ConnectTimeout：连接未建立，请求未发出
+            return None, f'连接失败: {e}'
+        except Exception as e:
+            raise PublishOutcomeUnknown(f'请求已发出但未收到完整响应: {type(e).__name__} - {e}')
+        
+        login_path = urlsplit(TOUTIAO_URLS['login']).path
+        if response.history and urlsplit(response.url).path.startswith(login_path):
+            return None, '被重定向到登录页'
+        if response.status_code >= 500:
+            raise PublishOutcomeUnknown(f'状态码 {response.status_code}')
+        if response.status_code != 200:
+            return None, f'状态码 {response.status_code}'
+        try:
+            body = response.json()
+        except ValueError:
+            raise PublishOutcomeUnknown('响应不是JSON')
+        if not isinstance(body, dict) or 'message' not in body:
+            raise PublishOutcomeUnknown('响应格式无法识别')
+        return body, ''
+    
+    @staticmethod
+    def _outcome_unknown_result(reason: str, **fields: Any) -> Dict[str, Any]:
+        """发布请求结果未知时的返回值：不自动重试，提示到头条号后台确认"""
+        return {
+            'success': False,
+            **fields,
+            'outcome_unknown': True,
+            'message': f'发布结果未知（{reason}），内容可能已发布，请到头条号后台确认后再决定是否重新发布'
+        }
+    
+    def _redirected_to_login_result(self, **fields: Any) -> Dict[str, Any]:
+        """点击发布后页面跳转到登录页：登录已失效，发布失败且结果未知"""
+        logger.warning("发布后页面被重定向到登录页，请重新登录后到头条号后台确认")
+        self.auth.invalidate_login_cache()
+        return self._outcome_unknown_result('发布后被重定向到登录页，需要重新登录', **fields)
+    
+    @staticmethod
+    def _format_api_content(content: str, content_format: str = 'auto') -> str:
+        """将正文转换为发布接口使用的HTML，与浏览器发布使用相同的段落转换"""
+        return ''.join(render_blocks(content, content_format))
+    
+    def _publish_article_api(self,
+                             title: str,
+                             content: str,
+                             images: Optional[List[str]] = None,
+                             tags: Optional[List[str]] = None,
+                             category: Optional[str] = None,
+                             cover_image: Optional[str] = None,
+                             publish_time: Optional[str] = None,
+                             original: bool = True,
+                             content_format: str = 'auto',
+                             timer: Optional[StepTimer] = None) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        直接调用文章发布接口，不启动浏览器
+        
+        Returns:
+            (发布结果, '')；请求确定未被受理、需要回退到浏览器发布时返回 (None, 原因)；
+            结果未知时返回 outcome_unknown 为 True 的失败结果，不回退
+        """
+        timer = timer or StepTimer()
+        logger.info(f"开始通过发布接口发布文章: {title}")
+        
+        covers = []
+        cover_path = cover_image or (images[0] if images else None)
+        if cover_path:
+            timer.start('cover_upload')
+            uploaded = self._upload_image(cover_path)
+            if not uploaded:
+                return None, f'封面图片上传失败: {cover_path}'
+            covers.append({
+                'uri': uploaded['web_uri'],
+                'url': uploaded['url'],
+                'thumb_width': uploaded.get('width'),
+                'thumb_height': uploaded.get('height')
+            })
+        
+        data = {
+            'title': title,
+            'content': self._format_api_content(content, content_format),
+            'article_type': 0,
+            'save': 1,  # 1 发布，0 存草稿
+            'pgc_feed_covers': json.dumps(covers, ensure_ascii=False),
+            'article_label': ','.join(tags or []),
+            'claim_origin': 1 if original else 0,
+            'timer_status': 1 if publish_time else 0,
+            'timer_time': publish_time or '',
+            'source': 0
+        }
+        if category:
+            data['category'] = category
+        
+        timer.start('api_request')
+        try:
+            body, reason = self._post_publish_api(TOUTIAO_URLS['publish_article'], data)
+        except PublishOutcomeUnknown as e:
+            logger.error(f"文章发布结果未知（{e}），不回退浏览器发布")
+            return self._outcome_unknown_result(str(e), title=title), ''
+        finally:
+            timer.stop()
+        if body is None:
+            return None, reason
+        
+        response_data = body.get('data') or {}
+        if body['message'] == 'success':
+            article_id = response_data.get('id') or response_data.get('pgc_id')
+            logger.info(f"文章通过发布接口发布成功: {article_id}")
+            return {
+                'success': True,
+                'title': title,
+                'article_id': str(article_id) if article_id else None,
+                'url': response_data.get('article_url'),
+                'message': '文章发布成功'
+            }, ''
+        
+        logger.error(f"发布接口返回失败: {body}")
+        return {
+            'success': False,
+            'title': title,
+            'message': f"发布接口返回失败: {body.get('reason') or body['message']}"
+        }, ''
+    
+    def _publish_micro_post_api(self,
+                                content: str,
+                                images: Optional[List[str]] = None,
+                                topic: Optional[str] = None,
+                                publish_time: Optional[str] = None,
+                                timer: Optional[StepTimer] = None) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        直接调用微头条发布接口，不启动浏览器
+        
+        Returns:
+            (发布结果, '')；请求确定未被受理、需要回退到浏览器发布时返回 (None, 原因)；
+            结果未知时返回 outcome_unknown 为 True 的失败结果，不回退
+        """
+        timer = timer or StepTimer()
+        logger.info(f"开始通过发布接口发布微头条: {content[:50]}...")
+        
+        if topic and not topic.startswith('#'):
+            topic = f"#{topic}#"
+        micro_content = f"{topic} {content}" if topic else content
+        
+        image_list = []
+        if images:
+            timer.start('image_upload')
+            images = images[:CONTENT_CONFIG['max_images_per_post']]
+            uploads = self._collect_preuploads(self._start_preupload(images))
+            for img_path in images:
+                uploaded = uploads.get(img_path)
+                if not uploaded:
+                    return None, f'图片上传失败: {img_path}'
+                image_list.append({
+                    'uri': uploaded['web_uri'],
+                    'url': uploaded['url'],
+                    'width': uploaded.get('width'),
+                    'height': uploaded.get('height')
+                })
+        
+        data = {
+            'content': micro_content,
+            'image_list': json.dumps(image_list, ensure_ascii=False),
+            'timer_status': 1 if publish_time else 0,
+            'timer_time': publish_time or ''
+        }
+        
+        timer.start('api_request')
+        try:
+            body, reason = self._post_publish_api(TOUTIAO_URLS['publish_micro'], data)
+        except PublishOutcomeUnknown as e:
+            logger.error(f"微头条发布结果未知（{e}），不回退浏览器发布")
+            return self._outcome_unknown_result(str(e)), ''
+        finally:
+            timer.stop()
+        if body is None:
+            return None, reason
+        
+        response_data = body.get('data') or {}
+        if body['message'] == 'success':
+            post_id = response_data.get('thread_id') or response_data.get('id')
+            logger.info(f"微头条通过发布接口发布成功: {post_id}")
+            return {
+                'success': True,
+                'post_id': str(post_id) if post_id else None,
+                'message': '微头条发布成功'
+            }, ''
+        
+        logger.error(f"发布接口返回失败: {body}")
+        return {
+            'success': False,
+            'message': f"发布接口返回失败: {body.get('reason') or body['message']}"
+        }, ''
+    
     def publish_article(self,
                        title: str,
                        content: str,
@@ -210,9 +663,11 @@ class TouTiaoPublisher:
                        category: Optional[str] = None,
                        cover_image: Optional[str] = None,
                        publish_time: Optional[str] = None,
-                       original: bool = True) -> Dict[str, Any]:
+                       original: bool = True,
+                       transport: Optional[str] = None,
+                       content_format: str = 'auto') -> Dict[str, Any]:
         """
-        通过Selenium发布文章到今日头条 - 根据具体页面元素优化
+        发布文章到今日头条，默认通过Selenium操作发布页面
         
         Args:
             title: 文章标题 (2-30个字)
@@ -220,879 +675,1488 @@ class TouTiaoPublisher:
             images: 文章中的图片路径列表
             tags: 文章标签列表
             category: 文章分类
-            cover_image: 封面图片路径
+            cover_image: 封面图片路径，默认使用 images 中的第一张
             publish_time: 定时发布时间（格式：YYYY-MM-DD HH:MM:SS）
             original: 是否为原创内容
+            transport: 发布方式，selenium 或 api，默认使用 PUBLISH_CONFIG['transport']；
+                api 方式在请求确定未被受理（连接失败、4xx 等）时回退到浏览器发布，
+                读取超时、5xx 等结果未知时不回退，返回 outcome_unknown 的失败结果
+            content_format: 正文格式，text（纯文本，逐行成段）、markdown、html 或 auto（自动判断）
             
         Returns:
-            Dict: 发布结果
+            Dict: 发布结果，waits 字段记录各等待条件的实际耗时，timings 字段记录各步骤耗时，
+                content_check 字段记录正文字数校验结果
         """
-        driver = None
+        timer = StepTimer()
+        transport = transport or PUBLISH_CONFIG['transport']
+        fallback_reason = None
+        if transport == 'api':
+            result, fallback_reason = self._publish_article_api(
+                title, content, images=images, tags=tags, category=category, cover_image=cover_image,
+                publish_time=publish_time, original=original, content_format=content_format, timer=timer
+            )
+            if result is None and not PUBLISH_CONFIG['api_fallback']:
+                result = {'success': False, 'title': title, 'message': f'发布接口返回非预期响应: {fallback_reason}'}
+            if result is not None:
+                result['transport'] = 'api'
+                self._record_timings('article', result, timer)
+                return result
+            logger.warning(f"发布接口返回非预期响应（{fallback_reason}），回退到浏览器发布")
+        elif transport != 'selenium':
+            return {'success': False, 'title': title, 'message': f'不支持的发布方式: {transport}'}
+        
+        pooled = None
+        waiter = None
         try:
             logger.info(f"开始发布文章: {title}")
             
-            # 初始化浏览器
-            driver = self._setup_driver()
+            # 预上传图片，与借出浏览器同时进行
+            preuploads = self._start_article_preupload(images, cover_image)
+            
+            # 从驱动池借出浏览器（已传递登录Cookie）
+            pooled = self._acquire_driver(timer)
+            waiter = PageWaiter(pooled.driver)
             
-            # 传递登录Cookie
-            self._transfer_cookies_to_driver(driver)
+            result = self._publish_article_flow(
+                pooled, waiter, title, content,
+                images=images, tags=tags, cover_image=cover_image, timer=timer, preuploads=preuploads,
+                content_format=content_format
+            )
+        except Exception as e:
+            logger.error(f"文章发布主流程发生异常: {e}", exc_info=True)
+            result = {
+                'success': False,
+                'title': title,
+                'message': f'文章发布异常: {type(e).__name__} - {str(e)}'
+            }
+        finally:
+            # 归还浏览器到驱动池，由驱动池负责重置
+            if pooled:
+                self.driver_pool.release(pooled)
+                logger.info("浏览器已归还驱动池")
+        
+        if waiter:
+            result['waits'] = waiter.records
+            logger.info(f"文章发布流程累计等待 {waiter.total_waited()} 秒")
+        result['transport'] = 'selenium'
+        if fallback_reason:
+            result['fallback_reason'] = fallback_reason
+        self._record_timings('article', result, timer)
+        return result
+    
+    def _publish_article_flow(self,
+                              pooled: PooledDriver,
+                              waiter: PageWaiter,
+                              title: str,
+                              content: str,
+                              images: Optional[List[str]] = None,
+                              tags: Optional[List[str]] = None,
+                              cover_image: Optional[str] = None,
+                              timer: Optional[StepTimer] = None,
+                              preuploads: Optional[Dict[str, Future]] = None,
+                              content_format: str = 'auto',
+                              hot_editor: bool = False) -> Dict[str, Any]:
+        """
+        在已借出的浏览器中执行文章发布的页面操作
+        
+        传入 preuploads（预上传任务）时，图片按上传后的地址插入正文，封面从正文图片中选择；
+        封面选择失败时回退到上传弹窗。正文按段落分批插入，插入后校验编辑器字数与源文本一致。
+        hot_editor 为 True 时复用已打开的发布页面（见 _open_publish_page）
+        """
+        driver = pooled.driver
+        timer = timer or StepTimer()
+        uploaded: Dict[str, Optional[Dict[str, Any]]] = {}
+        
+        # 打开发布页面
+        logger.info("正在打开文章发布页面...")
+        timer.start('navigation')
+        self._open_publish_page(pooled, waiter, 'article', TOUTIAO_URLS['article_page'], hot_editor)
+        
+        # 等待标题输入框和正文编辑器就绪
+        try:
+            logger.info("等待页面加载...")
+            timer.start('editor_ready')
+            content_editor = waiter.editor_ready(timeout=20)
+        except TimeoutException as e:
+            logger.error(f"等待页面加载超时: {e}")
+            return {
+                'success': False,
+                'message': '页面加载超时，请检查网络'
+            }
+        
+        # 检查是否需要重新登录
+        if content_editor == LOGIN_REQUIRED:
+            logger.warning("需要重新登录，请先运行登录脚本")
+            # 登录态失效，下次借出时重新传递Cookie
+            self._invalidate_driver_cookies(pooled)
+            return {
+                'success': False,
+                'message': '需要重新登录，请先运行登录脚本'
+            }
+        logger.info("页面加载完成")
+        
+        # 1. 输入标题
+        timer.start('title')
+        try:
+            logger.info("正在输入标题...")
             
-            # 打开发布页面
-            logger.info("正在打开文章发布页面...")
-            driver.get("https://mp.toutiao.com/profile_v4/graphic/publish")
-            time.sleep(1)  # 等待页面加载
+            # 检查并处理可能存在的遮罩层
+            mask = waiter.visible("mask_present", MASK_SELECTORS, timeout=0, required=False)
+            if mask:
+                logger.info("检测到遮罩层，尝试关闭...")
+                driver.execute_script("arguments[0].click();", mask)
+                if not waiter.mask_gone(timeout=1):
+                    from selenium.webdriver.common.keys import Keys
+                    webdriver.ActionChains(driver).send_keys(Keys.ESCAPE).perform()
+                    waiter.mask_gone(timeout=3)
             
-            # 检查是否需要重新登录
-            if "login" in driver.current_url or "auth" in driver.current_url:
-                logger.warning("需要重新登录，请先运行登录脚本")
-                return {
-                    'success': False,
-                    'message': '需要重新登录，请先运行登录脚本'
-                }
+            title_textarea = waiter.visible(
+                "title_input", ARTICLE_TITLE_SELECTOR, timeout=10
+            )
             
-            # 等待页面完全加载
+            # 先点击输入框激活它
             try:
-                logger.info("等待页面加载...")
-                WebDriverWait(driver, 20).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "textarea"))
-                )
-                time.sleep(2)  # 额外等待时间确保页面稳定
-                logger.info("页面加载完成")
+                driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", title_textarea)
             except Exception as e:
-                logger.error(f"等待页面加载超时: {e}")
-                return {
-                    'success': False,
-                    'message': '页面加载超时，请检查网络'
-                }
+                logger.warning(f"点击标题输入框失败: {e}")
             
-            # 1. 输入标题 - 根据您提供的具体元素
-            try:
-                logger.info("正在输入标题...")
-                
-                # 检查并处理可能存在的遮罩层
-                try:
-                    logger.info("检查是否存在遮罩层...")
-                    mask = WebDriverWait(driver, 3).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, ".byte-drawer-mask"))
-                    )
-                    if mask.is_displayed():
-                        logger.info("检测到遮罩层，尝试关闭...")
-                        # 使用JavaScript点击遮罩层关闭它
-                        driver.execute_script("arguments[0].click();", mask)
-                        time.sleep(1)
-                        # 或者尝试按ESC键关闭
-                        from selenium.webdriver.common.keys import Keys
-                        webdriver.ActionChains(driver).send_keys(Keys.ESCAPE).perform()
-                        time.sleep(1)  # 等待遮罩层消失
-                except Exception as e:
-                    logger.info(f"未检测到遮罩层或已自动关闭: {e}")
-                
-                # 等待页面稳定
-                time.sleep(1)
-                
-                # 根据您提供的标题输入框元素
-                title_textarea = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "textarea[placeholder*='请输入文章标题（2～30个字）']"))
-                )
-                
-                # 先点击输入框激活它
-                try:
-                    driver.execute_script("arguments[0].scrollIntoView(true);", title_textarea)
-                    time.sleep(1)
-                    driver.execute_script("arguments[0].click();", title_textarea)
-                    time.sleep(1)
-                except Exception as e:
-                    logger.warning(f"点击标题输入框失败: {e}")
-                
-                # 使用多种方法设置标题值
-                logger.info("使用多种方法设置标题...")
-                # 1. 先使用JavaScript清空
-                driver.execute_script("arguments[0].value = '';", title_textarea)
-                time.sleep(1)
-                
-                # 2. 使用send_keys方法
-                title_textarea.send_keys(title)
-                time.sleep(1)
-                
-                # 3. 再次使用JavaScript确保设置成功
-                driver.execute_script("arguments[0].value = arguments[1];", title_textarea, title)
-                
-                # 4. 触发输入事件，确保标题被正确识别
-                driver.execute_script("""
-                    var event = new Event('input', { bubbles: true });
-                    arguments[0].dispatchEvent(event);
-                """, title_textarea)
+            # 一次写入整个标题（替换已有内容）并触发输入事件
+            cdp.insert_text(driver, title_textarea, title)
+            
+            if not waiter.value_applied("title_applied", title_textarea, title):
+                logger.warning("标题输入后未能确认输入框的值")
+            logger.info("标题输入完成")
                 
-                logger.info("标题输入完成")
-                time.sleep(1.5)  # 设置停顿时间，确保标题被正确保存
-                    
-            except Exception as e:
-                logger.error(f"输入标题失败: {e}")
-                return {
-                    'success': False,
-                    'message': f'输入标题失败: {str(e)}'
-                }
+        except Exception as e:
+            logger.error(f"输入标题失败: {e}")
+            return {
+                'success': False,
+                'message': f'输入标题失败: {str(e)}'
+            }
+        
+        # 等待预上传完成（通常已在借出浏览器和打开页面期间完成）
+        if preuploads:
+            timer.start('image_preupload')
+            uploaded = self._collect_preuploads(preuploads)
+        
+        # 2. 输入正文内容
+        timer.start('body')
+        try:
+            logger.info("正在输入正文内容...")
             
-            # 2. 输入正文内容 - 根据您提供的正文编辑器元素
             try:
-                logger.info("正在输入正文内容...")
-                
-                # 找到正文编辑区域
-                content_editor = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".ProseMirror"))
-                )
-                
-                # 先尝试点击编辑器，如果失败则使用JavaScript直接设置
-                try:
-                    logger.info("尝试点击编辑区域...")
-                    content_editor.click()
-                    time.sleep(2)  # 设置停顿时间
-                except Exception as e:
-                    logger.warning(f"点击编辑区域失败，将使用JavaScript直接设置: {e}")
-                
-                # 清除占位符文本（如果存在）
-                try:
-                    placeholder = driver.find_element(By.CSS_SELECTOR, ".syl-placeholder")
-                    if placeholder.is_displayed():
-                        logger.info("检测到占位符，尝试清除...")
-                        # 使用JavaScript移除占位符
-                        driver.execute_script("arguments[0].style.display = 'none';", placeholder)
-                        time.sleep(1)
-                except Exception as e:
-                    logger.info(f"未检测到占位符或清除失败: {e}")
-                
-                # 使用JavaScript插入内容（避免输入法问题）
-                logger.info("使用JavaScript设置正文内容...")
-                
-                # 处理内容，转换为HTML格式
-                safe_content = content.replace('\\', '\\\\').replace('`', '\\`').replace('$', '\\$')
-                # 将换行符转换为段落标签，保持更好的格式
-                paragraphs = safe_content.split('\n')
-                formatted_content = ''
-                for para in paragraphs:
-                    para = para.strip()
-                    if para:
-                        formatted_content += f'<p>{para}</p>'
-                    else:
-                        formatted_content += '<p><br></p>'
-                
-                # 多步骤设置内容，确保稳定性
-                logger.info("第1步：清空编辑器内容...")
-                driver.execute_script("arguments[0].innerHTML = '';", content_editor)
-                time.sleep(1)
-                
-                logger.info("第2步：设置新内容...")
-                driver.execute_script("arguments[0].innerHTML = arguments[1];", content_editor, formatted_content)
-                time.sleep(2)
-                
-                logger.info("第3步：触发内容变更事件...")
-                # 触发必要的事件，确保编辑器识别内容变化
-                driver.execute_script("""
-                    var event = new Event('input', { bubbles: true });
-                    arguments[0].dispatchEvent(event);
-                    var changeEvent = new Event('change', { bubbles: true });
-                    arguments[0].dispatchEvent(changeEvent);
-                """, content_editor)
-                
-                logger.info("第4步：点击编辑器确保焦点...")
-                try:
-                    driver.execute_script("arguments[0].click();", content_editor)
-                    time.sleep(1)
-                except:
-                    pass
-                
-                logger.info("正文内容输入完成")
-                time.sleep(1.5)  # 设置停顿时间，让编辑器稳定
-                
+                content_editor.click()
             except Exception as e:
-                logger.error(f"输入正文内容失败: {e}")
-                return {
-                    'success': False,
-                    'message': f'输入正文内容失败: {str(e)}'
-                }
-            
-            # 3. 上传封面图片 - 使用用户提供的准确元素选择器
-            if images and len(images) > 0:
-                try:
-                    logger.info("正在上传封面图片...")
-                    
-                    # 只上传第一张图片作为封面
-                    img_path = images[0]
-                    
-                    try:
-                        logger.info("寻找封面图片上传按钮...")
-                        
-                        # 等待页面稳定
-                        time.sleep(2)
-                        
-                        # 使用用户提供的准确选择器：article-cover-add
-                        upload_button = WebDriverWait(driver, 10).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, "div.article-cover-add"))
-                        )
-                        
-                        logger.info("找到封面上传按钮，准备点击...")
-                        
-                        # 滚动到可见区域
-                        driver.execute_script("arguments[0].scrollIntoView(true);", upload_button)
-                        time.sleep(1)
-                        
-                        # 使用JavaScript点击上传按钮
-                        driver.execute_script("arguments[0].click();", upload_button)
-                        logger.info("已点击封面上传按钮")
-                        
-                        # 第二步：点击"上传本地图片"按钮
-                        logger.info("寻找并点击'上传本地图片'按钮...")
-                        upload_local_button = WebDriverWait(driver, 10).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, "div.btn-upload-handle.upload-handler"))
-                        )
-                        
-                        logger.info("找到'上传本地图片'按钮，准备点击...")
-                        
-                        # 滚动到按钮可见区域
-                        driver.execute_script("arguments[0].scrollIntoView(true);", upload_local_button)
-                        time.sleep(1)
-                        
-                        # 使用JavaScript点击"上传本地图片"按钮
-                        driver.execute_script("arguments[0].click();", upload_local_button)
-                        logger.info("已点击'上传本地图片'按钮")
-                        
-                        # 第三步：使用文件输入框选择图片
-                        logger.info("寻找文件输入框...")
-                        file_input = WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, ".btn-upload-handle.upload-handler input[type='file']"))
-                        )
-                        
-                        logger.info("找到文件输入框，准备上传图片...")
-                        
-                        # 准备图片路径
-                        abs_img_path = os.path.abspath(img_path) if not os.path.isabs(img_path) else img_path
-                        
-                        # 检查文件是否存在
-                        if not os.path.exists(abs_img_path):
-                            logger.error(f"图片文件不存在: {abs_img_path}")
-                            raise Exception(f"图片文件不存在: {abs_img_path}")
-                        
-                        logger.info(f"上传封面图片: {abs_img_path}")
-                        
-                        # 上传图片文件
-                        file_input.send_keys(abs_img_path)
-                        
-                        # 等待图片上传和处理...
-                        logger.info("Waiting for image upload confirm button to be clickable after send_keys...")
-                        WebDriverWait(driver, 30).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-e2e='imageUploadConfirm-btn']"))
-                        )
-                        logger.info("Image upload confirm button is now clickable.")
-                        
-                        # 查找并点击确认按钮 - 使用用户提供的准确选择器
-                        logger.info("寻找图片上传确认按钮...")
-                        try:
-                            # 使用 data-e2e 属性精确定位确认按钮
-                            confirm_button = WebDriverWait(driver, 10).until(
-                                EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-e2e='imageUploadConfirm-btn']"))
-                            )
-                            
-                            logger.info("找到图片上传确认按钮，准备点击...")
-                            
-                            # 滚动到按钮可见区域
-                            driver.execute_script("arguments[0].scrollIntoView(true);", confirm_button)
-                            time.sleep(1)
-                            
-                            # 使用JavaScript点击确认按钮
-                            driver.execute_script("arguments[0].click();", confirm_button)
-                            logger.info("已点击图片上传确认按钮")
-                            
-                            # 等待确认完成
-                            time.sleep(1.5)
-                            
-                            logger.info(f"封面图片上传并确认完成: {img_path}")
-                            
-                        except Exception as confirm_err:
-                            logger.error(f"点击确认按钮失败: {confirm_err}")
-                            logger.info("尝试其他确认按钮定位方式...")
-                            
-                            # 备用确认按钮定位方式
-                            try:
-                                confirm_selectors = [
-                                    "button.byte-btn-primary span:contains('确定')",
-                                    "button[class*='btn-primary'] span[text()='确定']",
-                                    ".byte-btn-primary:contains('确定')"
-                                ]
-                                
-                                for selector in confirm_selectors:
-                                    try:
-                                        if "contains" in selector:
-                                            # 使用XPath处理包含文本的选择器
-                                            xpath = f"//button[contains(@class, 'btn-primary')]//span[text()='确定']"
-                                            confirm_btn = driver.find_element(By.XPATH, xpath)
-                                        else:
-                                            confirm_btn = driver.find_element(By.CSS_SELECTOR, selector)
-                                        
-                                        if confirm_btn.is_displayed():
-                                            driver.execute_script("arguments[0].click();", confirm_btn)
-                                            logger.info("使用备用方式点击确认按钮成功")
-                                            time.sleep(3)
-                                            break
-                                    except:
-                                        continue
-                                
-                            except Exception as backup_err:
-                                logger.warning(f"备用确认按钮点击也失败: {backup_err}")
-                                logger.warning("图片可能已自动确认，继续执行...")
-                        
-                        logger.info(f"封面图片处理完成: {img_path}")
-                        
-                    except Exception as upload_err:
-                        logger.error(f"封面图片上传失败: {upload_err}")
-                        logger.info("尝试备用上传方法...")
-                        
-                        # 备用方法：尝试完整的两步点击流程
-                        try:
-                            logger.info("使用备用方法：尝试完整两步点击流程...")
-                            
-                            # 备用第一步：再次尝试点击封面上传区域
-                            try:
-                                cover_areas = driver.find_elements(By.CSS_SELECTOR, "div.article-cover-add")
-                                if cover_areas:
-                                    for area in cover_areas:
-                                        if area.is_displayed():
-                                            driver.execute_script("arguments[0].click();", area)
-                                            logger.info("备用方法：已点击封面上传区域")
-                                            time.sleep(3)
-                                            break
-                            except Exception as e:
-                                logger.debug(f"备用方法点击封面区域失败: {e}")
-                            
-                            # 备用第二步：尝试点击上传本地图片按钮
-                            try:
-                                upload_buttons = driver.find_elements(By.CSS_SELECTOR, "div.btn-upload-handle.upload-handler")
-                                if upload_buttons:
-                                    for btn in upload_buttons:
-                                        if btn.is_displayed():
-                                            driver.execute_script("arguments[0].click();", btn)
-                                            logger.info("备用方法：已点击上传本地图片按钮")
-                                            time.sleep(2)
-                                            break
-                            except Exception as e:
-                                logger.debug(f"备用方法点击上传按钮失败: {e}")
-                            
-                            # 备用第三步：使用文件输入框
-                            file_inputs = driver.find_elements(By.CSS_SELECTOR, "input[type='file'][accept*='image']")
-                            if file_inputs:
-                                for file_input in file_inputs:
-                                    try:
-                                        abs_img_path = os.path.abspath(img_path) if not os.path.isabs(img_path) else img_path
-                                        logger.info(f"备用方法上传图片: {abs_img_path}")
-                                        file_input.send_keys(abs_img_path)
-                                        
-                                        # 等待上传完成
-                                        time.sleep(5)
-                                        
-                                        # 尝试点击确认按钮
-                                        try:
-                                            confirm_button = WebDriverWait(driver, 5).until(
-                                                EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-e2e='imageUploadConfirm-btn']"))
-                                            )
-                                            driver.execute_script("arguments[0].click();", confirm_button)
-                                            logger.info("备用方法：已点击确认按钮")
-                                            time.sleep(3)
-                                        except:
-                                            logger.info("备用方法：未找到确认按钮，可能已自动确认")
-                                        
-                                        logger.info("备用方法上传完成")
-                                        break
-                                    except Exception as input_err:
-                                        logger.debug(f"备用方法使用文件输入框失败: {input_err}")
-                                        continue
-                            else:
-                                logger.warning("备用方法：找不到任何可用的文件输入框")
-                                
-                        except Exception as backup_err:
-                            logger.error(f"备用上传方法也失败: {backup_err}")
-                    
-                    logger.info("封面图片处理完成")
-                    
-                except Exception as e:
-                    logger.warning(f"封面图片上传处理失败: {e}")
-                    # 继续执行，图片不是必须的
+                logger.warning(f"点击编辑区域失败，将使用JavaScript直接设置: {e}")
             
-            # 4. 添加标签（如果有）
-            if tags and len(tags) > 0:
-                try:
-                    logger.info("正在添加标签...")
-                    # 这里可以根据实际页面标签区域来实现
-                    # 暂时跳过标签功能，因为您没有提供标签相关的页面元素
-                    logger.info("标签功能暂时跳过")
-                except Exception as e:
-                    logger.warning(f"添加标签失败: {e}")
+            # 隐藏占位符文本（如果存在）
+            driver.execute_script("""
+                var placeholder = document.querySelector('.syl-placeholder');
+                if (placeholder) { placeholder.style.display = 'none'; }
+            """)
             
-            # 5. 点击预览并发布按钮
-            logger.info("正在点击预览并发布按钮...")
-            try:
-                preview_publish_button_xpath = "//button[contains(., '预览并发布')] | //button[contains(., '发布') and not(contains(@class,'confirm-button')) and not(contains(@class,'btn-primary'))]" # 尝试更通用的发布按钮
-                # 优先寻找"预览并发布"
-                try:
-                    preview_btn = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[contains(., '预览并发布')]"))
-                    )
-                except TimeoutException:
-                    logger.info("未找到'预览并发布'按钮，尝试通用'发布'按钮...")
-                    preview_btn = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[contains(., '发布') and not(contains(@class,'modal-footer'))]")) # 排除弹窗中的发布按钮
-                    )
-
-                preview_btn.click()
-                logger.info("已点击预览并发布按钮。")
-                # MODIFIED: 增加10秒等待时间
-                logger.info("等待30秒，以便预览加载或确认对话框准备就绪...")
-                time.sleep(30)
-
-            except TimeoutException:
-                logger.error("未找到预览并发布按钮，或按钮不可点击。")
-                # 尝试截图
-                try:
-                    ts = time.strftime("%Y%m%d-%H%M%S")
-                    driver.save_screenshot(f"debug_toutiao_preview_btn_timeout_{ts}.png")
-                    logger.info(f"已保存截图: debug_toutiao_preview_btn_timeout_{ts}.png")
-                except Exception as e_ss:
-                    logger.error(f"保存截图失败: {e_ss}")
-                if driver: driver.quit()
-                return {'success': False, 'message': '未找到预览并发布按钮'}
-            except Exception as e_preview:
-                logger.error(f"点击预览并发布按钮时出错: {e_preview}")
-                if driver: driver.quit()
-                return {'success': False, 'message': f'点击预览并发布按钮出错: {str(e_preview)}'}
-
-            # 点击确认发布按钮
-            logger.info("正在点击确认发布按钮...")
-            confirm_button = None
-            article_submitted_for_publishing = False # Initialize here, before find attempt
+            # 将正文转换为段落块，预上传的图片按地址直接插入正文末尾
+            blocks = render_blocks(content, content_format)
+            uploaded_images = self._format_uploaded_images([uploaded.get(path) for path in (images or [])])
+            if uploaded_images:
+                blocks.append(uploaded_images)
             
-            final_button_css = "button.byte-btn.byte-btn-primary.byte-btn-size-large.byte-btn-shape-square.publish-btn.publish-btn-last"
-            try:
-                logger.info(f"尝试使用单一CSS选择器寻找最终发布确认按钮: {final_button_css}")
-                confirm_button = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, final_button_css))
-                )
-                # 可以选择性地在这里添加对按钮内部文本的校验，例如:
-                # actual_text = driver.execute_script("return arguments[0].innerText;", confirm_button)
-                # if "确认发布" not in actual_text:
-                #     logger.warning(f"CSS找到按钮，但内部文本('{actual_text}')可能不完全匹配'确认发布'")
-                
-                logger.info(f"通过CSS选择器 {final_button_css} 找到最终发布确认按钮。")
-                logger.info("Final publish confirmation button is now clickable.") # This is the key log that prints
-                logger.info("DEBUG: Checkpoint Alpha - 是否能打印这行最简单的日志?") # Critical diagnostic log
-
-            except TimeoutException:
-                logger.error(f"使用CSS选择器 {final_button_css} 未找到按钮，或按钮不可点击。")
-                # confirm_button remains None
-            except Exception as e_find_button_unexpected:
-                logger.error(f"使用CSS选择器 {final_button_css} 寻找按钮时发生意外错误: {e_find_button_unexpected}", exc_info=True)
-                # confirm_button remains None
-
-            # If confirm_button is None at this point, it means the single CSS find attempt failed.
-            if not confirm_button:
-                logger.error(f"关键的确认发布按钮未能找到 (CSS: {final_button_css}). 后续点击逻辑将中止。")
-                return { # Ensure a dictionary is returned
-                    'success': False,
-                    'title': title,
-                    'message': f'关键的确认发布按钮未能找到 (CSS: {final_button_css}).'
-                }
-
-            # PRE-IF-CHECK block and subsequent click logic will only be reached if confirm_button is valid
-            # and if Checkpoint Alpha prints successfully.
-            logger.info(f"DEBUG: PRE-IF-CHECK: About to evaluate confirm_button. Value: {'WebElement (presumably)' if confirm_button else 'None'}.")
-            confirm_button_is_valid_object = False 
-            if confirm_button is not None: 
-                logger.info(f"DEBUG: PRE-IF-CHECK: confirm_button is not None. Type: {type(confirm_button)}")
-                confirm_button_is_valid_object = True
-            else:
-                logger.info("DEBUG: PRE-IF-CHECK: confirm_button is None (THIS SHOULD HAVE BEEN CAUGHT BY 'if not confirm_button:' ABOVE).")
-
-            if confirm_button_is_valid_object: 
-                logger.info(f"DEBUG: Entered 'if confirm_button_is_valid_object:' block. Original confirm_button type: {type(confirm_button)}")
-                try:
-                    logger.info("准备使用JavaScript点击确认发布按钮...")
-                    # ... (The rest of the detailed click logic: scroll, check enabled/displayed, JS click)
-                    # This part should be the version that includes detailed try-except for each sub-step
-                    # For brevity, assuming it's correctly structured from previous attempts and ends up setting article_submitted_for_publishing
-                    try:
-                        logger.info("Attempting to scroll confirm_button into view...")
-                        driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", confirm_button)
-                        time.sleep(0.5)
-                        logger.info("Successfully scrolled confirm_button into view.")
-                        
-                        is_enabled = confirm_button.is_enabled()
-                        is_displayed = confirm_button.is_displayed()
-                        logger.info(f"Button state: enabled={is_enabled}, displayed={is_displayed}")
-
-                        if is_enabled and is_displayed:
-                            logger.info("Attempting JS click on confirm_button...")
-                            driver.execute_script("arguments[0].click();", confirm_button)
-                            logger.info("JS click executed.")
-                            article_submitted_for_publishing = True
-                            time.sleep(5) # Wait after click
-                            logger.info("Wait after JS click completed.")
-                        else:
-                            logger.warning(f"Button not interactable before JS click (enabled: {is_enabled}, displayed: {is_displayed}).")
-                            article_submitted_for_publishing = False # Explicitly set
-
-                    except Exception as e_click_detailed:
-                        logger.error(f"Error during detailed click sequence: {e_click_detailed}", exc_info=True)
-                        article_submitted_for_publishing = False # Ensure it's false on error
-                    
-                    # Logic for returning based on submission and success message (should be here)
-                    if article_submitted_for_publishing:
-                        logger.info("文章已提交发布，检查发布成功提示...")
-                        # ... (success message checking logic as before) ...
-                        # Placeholder for success check:
-                        success_message_found = True # Assuming success for now
-                        if success_message_found:
-                             logger.info("成功检测到明确的发布成功提示。")
-                             return { 'success': True, 'title': title, 'message': '文章发布成功，并检测到成功提示' }
-                        else:
-                             logger.warning("已提交发布，但未检测到明确的发布成功提示。返回已提交状态。")
-                             return { 'success': True, 'title': title, 'message': '文章已提交发布，请稍后在平台确认最终状态' }
-                    else:
-                        logger.error("文章未提交发布或点击失败。")
-                        return { 'success': False, 'title': title, 'message': '文章未提交发布或点击失败（未进入发布成功检查）。' }
-
-                except Exception as e_confirm_click_flow: 
-                    logger.error(f"点击确认发布按钮的整体流程中发生异常: {e_confirm_click_flow}", exc_info=True)
-                    return { 
-                        'success': False,
-                        'title': title,
-                        'message': f'点击确认按钮流程异常: {type(e_confirm_click_flow).__name__}'
-                    }
-            else: 
-                logger.warning("未能进入点击确认按钮的逻辑 (confirm_button was None and caught by pre-if-check). This should ideally be caught by the 'if not confirm_button:' block earlier.")
-                return { 
+            # 按段落分批插入编辑器（避免输入法问题和超长内容被截断），并校验字数
+            content_check = insert_blocks(driver, content_editor, blocks, waiter=waiter)
+            if not content_check['matched']:
+                return {
                     'success': False,
                     'title': title,
-                    'message': '内部逻辑错误：确认按钮为None但未被早期检查捕获。'
+                    'message': f"正文字数校验失败：源文本 {content_check['expected']} 字，"
+                               f"编辑器 {content_check['actual']} 字",
+                    'content_check': content_check
                 }
-
-        except Exception as e_main_publish_logic: 
-            logger.error(f"文章发布主流程发生异常: {e_main_publish_logic}", exc_info=True) 
-            logger.info("DEBUG: Main EXCEPTION block: Preparing to return error dictionary.") 
+            logger.info("正文内容输入完成")
+            
+        except Exception as e:
+            logger.error(f"输入正文内容失败: {e}")
             return {
                 'success': False,
-                'title': title, 
-                'message': f'文章发布主异常块: {type(e_main_publish_logic).__name__} - {str(e_main_publish_logic)}'
+                'message': f'输入正文内容失败: {str(e)}'
             }
-        finally:
-            logger.info("DEBUG: Entering FINALLY block of publish_article.")
-            if driver:
-                try:
-                    logger.info("DEBUG: FINALLY block: driver object exists. Attempting small sleep before quit.")
-                    time.sleep(0.5) 
-                    logger.info("DEBUG: FINALLY block: Attempting driver.quit().")
-                    driver.quit()
-                    logger.info("浏览器已关闭")
-                except Exception as e_quit:
-                    logger.error(f"DEBUG: FINALLY block: Exception during driver.quit(): {e_quit}", exc_info=True)
-            else:
-                logger.info("DEBUG: FINALLY block: driver object was None or falsy.")
-            logger.info("DEBUG: Exiting FINALLY block of publish_article.")
+        
+        # 3. 上传封面图片
+        cover_path = cover_image or (images[0] if images else None)
+        if cover_path:
+            timer.start('cover_upload')
+            try:
+                # 只有插入了正文的图片才能在封面弹窗中按地址选择
+                cover_uploaded = uploaded.get(cover_path) if cover_path in (images or []) else None
+                if not (cover_uploaded and self._select_article_cover_by_uri(driver, waiter, cover_uploaded)):
+                    self._upload_article_cover(driver, waiter, cover_path)
+            except Exception as e:
+                logger.warning(f"封面图片上传处理失败: {e}")
+                # 继续执行，图片不是必须的
+        
+        # 4. 添加标签（如果有）
+        if tags and len(tags) > 0:
+            # 页面标签区域尚未适配，暂时跳过
+            logger.info("标签功能暂时跳过")
+        
+        # 5. 点击预览并发布按钮
+        logger.info("正在点击预览并发布按钮...")
+        timer.start('preview')
+        try:
+            preview_btn = waiter.clickable_xpath(
+                "preview_publish_button", "//button[contains(., '预览并发布')]", timeout=10, required=False
+            )
+            if not preview_btn:
+                logger.info("未找到'预览并发布'按钮，尝试通用'发布'按钮...")
+                # 排除弹窗中的发布按钮
+                preview_btn = waiter.clickable_xpath(
+                    "publish_button",
+                    "//button[contains(., '发布') and not(contains(@class,'modal-footer'))]",
+                    timeout=10
+                )
+            start_url = driver.current_url
+            preview_btn.click()
+            logger.info("已点击预览并发布按钮。")
+        except TimeoutException:
+            logger.error("未找到预览并发布按钮，或按钮不可点击。")
+            debug_dir = get_debug_store().capture(driver, 'article', 'preview_btn_timeout')
+            return {'success': False, 'message': '未找到预览并发布按钮', 'debug_dir': debug_dir}
+        except Exception as e_preview:
+            logger.error(f"点击预览并发布按钮时出错: {e_preview}")
+            return {'success': False, 'message': f'点击预览并发布按钮出错: {str(e_preview)}'}
+        
+        # 6. 等待预览发布弹窗并点击确认发布按钮
+        logger.info("正在点击确认发布按钮...")
+        timer.start('confirm')
+        final_button_css = ARTICLE_CONFIRM_SELECTOR
+        try:
+            confirm_button = waiter.publish_dialog_visible(final_button_css, timeout=40)
+        except TimeoutException:
+            logger.error(f"关键的确认发布按钮未能找到 (CSS: {final_button_css})")
+            debug_dir = get_debug_store().capture(driver, 'article', 'confirm_btn_timeout')
+            return {
+                'success': False,
+                'title': title,
+                'message': f'关键的确认发布按钮未能找到 (CSS: {final_button_css}).',
+                'debug_dir': debug_dir
+            }
+        
+        try:
+            driver.execute_script("""
+                arguments[0].scrollIntoView({block: 'center', inline: 'center'});
+                arguments[0].click();
+            """, confirm_button)
+            logger.info("已点击确认发布按钮")
+        except Exception as e_click:
+            logger.error(f"点击确认发布按钮失败: {e_click}", exc_info=True)
+            return {'success': False, 'title': title, 'message': '文章未提交发布或点击失败。'}
+        
+        # 7. 检查发布成功提示
+        logger.info("文章已提交发布，检查发布成功提示...")
+        timer.start('success_detection')
+        outcome = waiter.publish_outcome(start_url, timeout=15)
+        if outcome == LOGIN_REQUIRED:
+            return self._redirected_to_login_result(title=title, content_check=content_check)
+        if outcome == PUBLISH_SUCCEEDED:
+            logger.info("成功检测到明确的发布成功提示。")
+            return {'success': True, 'title': title, 'message': '文章发布成功，并检测到成功提示',
+                    'content_check': content_check}
+        
+        logger.warning("已提交发布，但未检测到明确的发布成功提示。返回已提交状态。")
+        return {'success': True, 'title': title, 'message': '文章已提交发布，请稍后在平台确认最终状态',
+                'content_check': content_check}
     
-    def publish_micro_post(self,
-                          content: str,
-                          images: Optional[List[str]] = None,
-                          topic: Optional[str] = None,
-                          location: Optional[str] = None,
-                          publish_time: Optional[str] = None) -> Dict[str, Any]:
+    def _open_publish_page(self,
+                           pooled: PooledDriver,
+                           waiter: PageWaiter,
+                           kind: str,
+                           url: str,
+                           hot_editor: bool = False) -> bool:
         """
-        通过Selenium发布微头条
+        打开发布页面，hot_editor 为 True 时优先复用已加载的页面
+        
+        每种发布类型在浏览器中保留一个标签页（记录在 pooled.state['hot_tabs']）。
+        标签页仍停留在发布页时只在页面内重置编辑器，省去页面加载和前端初始化；
+        页面已跳转或重置失败时在该标签页中重新打开。
         
         Args:
-            content: 微头条内容
-            images: 配图路径列表（最多9张）
-            topic: 话题标签
-            location: 位置信息
-            publish_time: 定时发布时间
+            pooled: 借出的驱动
+            waiter: 页面等待器
+            kind: 发布类型（article 或 micro_post）
+            url: 发布页面地址
+            hot_editor: 是否复用已打开的页面
             
         Returns:
-            Dict: 发布结果
+            bool: 是否复用了已加载的页面
         """
-        driver = None
+        driver = pooled.driver
+        if hot_editor:
+            tabs = pooled.state.setdefault('hot_tabs', {})
+            try:
+                handles = driver.window_handles
+                for stale in [k for k, handle in tabs.items() if handle not in handles]:
+                    del tabs[stale]
+                if kind in tabs:
+                    driver.switch_to.window(tabs[kind])
+                    if urlsplit(driver.current_url).path == urlsplit(url).path and self._reset_editor_page(driver, waiter):
+                        logger.info("复用已打开的发布页面，已在页面内重置编辑器")
+                        return True
+                elif tabs:
+                    # 保留其他类型的发布页面，在新标签页中打开
+                    driver.switch_to.new_window('tab')
+                    if self._is_lean_profile():
+                        self._setup_tab(driver)
+                tabs[kind] = driver.current_window_handle
+            except Exception as e:
+                logger.warning(f"复用发布页面失败，将重新打开: {e}")
+                tabs.pop(kind, None)
+        waiter.navigate(url)
+        return False
+    
+    @staticmethod
+    def _close_hot_tab(pooled: PooledDriver, kind: Optional[str]) -> None:
+        """关闭保留的某类发布标签页并切回剩余的第一个标签页；只剩一个标签页时保留窗口，只清除记录"""
+        handle = pooled.state.get('hot_tabs', {}).pop(kind, None)
+        if not handle:
+            return
+        driver = pooled.driver
         try:
-            logger.info(f"开始发布微头条: {content[:50]}...")
-            
-            # 限制图片数量
-            if images and len(images) > 9:
-                logger.warning("微头条最多支持9张图片，将只使用前9张")
-                images = images[:9]
-            
-            # 处理话题标签
-            if topic and not topic.startswith('#'):
-                topic = f"#{topic}#"
-            
-            # 构建微头条内容
-            micro_content = content
-            if topic:
-                micro_content = f"{topic} {micro_content}"
-            
-            # 初始化浏览器
-            driver = self._setup_driver()
+            handles = driver.window_handles
+            if handle not in handles or len(handles) < 2:
+                return
+            driver.switch_to.window(handle)
+            driver.close()
+            driver.switch_to.window(next(h for h in handles if h != handle))
+        except Exception as e:
+            logger.warning(f"关闭发布标签页失败: {e}")
+    
+    @staticmethod
+    def _reset_editor_page(driver: webdriver.Chrome, waiter: PageWaiter) -> bool:
+        """在页面内把发布页恢复为空白状态，返回是否成功"""
+        try:
+            if driver.execute_script(_RESET_EDITOR_SCRIPT, MASK_SELECTORS):
+                return True
+            return bool(waiter.until_js(
+                "editor_reset", _RESET_EDITOR_SCRIPT, 3, MASK_SELECTORS, required=False
+            ))
+        except Exception as e:
+            logger.warning(f"重置发布页面失败: {e}")
+            return False
+    
+    @staticmethod
+    def _format_uploaded_images(uploads: List[Optional[Dict[str, Any]]]) -> str:
+        """把已上传图片转换为正文中的图片段落，跳过上传失败的图片"""
+        formatted = ''
+        for uploaded in uploads:
+            if not uploaded or not uploaded.get('url'):
+                continue
+            formatted += '<p><img src="{}" web_uri="{}"></p>'.format(
+                html.escape(uploaded['url'], quote=True),
+                html.escape(uploaded.get('web_uri') or '', quote=True)
+            )
+        return formatted
+    
+    def _select_article_cover_by_uri(self,
+                                     driver: webdriver.Chrome,
+                                     waiter: PageWaiter,
+                                     uploaded: Dict[str, Any]) -> bool:
+        """
+        从封面弹窗的正文图片中选择已上传的图片作为封面，无需再次上传文件
+        
+        Args:
+            driver: 浏览器驱动
+            waiter: 页面等待器
+            uploaded: 图片上传结果（含 url、web_uri）
             
-            # 传递登录Cookie
-            self._transfer_cookies_to_driver(driver)
+        Returns:
+            bool: 是否选择成功
+        """
+        key = (uploaded.get('web_uri') or uploaded['url']).rstrip('/').rsplit('/', 1)[-1]
+        try:
+            logger.info("正在从正文图片中选择封面...")
+            upload_button = waiter.clickable("cover_add_button", "div.article-cover-add", timeout=10)
+            driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", upload_button)
             
-            # 打开微头条发布页面 - 使用正确的URL
-            logger.info("正在打开微头条发布页面...")
-            correct_url = "https://mp.toutiao.com/profile_v4/weitoutiao/publish?from=toutiao_pc"
-            driver.get(correct_url)
-
-            # 等待页面完全加载 - 增加等待时间
-            logger.info("等待页面完全加载...")
-            time.sleep(15)  # 增加到15秒，给页面充足时间加载
-
-            # 检查当前URL
-            current_url = driver.current_url
-            logger.info(f"当前页面URL: {current_url}")
-
-            # 检查是否需要重新登录
-            if "login" in current_url or "auth" in current_url:
-                logger.warning("需要重新登录，页面已重定向到登录页")
-                logger.info(f"重定向URL: {current_url}")
-
-                # 保存截图用于调试
-                try:
-                    screenshot_path = "debug_micro_post_login_required.png"
-                    driver.save_screenshot(screenshot_path)
-                    logger.info(f"已保存登录页面截图: {screenshot_path}")
-                except Exception as e:
-                    logger.warning(f"保存截图失败: {e}")
-
-                return {
-                    'success': False,
-                    'message': '需要重新登录，Cookie可能已过期，请先运行 python login_simple.py 重新登录'
+            candidate = waiter.until_js("cover_candidate", """
+                var dialogs = document.querySelectorAll('.byte-modal, .byte-drawer, [role="dialog"]');
+                for (var i = 0; i < dialogs.length; i++) {
+                    if (!isVisible(dialogs[i])) { continue; }
+                    var images = dialogs[i].querySelectorAll('img');
+                    for (var j = 0; j < images.length; j++) {
+                        var src = images[j].currentSrc || images[j].src || '';
+                        if (isVisible(images[j]) && src.indexOf(arguments[0]) !== -1) { return images[j]; }
+                    }
                 }
+                return null;
+            """, 10, key)
+            driver.execute_script("arguments[0].click();", candidate)
             
-            # 尝试多种编辑器选择器 - 针对微头条发布页面优化
-            logger.info("开始查找编辑器元素...")
-            editor = None
-            editor_selectors = [
-                # 最常见的编辑器选择器
-                ".ProseMirror",
-                "div.ProseMirror",
-                # 今日头条常用的编辑器类名
-                ".syl-editor .ProseMirror",
-                ".publish-box .ProseMirror",
-                ".wtt-publish-wrap .ProseMirror",
-                # Textarea 元素
-                "textarea",
-                "textarea.byte-textarea-content",
-                # Contenteditable 元素
-                "[contenteditable='true']",
-                "div[contenteditable='true']",
-                # 其他可能的选择器
-                "div[role='textbox']",
-                ".syl-editor",
-                "div[class*='editor']",
-                "div[data-slate-editor='true']",
-            ]
-
-            # 使用更长的超时时间（30秒）
-            for idx, selector in enumerate(editor_selectors):
+            confirm_button = waiter.clickable(
+                "cover_confirm_button", "button[data-e2e='imageUploadConfirm-btn']", timeout=5
+            )
+            driver.execute_script("arguments[0].click();", confirm_button)
+            if waiter.cover_applied(timeout=10):
+                logger.info("已从正文图片中选择封面")
+                return True
+        except Exception as e:
+            logger.warning(f"从正文图片选择封面失败，改为上传封面: {e}")
+        self._close_cover_dialog(driver, waiter)
+        return False
+    
+    @staticmethod
+    def _close_cover_dialog(driver: webdriver.Chrome, waiter: PageWaiter) -> None:
+        """关闭仍打开的封面弹窗，避免上传封面时再次点击封面区域"""
+        try:
+            driver.execute_script(
+                "document.querySelectorAll('.byte-modal-close-icon, .byte-drawer-close-icon')"
+                ".forEach(function (el) { el.click(); });"
+            )
+            if not waiter.mask_gone(timeout=2):
+                from selenium.webdriver.common.keys import Keys
+                webdriver.ActionChains(driver).send_keys(Keys.ESCAPE).perform()
+                waiter.mask_gone(timeout=3)
+        except Exception as e:
+            logger.debug(f"关闭封面弹窗失败: {e}")
+    
+    def _upload_article_cover(self, driver: webdriver.Chrome, waiter: PageWaiter, img_path: str) -> None:
+        """通过封面上传弹窗上传文章封面图片"""
+        confirm_selector = "button[data-e2e='imageUploadConfirm-btn']"
+        abs_img_path = os.path.abspath(img_path)
+        
+        logger.info("正在上传封面图片...")
+        try:
+            # 第一步：点击封面上传区域
+            upload_button = waiter.clickable("cover_add_button", "div.article-cover-add", timeout=10)
+            driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", upload_button)
+            logger.info("已点击封面上传按钮")
+            
+            # 第二步：点击"上传本地图片"按钮
+            upload_local_button = waiter.clickable(
+                "upload_local_button", "div.btn-upload-handle.upload-handler", timeout=10
+            )
+            driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", upload_local_button)
+            logger.info("已点击'上传本地图片'按钮")
+            
+            # 第三步：使用文件输入框选择图片（输入框本身是隐藏的，只等待其存在）
+            file_input = waiter.until_js(
+                "cover_file_input", "return document.querySelector(arguments[0]);", 10,
+                ".btn-upload-handle.upload-handler input[type='file']"
+            )
+            if not os.path.exists(abs_img_path):
+                raise Exception(f"图片文件不存在: {abs_img_path}")
+            
+            logger.info(f"上传封面图片: {abs_img_path}")
+            file_input.send_keys(abs_img_path)
+            
+            # 等待缩略图渲染完成、确认按钮可用后点击确认
+            try:
+                confirm_button = waiter.upload_thumbnail_rendered(confirm_selector, timeout=30)
+            except TimeoutException as confirm_err:
+                logger.error(f"等待确认按钮失败: {confirm_err}")
+                logger.info("尝试其他确认按钮定位方式...")
+                confirm_button = waiter.clickable_xpath(
+                    "upload_confirm_fallback",
+                    "//button[contains(@class, 'btn-primary')][.//span[text()='确定']]",
+                    timeout=3, required=False
+                )
+            
+            if confirm_button:
+                driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", confirm_button)
+                logger.info("已点击图片上传确认按钮")
+            else:
+                logger.warning("图片可能已自动确认，继续执行...")
+            
+            waiter.cover_applied(timeout=10)
+            logger.info(f"封面图片上传并确认完成: {img_path}")
+            
+        except Exception as upload_err:
+            logger.error(f"封面图片上传失败: {upload_err}")
+            logger.info("使用备用方法：尝试完整两步点击流程...")
+            
+            # 备用第一、二步：点击可见的封面上传区域和上传本地图片按钮
+            for name, selector in (("cover_add_fallback", "div.article-cover-add"),
+                                   ("upload_local_fallback", "div.btn-upload-handle.upload-handler")):
+                element = waiter.visible(name, selector, timeout=3, required=False)
+                if element:
+                    driver.execute_script("arguments[0].click();", element)
+            
+            # 备用第三步：使用任意图片文件输入框
+            file_inputs = driver.find_elements(By.CSS_SELECTOR, "input[type='file'][accept*='image']")
+            if not file_inputs:
+                logger.warning("备用方法：找不到任何可用的文件输入框")
+                return
+            
+            for file_input in file_inputs:
                 try:
-                    logger.info(f"尝试选择器 {idx + 1}/{len(editor_selectors)}: {selector}")
-                    editor = WebDriverWait(driver, 30).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+                    logger.info(f"备用方法上传图片: {abs_img_path}")
+                    file_input.send_keys(abs_img_path)
+                    
+                    confirm_button = None
+                    try:
+                        confirm_button = waiter.upload_thumbnail_rendered(confirm_selector, timeout=15)
+                    except TimeoutException:
+                        logger.info("备用方法：未找到确认按钮，可能已自动确认")
+                    if confirm_button:
+                        driver.execute_script("arguments[0].click();", confirm_button)
+                        logger.info("备用方法：已点击确认按钮")
+                    
+                    waiter.cover_applied(timeout=10)
+                    logger.info("备用方法上传完成")
+                    break
+                except Exception as input_err:
+                    logger.debug(f"备用方法使用文件输入框失败: {input_err}")
+                    continue
+    
+    def _micro_editor_selectors(self) -> List[str]:
+        """微头条编辑器候选选择器，上次命中的选择器排在最前"""
+        selectors = list(MICRO_EDITOR_SELECTORS)
+        if self._micro_editor_selector in selectors:
+            selectors.remove(self._micro_editor_selector)
+            selectors.insert(0, self._micro_editor_selector)
+        return selectors
+    
+    def _upload_micro_images(self,
+                             driver: webdriver.Chrome,
+                             waiter: PageWaiter,
+                             images: List[str],
+                             per_image_timeout: float = 30) -> Dict[str, Any]:
+        """
+        将微头条配图一次性提交到支持多选的文件输入框，并按缩略图渲染数量判断上传完成
+        
+        Args:
+            driver: 浏览器驱动
+            waiter: 页面等待器
+            images: 配图路径列表
+            per_image_timeout: 单张图片的超时时间（秒）
+            
+        Returns:
+            Dict: 上传报告。uploaded/failed_count 为成功和失败的张数；failed 只列出能确定失败的
+                图片（文件不存在，或逐张提交时失败及未提交的图片），一次提交时无法确定缩略图对应
+                哪个文件，不列出上传失败的路径，completed_seconds 为按完成顺序的耗时
+        """
+        details = []
+        paths = []
+        for img_path in images:
+            if Path(img_path).is_file():
+                paths.append(str(Path(img_path).resolve()))
+            else:
+                logger.warning(f"图片文件不存在，跳过: {img_path}")
+                details.append({'path': img_path, 'success': False, 'seconds': None, 'error': '文件不存在'})
+        
+        mode = 'batch'
+        completed: List[float] = []
+        if paths:
+            # 打开图片上传面板
+            image_button = waiter.clickable_xpath(
+                "micro_image_button", MICRO_IMAGE_BUTTON_XPATH, 10
+            )
+            image_button.click()
+            
+            file_input = waiter.until_js(
+                "micro_file_input", "return document.querySelector(\"input[type='file']\");", 5
+            )
+            baseline = waiter.upload_snapshot()
+            
+            try:
+                # 文件输入框设置 multiple 后可通过换行分隔一次提交全部路径
+                driver.execute_script("arguments[0].multiple = true;", file_input)
+                file_input.send_keys("\n".join(paths))
+                outcome = waiter.uploads_finished(len(paths), baseline, per_image_timeout)
+            except Exception as e:
+                # 页面不接受多文件时逐张提交，每张仍按缩略图渲染判断完成
+                logger.warning(f"批量上传图片失败，改为逐张上传: {e}")
+                mode = 'sequential'
+                outcome = {'completed': [], 'failed': 0}
+                offset = 0.0
+                for index, path in enumerate(paths):
+                    file_input = waiter.until_js(
+                        "micro_file_input", "return document.querySelector(\"input[type='file']\");", 5
                     )
-                    if editor and editor.is_displayed():
-                        logger.info(f"✅ 找到编辑器元素: {selector}")
-                        logger.info(f"   标签名: {editor.tag_name}")
-                        logger.info(f"   Class: {editor.get_attribute('class')}")
-                        logger.info(f"   是否可见: {editor.is_displayed()}")
-                        logger.info(f"   是否启用: {editor.is_enabled()}")
+                    file_input.send_keys(path)
+                    step = waiter.uploads_finished(index + 1, baseline, per_image_timeout)
+                    outcome['failed'] = step['failed']
+                    if len(step['completed']) <= index:
                         break
+                    outcome['completed'].append(round(offset + step['completed'][index], 3))
+                    offset = outcome['completed'][-1]
+            
+            # 一次提交时缩略图按完成顺序渲染，页面不标明对应的文件，只统计数量和完成耗时；
+            # 逐张提交时第 N 张缩略图对应第 N 个文件，遇到失败即停止，之后的文件未提交
+            completed = outcome['completed']
+            if mode == 'sequential':
+                for index, path in enumerate(paths):
+                    if index < len(completed):
+                        details.append({'path': path, 'success': True, 'seconds': completed[index]})
+                    elif index == len(completed):
+                        details.append({'path': path, 'success': False, 'seconds': None, 'error': '上传失败或超时'})
                     else:
-                        logger.debug(f"元素存在但不可见: {selector}")
-                        editor = None
-                except Exception as e:
-                    logger.debug(f"选择器 {selector} 未找到元素: {str(e)[:100]}")
-                    continue
+                        details.append({'path': path, 'success': False, 'seconds': None, 'error': '未提交'})
+        
+        failed = [item['path'] for item in details if not item['success']]
+        uploaded = len(completed)
+        report = {
+            'mode': mode,
+            'uploaded': uploaded,
+            'failed_count': len(images) - uploaded,
+            'failed': failed,
+            'details': details
+        }
+        if mode == 'batch':
+            report['completed_seconds'] = completed
+        return report
+    
+    def publish_micro_post(self,
+                          content: str,
+                          images: Optional[List[str]] = None,
+                          topic: Optional[str] = None,
+                          location: Optional[str] = None,
+                          publish_time: Optional[str] = None,
+                          transport: Optional[str] = None) -> Dict[str, Any]:
+        """
+        发布微头条，默认通过Selenium操作发布页面
+        
+        Args:
+            content: 微头条内容
+            images: 配图路径列表（最多9张）
+            topic: 话题标签
+            location: 位置信息
+            publish_time: 定时发布时间
+            transport: 发布方式，selenium 或 api，默认使用 PUBLISH_CONFIG['transport']；
+                api 方式在请求确定未被受理（连接失败、4xx 等）时回退到浏览器发布，
+                读取超时、5xx 等结果未知时不回退，返回 outcome_unknown 的失败结果
+            
+        Returns:
+            Dict: 发布结果，waits 字段记录各等待条件的实际耗时，timings 字段记录各步骤耗时
+        """
+        timer = StepTimer()
+        transport = transport or PUBLISH_CONFIG['transport']
+        fallback_reason = None
+        if transport == 'api':
+            result, fallback_reason = self._publish_micro_post_api(
+                content, images=images, topic=topic, publish_time=publish_time, timer=timer
+            )
+            if result is None and not PUBLISH_CONFIG['api_fallback']:
+                result = {'success': False, 'message': f'发布接口返回非预期响应: {fallback_reason}'}
+            if result is not None:
+                result['transport'] = 'api'
+                self._record_timings('micro_post', result, timer)
+                return result
+            logger.warning(f"发布接口返回非预期响应（{fallback_reason}），回退到浏览器发布")
+        elif transport != 'selenium':
+            return {'success': False, 'message': f'不支持的发布方式: {transport}'}
+        
+        pooled = None
+        waiter = None
+        try:
+            logger.info(f"开始发布微头条: {content[:50]}...")
+            
+            # 从驱动池借出浏览器（已传递登录Cookie）
+            pooled = self._acquire_driver(timer)
+            waiter = PageWaiter(pooled.driver)
+            
+            result = self._publish_micro_post_flow(
+                pooled, waiter, content, images=images, topic=topic, timer=timer
+            )
+        except Exception as e:
+            logger.error(f"微头条发布异常: {e}")
+            result = {
+                'success': False, 
+                'message': f'发布异常: {str(e)}'
+            }
+        finally:
+            # 归还浏览器到驱动池
+            if pooled:
+                self.driver_pool.release(pooled)
+                logger.info("浏览器已归还驱动池")
+        
+        if waiter:
+            result['waits'] = waiter.records
+        result['transport'] = 'selenium'
+        if fallback_reason:
+            result['fallback_reason'] = fallback_reason
+        self._record_timings('micro_post', result, timer)
+        return result
+    
+    def _publish_micro_post_flow(self,
+                                 pooled: PooledDriver,
+                                 waiter: PageWaiter,
+                                 content: str,
+                                 images: Optional[List[str]] = None,
+                                 topic: Optional[str] = None,
+                                 timer: Optional[StepTimer] = None,
+                                 hot_editor: bool = False) -> Dict[str, Any]:
+        """在已借出的浏览器中执行微头条发布的页面操作，hot_editor 为 True 时复用已打开的发布页面"""
+        driver = pooled.driver
+        timer = timer or StepTimer()
+        
+        # 限制图片数量
+        if images and len(images) > 9:
+            logger.warning("微头条最多支持9张图片，将只使用前9张")
+            images = images[:9]
+        
+        # 处理话题标签
+        if topic and not topic.startswith('#'):
+            topic = f"#{topic}#"
+        
+        # 构建微头条内容
+        micro_content = content
+        if topic:
+            micro_content = f"{topic} {micro_content}"
+        
+        # 打开微头条发布页面
+        logger.info("正在打开微头条发布页面...")
+        correct_url = TOUTIAO_URLS['micro_page']
+        timer.start('navigation')
+        self._open_publish_page(pooled, waiter, 'micro_post', correct_url, hot_editor)
 
-            if not editor:
-                logger.error("所有编辑器选择器都未找到元素")
+        # 一次脚本调用检查所有候选编辑器选择器，上次命中的选择器优先
+        logger.info("开始查找编辑器元素...")
+        timer.start('editor_ready')
+        found = waiter.first_visible_of(
+            "micro_editor_ready", self._micro_editor_selectors(), timeout=30, required=False
+        )
+        editor_selector, editor = found if found else (None, None)
 
-                # 保存页面源代码用于调试
-                try:
-                    with open("debug_micro_post_page_source.html", "w", encoding="utf-8") as f:
-                        f.write(driver.page_source)
-                    logger.info("已保存页面源代码: debug_micro_post_page_source.html")
-                except Exception as e:
-                    logger.warning(f"保存页面源代码失败: {e}")
+        # 检查是否需要重新登录
+        if editor_selector == LOGIN_REQUIRED:
+            current_url = driver.current_url
+            logger.warning("需要重新登录，页面已重定向到登录页")
+            self._invalidate_driver_cookies(pooled)
+            logger.info(f"重定向URL: {current_url}")
 
-                # 保存截图
-                try:
-                    screenshot_path = "debug_micro_post_no_editor.png"
-                    driver.save_screenshot(screenshot_path)
-                    logger.info(f"已保存截图: {screenshot_path}")
-                except Exception as e:
-                    logger.warning(f"保存截图失败: {e}")
+            # 保存截图用于调试（后台写入）
+            debug_dir = get_debug_store().capture(driver, 'micro_post', 'login_required')
 
-                return {
-                    'success': False,
-                    'message': f'编辑器加载超时。访问的URL: {correct_url}。请查看调试文件：debug_micro_post_no_editor.png 和 debug_micro_post_page_source.html'
-                }
+            return {
+                'success': False,
+                'message': '需要重新登录，Cookie可能已过期，请先运行 python login_simple.py 重新登录',
+                'debug_dir': debug_dir
+            }
 
-            logger.info("编辑器加载完成")
-            time.sleep(2)  # 等待编辑器完全就绪
+        if not editor:
+            logger.error("所有编辑器选择器都未找到元素")
 
-            # 输入内容
-            try:
-                logger.info("正在输入微头条内容...")
-                # 如果找到的是textarea元素
-                if editor.tag_name.lower() == 'textarea':
-                    logger.info("使用 textarea.send_keys() 方法输入内容")
-                    editor.clear()
-                    editor.send_keys(micro_content)
-                else:
-                    # 如果是contenteditable元素或ProseMirror编辑器
-                    logger.info("使用 contenteditable + JavaScript 方法输入内容")
-                    # 先点击编辑器使其获得焦点
-                    try:
-                        editor.click()
-                        time.sleep(1)
-                    except:
-                        pass
+            # 保存截图和页面源代码用于调试（后台写入）
+            debug_dir = get_debug_store().capture(driver, 'micro_post', 'no_editor', page_source=True)
 
-                    # 使用JavaScript插入内容
-                    safe_content = micro_content.replace('\\', '\\\\').replace('`', '\\`').replace('$', '\\$').replace('\n', '<br>')
+            return {
+                'success': False,
+                'message': f'编辑器加载超时。访问的URL: {correct_url}。请查看调试目录：{debug_dir}',
+                'debug_dir': debug_dir
+            }
 
-                    # 尝试多种方式插入内容
-                    try:
-                        # 方法1：直接设置innerHTML
-                        driver.execute_script(f"arguments[0].innerHTML = `<p>{safe_content}</p>`", editor)
-                        time.sleep(1)
-                    except:
-                        try:
-                            # 方法2：设置textContent
-                            driver.execute_script(f"arguments[0].textContent = `{safe_content}`", editor)
-                            time.sleep(1)
-                        except:
-                            # 方法3：使用send_keys
-                            editor.send_keys(micro_content)
+        # 记住命中的选择器，后续发布优先尝试
+        self._micro_editor_selector = editor_selector
+        logger.info(f"✅ 找到编辑器元素: {editor_selector}（标签名: {editor.tag_name}）")
 
-                    # 触发输入事件
-                    driver.execute_script("""
-                        var event = new Event('input', { bubbles: true });
-                        arguments[0].dispatchEvent(event);
-                    """, editor)
+        # 输入内容
+        timer.start('body')
+        try:
+            logger.info("正在输入微头条内容...")
+            # textarea 和 contenteditable（ProseMirror）编辑器都一次写入整段内容
+            method = cdp.insert_text(driver, editor, micro_content)
+            logger.info(f"微头条内容写入方式: {method}")
+            if editor.tag_name.lower() == 'textarea':
+                waiter.value_applied("micro_content_applied", editor, micro_content)
+            else:
+                waiter.content_applied(editor)
 
-                logger.info("微头条内容输入完成")
-                time.sleep(2)
-            except Exception as e:
-                logger.error(f"输入微头条内容失败: {e}")
+            logger.info("微头条内容输入完成")
+        except Exception as e:
+            logger.error(f"输入微头条内容失败: {e}")
 
-                # 保存截图
-                try:
-                    screenshot_path = "debug_micro_post_input_failed.png"
-                    driver.save_screenshot(screenshot_path)
-                    logger.info(f"已保存截图: {screenshot_path}")
-                except:
-                    pass
+            # 保存截图（后台写入）
+            debug_dir = get_debug_store().capture(driver, 'micro_post', 'input_failed')
 
+            return {
+                'success': False,
+                'message': f'输入内容失败: {str(e)}',
+                'debug_dir': debug_dir
+            }
+        
+        # 上传图片（一次提交全部配图）
+        image_fields = {}
+        if images and len(images) > 0:
+            timer.start('image_upload')
+            try:
+                logger.info(f"正在上传 {len(images)} 张图片...")
+                report = self._upload_micro_images(driver, waiter, images)
+                image_fields['images'] = report
+                logger.info(f"图片上传完成: 成功 {report['uploaded']} 张，失败 {report['failed_count']} 张")
+            except Exception as e:
+                logger.warning(f"上传图片失败: {e}")
+                image_fields['images'] = {
+                    'mode': 'batch',
+                    'uploaded': 0,
+                    'failed_count': len(images),
+                    'failed': list(images),
+                    'details': [],
+                    'error': str(e)
+                }
+                # 继续执行，图片不是必须的
+        
+        # 点击发布按钮
+        try:
+            logger.info("正在点击发布按钮...")
+            timer.start('publish_click')
+            
+            publish_button = waiter.clickable_xpath(
+                "micro_publish_button", MICRO_PUBLISH_BUTTON_XPATH, timeout=10
+            )
+            start_url = driver.current_url
+            publish_button.click()
+            logger.info("已点击发布按钮")
+            
+            # 等待确认弹窗并点击确认（如果有的话）
+            timer.start('confirm')
+            confirm_button = waiter.clickable_xpath(
+                "micro_confirm_button", MICRO_CONFIRM_BUTTON_XPATH, timeout=5, required=False
+            )
+            if confirm_button:
+                confirm_button.click()
+                logger.info("已点击确认发布按钮")
+            else:
+                logger.info("未检测到确认按钮，继续执行")
+            
+            # 等待发布成功提示
+            timer.start('success_detection')
+            outcome = waiter.publish_outcome(start_url, timeout=15)
+            if outcome == LOGIN_REQUIRED:
+                return self._redirected_to_login_result(**image_fields)
+            if outcome == PUBLISH_SUCCEEDED:
+                logger.info(f"微头条发布成功")
                 return {
-                    'success': False,
-                    'message': f'输入内容失败: {str(e)}'
+                    'success': True,
+                    'message': '微头条发布成功',
+                    **image_fields
                 }
             
-            # 上传图片
-            if images and len(images) > 0:
+            # 检查页面URL或其他元素判断是否成功
+            if "weitt-success" in driver.current_url or "success" in driver.page_source.lower():
+                logger.info("微头条发布成功（间接判断）")
+                return {
+                    'success': True,
+                    'message': '微头条发布成功',
+                    **image_fields
+                }
+            
+            logger.error("未检测到微头条发布成功提示")
+            return {
+                'success': False,
+                'message': '发布可能失败，未检测到成功提示',
+                **image_fields
+            }
+            
+        except Exception as e:
+            logger.error(f"点击发布按钮失败: {e}")
+            return {
+                'success': False,
+                'message': f'点击发布按钮失败: {str(e)}',
+                **image_fields
+            }
+    
+    def publish_concurrently(self,
+                             jobs: List[Dict[str, Any]],
+                             max_tabs: Optional[int] = None) -> Dict[str, Any]:
+        """
+        在同一个已登录浏览器的多个标签页中并发发布文章和微头条
+        
+        各发布流程只在等待页面状态时切换标签页，页面加载、图片上传等等待相互重叠；
+        单个标签页崩溃或出错只影响对应的发布任务。
+        
+        Args:
+            jobs: 发布任务列表。type 为 article 时参数同 publish_article（title、content、
+                images、tags、cover_image）；type 为 micro_post 时参数同 publish_micro_post
+                （content、images、topic）；可带 transport 指定发布方式
+            max_tabs: 同时打开的最多标签页数，默认使用 DRIVER_POOL_CONFIG['max_tabs']
+            
+        Returns:
+            Dict: 汇总结果，results 与 jobs 顺序一致
+        """
+        max_tabs = max_tabs or DRIVER_POOL_CONFIG['max_tabs']
+        pooled = None
+        timer = StepTimer()
+        try:
+            logger.info(f"开始多标签页并发发布 {len(jobs)} 个任务（最多 {max_tabs} 个标签页）")
+            pooled = self._acquire_driver(timer)
+            scheduler = TabScheduler(
+                pooled.driver,
+                max_tabs=max_tabs,
+                setup_tab=self._setup_tab if self._is_lean_profile() else None
+            )
+            results = scheduler.run([
+                lambda tab, job=job: self._run_tab_job(pooled, tab, job) for job in jobs
+            ])
+        except Exception as e:
+            logger.error(f"多标签页并发发布异常: {e}")
+            return {
+                'success': False,
+                'message': f'并发发布异常: {str(e)}',
+                'results': []
+            }
+        finally:
+            if pooled:
+                self.driver_pool.release(pooled)
+                logger.info("浏览器已归还驱动池")
+        
+        succeeded = sum(1 for result in results if result.get('success'))
+        logger.info(f"多标签页并发发布完成: 成功 {succeeded}/{len(jobs)}")
+        return {
+            'success': succeeded == len(jobs),
+            'message': f'成功发布 {succeeded}/{len(jobs)} 个任务',
+            'total': len(jobs),
+            'succeeded': succeeded,
+            'results': results,
+            'timings': timer.as_dict()
+        }
+    
+    def publish_batch(self,
+                      jobs: List[Dict[str, Any]],
+                      hot_editor: Optional[bool] = None,
+                      interval: float = 0) -> Dict[str, Any]:
+        """
+        在同一个浏览器中依次发布多条内容
+        
+        hot_editor 开启时，发布成功后保留发布页面，下一条同类内容在页面内重置编辑器后直接填写；
+        调用方把同类任务排在一起可使连续的任务复用同一个页面。
+        
+        Args:
+            jobs: 发布任务列表，格式同 publish_concurrently
+            hot_editor: 是否复用已加载的发布页面，默认使用 PUBLISH_CONFIG['hot_editor']
+            interval: 相邻两次发布之间的间隔（秒）
+            
+        Returns:
+            Dict: 汇总结果，results 与 jobs 顺序一致
+        """
+        hot_editor = PUBLISH_CONFIG['hot_editor'] if hot_editor is None else hot_editor
+        pooled = None
+        timer = StepTimer()
+        results: List[Dict[str, Any]] = []
+        try:
+            logger.info(f"开始批量发布 {len(jobs)} 个任务（复用发布页面: {hot_editor}）")
+            pooled = self._acquire_driver(timer)
+            for index, job in enumerate(jobs):
+                if index and interval:
+                    time.sleep(interval)
                 try:
-                    logger.info("正在上传图片...")
-                    
-                    # 找到图片上传按钮
-                    image_button = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[contains(@title, '图片')] | //span[contains(text(), '图片')]/ancestor::button"))
-                    )
-                    image_button.click()
-                    time.sleep(1)
-                    
-                    for img_path in images:
-                        # 查找文件输入框
-                        file_input = WebDriverWait(driver, 5).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']"))
-                        )
-                        file_input.send_keys(img_path)
-                        time.sleep(3)  # 等待上传完成
-                    
-                    logger.info("图片上传完成")
-                    time.sleep(2)
+                    result = self._run_job(pooled, PageWaiter(pooled.driver), job, hot_editor=hot_editor)
                 except Exception as e:
-                    logger.warning(f"上传图片失败: {e}")
-                    # 继续执行，图片不是必须的
-            
-            # 点击发布按钮
-            try:
-                logger.info("正在点击发布按钮...")
-                
-                publish_button = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), '发布')]/ancestor::button | //button[contains(text(), '发布')]"))
+                    logger.error(f"批量发布第 {index + 1} 个任务异常: {e}")
+                    result = {'success': False, 'type': job.get('type'), 'message': f'发布异常: {str(e)}'}
+                if not result.get('success'):
+                    # 失败后页面状态未知，关闭该标签页，下一条同类任务重新打开页面
+                    self._close_hot_tab(pooled, job.get('type'))
+                results.append(result)
+        except Exception as e:
+            logger.error(f"批量发布异常: {e}")
+            return {
+                'success': False,
+                'message': f'批量发布异常: {str(e)}',
+                'results': results
+            }
+        finally:
+            if pooled:
+                # 驱动池归还时会关闭多余标签页，保留的页面只在本次批量发布中复用
+                pooled.state.pop('hot_tabs', None)
+                self.driver_pool.release(pooled)
+                logger.info("浏览器已归还驱动池")
+        
+        succeeded = sum(1 for result in results if result.get('success'))
+        logger.info(f"批量发布完成: 成功 {succeeded}/{len(jobs)}")
+        return {
+            'success': succeeded == len(jobs),
+            'message': f'成功发布 {succeeded}/{len(jobs)} 个任务',
+            'total': len(jobs),
+            'succeeded': succeeded,
+            'results': results,
+            'timings': timer.as_dict()
+        }
+    
+    def _setup_tab(self, driver: webdriver.Chrome) -> None:
+        """新标签页的请求屏蔽设置只对该标签页生效，需逐个设置"""
+        cdp.set_blocked_urls(driver, LEAN_PROFILE_CONFIG['blocked_urls'])
+    
+    def _run_tab_job(self, pooled: PooledDriver, tab: TabContext, job: Dict[str, Any]) -> Dict[str, Any]:
+        """在标签页中执行单个发布任务"""
+        return self._run_job(pooled, tab.waiter(), job)
+    
+    def _run_job(self,
+                 pooled: PooledDriver,
+                 waiter: PageWaiter,
+                 job: Dict[str, Any],
+                 hot_editor: bool = False) -> Dict[str, Any]:
+        """
+        在已借出的浏览器中执行单个发布任务
+        
+        与 publish_article / publish_micro_post 一致：按任务的 transport（默认 PUBLISH_CONFIG['transport']）
+        选择发布方式，api 方式需要回退时在当前浏览器中继续发布；文章按 PUBLISH_CONFIG['preupload_images']
+        预上传图片。
+        """
+        job_type = job.get('type')
+        if job_type not in ('article', 'micro_post'):
+            return {'success': False, 'type': job_type, 'message': f'不支持的发布类型: {job_type}'}
+        transport = job.get('transport') or PUBLISH_CONFIG['transport']
+        if transport not in ('selenium', 'api'):
+            return {'success': False, 'type': job_type, 'message': f'不支持的发布方式: {transport}'}
+        
+        timer = StepTimer()
+        fallback_reason = None
+        if transport == 'api':
+            if job_type == 'article':
+                result, fallback_reason = self._publish_article_api(
+                    job['title'], job['content'], images=job.get('images'), tags=job.get('tags'),
+                    category=job.get('category'), cover_image=job.get('cover_image'),
+                    publish_time=job.get('publish_time'), original=job.get('original', True),
+                    content_format=job.get('content_format', 'auto'), timer=timer
                 )
-                publish_button.click()
-                logger.info("已点击发布按钮")
-                time.sleep(2)
-                
-                # 等待确认弹窗并点击确认（如果有的话）
-                try:
-                    confirm_button = WebDriverWait(driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), '确定')] | //button[contains(text(), '确认')]"))
-                    )
-                    confirm_button.click()
-                    logger.info("已点击确认发布按钮")
-                except:
-                    logger.info("未检测到确认按钮，继续执行")
-                
-                # 等待发布成功提示
+            else:
+                result, fallback_reason = self._publish_micro_post_api(
+                    job['content'], images=job.get('images'), topic=job.get('topic'),
+                    publish_time=job.get('publish_time'), timer=timer
+                )
+            if result is None and not PUBLISH_CONFIG['api_fallback']:
+                result = {'success': False, 'message': f'发布接口返回非预期响应: {fallback_reason}'}
+            if result is not None:
+                result['type'] = job_type
+                result['transport'] = 'api'
+                self._record_timings(job_type, result, timer)
+                return result
+            logger.warning(f"发布接口返回非预期响应（{fallback_reason}），回退到浏览器发布")
+        
+        if job_type == 'article':
+            result = self._publish_article_flow(
+                pooled, waiter, job['title'], job['content'],
+                images=job.get('images'), tags=job.get('tags'), cover_image=job.get('cover_image'),
+                timer=timer, preuploads=self._start_article_preupload(job.get('images'), job.get('cover_image')),
+                content_format=job.get('content_format', 'auto'), hot_editor=hot_editor
+            )
+        else:
+            result = self._publish_micro_post_flow(
+                pooled, waiter, job['content'], images=job.get('images'), topic=job.get('topic'),
+                timer=timer, hot_editor=hot_editor
+            )
+        result['type'] = job_type
+        result['waits'] = waiter.records
+        result['transport'] = 'selenium'
+        if fallback_reason:
+            result['fallback_reason'] = fallback_reason
+        self._record_timings(job_type, result, timer)
+        return result
+    
+    @staticmethod
+    def _record_timings(kind: str, result: Dict[str, Any], timer: StepTimer) -> None:
+        """把步骤耗时写入发布结果，并计入进程级耗时汇总"""
+        timings = timer.as_dict()
+        result['timings'] = timings
+        get_timing_aggregator().record(kind, timings, result.get('success'))
+        logger.info(f"发布步骤耗时: {timings}")
+    
+    # ---- 异步发布接口 ----
+    
+    @staticmethod
+    def _use_async_backend() -> bool:
+        """异步发布接口是否使用异步 CDP 后端"""
+        return PUBLISH_CONFIG.get('backend', 'selenium') == 'async_cdp'
+    
+    @staticmethod
+    async def _run_sync(func, *args, **kwargs) -> Any:
+        """在线程池中执行同步发布，不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+    
+    async def launch_async_browser(self) -> AsyncBrowser:
+        """按 ASYNC_CDP_CONFIG 启动（或连接已运行的）异步 CDP 浏览器"""
+        if ASYNC_CDP_CONFIG['ws_endpoint']:
+            return await AsyncBrowser.connect(ASYNC_CDP_CONFIG['ws_endpoint'])
+        arguments = list(SELENIUM_CONFIG['chrome_options'])
+        arguments.append(f"--window-size={SELENIUM_CONFIG['window_size'][0]},{SELENIUM_CONFIG['window_size'][1]}")
+        return await AsyncBrowser.launch(
+            arguments,
+            binary=ASYNC_CDP_CONFIG['chrome_binary'] or None,
+            headless=ASYNC_CDP_CONFIG['headless'],
+            timeout=ASYNC_CDP_CONFIG['launch_timeout']
+        )
+    
+    @asynccontextmanager
+    async def _async_browser_scope(self, browser: Optional[AsyncBrowser] = None):
+        """使用传入的浏览器，未传入时启动一个并在结束后关闭"""
+        if browser is not None:
+            yield browser
+            return
+        browser = await self.launch_async_browser()
+        try:
+            yield browser
+        finally:
+            await browser.close()
+    
+    async def _open_async_page(self, browser: AsyncBrowser) -> AsyncPage:
+        """打开新页面并写入登录Cookie、用户代理和请求屏蔽设置"""
+        page = await browser.new_page()
+        cookies = [
+            cdp.cookie_to_cdp(cookie) for cookie in self.session.cookies
+            if cookie.domain and 'toutiao' in cookie.domain
+        ]
+        if cookies:
+            await page.send('Network.setCookies', {'cookies': cookies})
+        user_agent = self.session.headers.get('User-Agent')
+        if user_agent:
+            await page.send('Network.setUserAgentOverride', {'userAgent': user_agent})
+        if self._is_lean_profile():
+            await page.send('Network.enable')
+            await page.send('Network.setBlockedURLs', {'urls': list(LEAN_PROFILE_CONFIG['blocked_urls'])})
+        return page
+    
+    async def publish_article_async(self,
+                                    title: str,
+                                    content: str,
+                                    images: Optional[List[str]] = None,
+                                    tags: Optional[List[str]] = None,
+                                    category: Optional[str] = None,
+                                    cover_image: Optional[str] = None,
+                                    publish_time: Optional[str] = None,
+                                    original: bool = True,
+                                    transport: Optional[str] = None,
+                                    content_format: str = 'auto',
+                                    browser: Optional[AsyncBrowser] = None) -> Dict[str, Any]:
+        """
+        异步发布文章，参数和返回值同 publish_article
+        
+        PUBLISH_CONFIG['backend'] 为 async_cdp 时在事件循环中通过 CDP 驱动浏览器，图片通过上传接口
+        并发上传后按地址插入正文（暂不设置封面，由平台从正文图片中选择）；否则在线程池中执行
+        publish_article。
+        
+        Args:
+            browser: 异步 CDP 浏览器，未传入时为本次发布启动一个
+        """
+        if not self._use_async_backend() or (transport or PUBLISH_CONFIG['transport']) == 'api':
+            return await self._run_sync(
+                self.publish_article, title, content, images=images, tags=tags, category=category,
+                cover_image=cover_image, publish_time=publish_time, original=original,
+                transport=transport, content_format=content_format
+            )
+        
+        timer = StepTimer()
+        page = None
+        try:
+            logger.info(f"开始通过异步 CDP 后端发布文章: {title}")
+            async with self._async_browser_scope(browser) as active:
+                timer.start('driver_acquire')
+                page = await self._open_async_page(active)
                 try:
-                    WebDriverWait(driver, 15).until(
-                        EC.presence_of_element_located((By.XPATH, "//*[contains(text(), '发布成功')]"))
+                    result = await self._publish_article_flow_async(
+                        page, title, content, images=images, cover_image=cover_image,
+                        content_format=content_format, timer=timer
                     )
-                    logger.info(f"微头条发布成功")
-                    return {
-                        'success': True,
-                        'message': '微头条发布成功'
-                    }
-                except:
-                    # 检查页面URL或其他元素判断是否成功
-                    if "weitt-success" in driver.current_url or "success" in driver.page_source.lower():
-                        logger.info("微头条发布成功（间接判断）")
-                        return {
-                            'success': True,
-                            'message': '微头条发布成功'
-                        }
-                    else:
-                        logger.error("未检测到微头条发布成功提示")
-                        return {
-                            'success': False,
-                            'message': '发布可能失败，未检测到成功提示'
-                        }
-                
-            except Exception as e:
-                logger.error(f"点击发布按钮失败: {e}")
-                return {
-                    'success': False,
-                    'message': f'点击发布按钮失败: {str(e)}'
-                }
-            
+                finally:
+                    await page.close()
         except Exception as e:
-            logger.error(f"微头条发布异常: {e}")
+            logger.error(f"异步发布文章异常: {e}", exc_info=True)
+            result = {'success': False, 'title': title, 'message': f'文章发布异常: {type(e).__name__} - {str(e)}'}
+        
+        if page:
+            result['waits'] = page.records
+        result['transport'] = 'async_cdp'
+        self._record_timings('article', result, timer)
+        return result
+    
+    async def _publish_article_flow_async(self,
+                                          page: AsyncPage,
+                                          title: str,
+                                          content: str,
+                                          images: Optional[List[str]] = None,
+                                          cover_image: Optional[str] = None,
+                                          content_format: str = 'auto',
+                                          timer: Optional[StepTimer] = None) -> Dict[str, Any]:
+        """在异步页面中执行文章发布的页面操作，步骤同 _publish_article_flow"""
+        timer = timer or StepTimer()
+        
+        # 图片通过上传接口并发上传，与打开页面同时进行
+        loop = asyncio.get_running_loop()
+        uploads = {path: loop.run_in_executor(None, self._upload_image, path) for path in dict.fromkeys(images or [])}
+        
+        timer.start('navigation')
+        await page.navigate(TOUTIAO_URLS['article_page'])
+        timer.start('editor_ready')
+        state = await page.wait_js("editor_ready", """
+            if (/login|\\/auth\\//.test(window.location.href)) { return arguments[0]; }
+            if (document.readyState === 'loading') { return null; }
+            var editor = firstVisible('.ProseMirror');
+            if (!firstVisible('textarea') || !editor || editor.getAttribute('contenteditable') !== 'true') { return null; }
+            return 'ready';
+        """, 20, LOGIN_REQUIRED, required=False)
+        if not state:
+            return {'success': False, 'title': title, 'message': '页面加载超时，请检查网络'}
+        if state == LOGIN_REQUIRED:
+            logger.warning("需要重新登录，请先运行登录脚本")
+            self.auth.invalidate_login_cache()
+            return {'success': False, 'title': title, 'message': '需要重新登录，请先运行登录脚本'}
+        
+        timer.start('title')
+        await page.insert_text(ARTICLE_TITLE_SELECTOR, title)
+        
+        timer.start('image_preupload')
+        uploaded = {}
+        for path, future in uploads.items():
+            try:
+                uploaded[path] = await future
+            except Exception as e:
+                logger.warning(f"图片上传失败 {path}: {e}")
+                uploaded[path] = None
+        if cover_image:
+            logger.warning("异步 CDP 后端暂不设置封面，由平台从正文图片中选择")
+        
+        timer.start('body')
+        blocks = render_blocks(content, content_format)
+        uploaded_images = self._format_uploaded_images([uploaded.get(path) for path in (images or [])])
+        if uploaded_images:
+            blocks.append(uploaded_images)
+        content_check = await insert_blocks_async(page, '.ProseMirror', blocks)
+        if not content_check['matched']:
             return {
-                'success': False, 
-                'message': f'发布异常: {str(e)}'
+                'success': False,
+                'title': title,
+                'message': f"正文字数校验失败：源文本 {content_check['expected']} 字，"
+                           f"编辑器 {content_check['actual']} 字",
+                'content_check': content_check
             }
-        finally:
-            # 关闭浏览器
-            if driver:
+        
+        timer.start('preview')
+        start_url = await page.evaluate("return window.location.href;")
+        clicked = (
+            await page.click_xpath("preview_publish_button", "//button[contains(., '预览并发布')]", 10, required=False)
+            or await page.click_xpath(
+                "publish_button", "//button[contains(., '发布') and not(contains(@class,'modal-footer'))]",
+                10, required=False
+            )
+        )
+        if not clicked:
+            return {'success': False, 'title': title, 'message': '未找到预览并发布按钮'}
+        
+        timer.start('confirm')
+        confirmed = await page.wait_js("publish_dialog_visible", """
+            var el = firstVisible(arguments[0]);
+            if (!isEnabled(el)) { return false; }
+            el.scrollIntoView({block: 'center', inline: 'center'});
+            el.click();
+            return true;
+        """, 40, ARTICLE_CONFIRM_SELECTOR, required=False)
+        if not confirmed:
+            return {
+                'success': False,
+                'title': title,
+                'message': f'关键的确认发布按钮未能找到 (CSS: {ARTICLE_CONFIRM_SELECTOR}).'
+            }
+        
+        timer.start('success_detection')
+        outcome = await page.wait_js("publish_outcome", PUBLISH_SUCCEEDED_SCRIPT, 15,
+                                     start_url, PUBLISH_SUCCEEDED, LOGIN_REQUIRED, required=False)
+        if outcome == LOGIN_REQUIRED:
+            return self._redirected_to_login_result(title=title, content_check=content_check)
+        if outcome == PUBLISH_SUCCEEDED:
+            return {'success': True, 'title': title, 'message': '文章发布成功，并检测到成功提示',
+                    'content_check': content_check}
+        return {'success': True, 'title': title, 'message': '文章已提交发布，请稍后在平台确认最终状态',
+                'content_check': content_check}
+    
+    async def publish_micro_post_async(self,
+                                       content: str,
+                                       images: Optional[List[str]] = None,
+                                       topic: Optional[str] = None,
+                                       location: Optional[str] = None,
+                                       publish_time: Optional[str] = None,
+                                       transport: Optional[str] = None,
+                                       browser: Optional[AsyncBrowser] = None) -> Dict[str, Any]:
+        """
+        异步发布微头条，参数和返回值同 publish_micro_post
+        
+        PUBLISH_CONFIG['backend'] 为 async_cdp 时在事件循环中通过 CDP 驱动浏览器，否则在线程池中
+        执行 publish_micro_post。
+        
+        Args:
+            browser: 异步 CDP 浏览器，未传入时为本次发布启动一个
+        """
+        if not self._use_async_backend() or (transport or PUBLISH_CONFIG['transport']) == 'api':
+            return await self._run_sync(
+                self.publish_micro_post, content, images=images, topic=topic, location=location,
+                publish_time=publish_time, transport=transport
+            )
+        
+        timer = StepTimer()
+        page = None
+        try:
+            logger.info(f"开始通过异步 CDP 后端发布微头条: {content[:50]}...")
+            async with self._async_browser_scope(browser) as active:
+                timer.start('driver_acquire')
+                page = await self._open_async_page(active)
                 try:
-                    driver.quit()
-                    logger.info("浏览器已关闭")
-                except:
-                    pass
+                    result = await self._publish_micro_post_flow_async(page, content, images, topic, timer)
+                finally:
+                    await page.close()
+        except Exception as e:
+            logger.error(f"异步发布微头条异常: {e}", exc_info=True)
+            result = {'success': False, 'message': f'发布异常: {str(e)}'}
+        
+        if page:
+            result['waits'] = page.records
+        result['transport'] = 'async_cdp'
+        self._record_timings('micro_post', result, timer)
+        return result
+    
+    async def _publish_micro_post_flow_async(self,
+                                             page: AsyncPage,
+                                             content: str,
+                                             images: Optional[List[str]] = None,
+                                             topic: Optional[str] = None,
+                                             timer: Optional[StepTimer] = None) -> Dict[str, Any]:
+        """在异步页面中执行微头条发布的页面操作，步骤同 _publish_micro_post_flow"""
+        timer = timer or StepTimer()
+        if images and len(images) > 9:
+            logger.warning("微头条最多支持9张图片，将只使用前9张")
+            images = images[:9]
+        if topic and not topic.startswith('#'):
+            topic = f"#{topic}#"
+        micro_content = f"{topic} {content}" if topic else content
+        
+        timer.start('navigation')
+        await page.navigate(TOUTIAO_URLS['micro_page'])
+        timer.start('editor_ready')
+        selector = await page.wait_js("micro_editor_ready", """
+            if (/login|\\/auth\\//.test(window.location.href)) { return arguments[1]; }
+            var selectors = arguments[0];
+            for (var i = 0; i < selectors.length; i++) {
+                try { if (firstVisible(selectors[i])) { return selectors[i]; } } catch (e) {}
+            }
+            return null;
+        """, 30, self._micro_editor_selectors(), LOGIN_REQUIRED, required=False)
+        if selector == LOGIN_REQUIRED:
+            logger.warning("需要重新登录，页面已重定向到登录页")
+            self.auth.invalidate_login_cache()
+            return {'success': False, 'message': '需要重新登录，Cookie可能已过期，请先运行 python login_simple.py 重新登录'}
+        if not selector:
+            return {'success': False, 'message': f"编辑器加载超时。访问的URL: {TOUTIAO_URLS['micro_page']}"}
+        self._micro_editor_selector = selector
+        
+        timer.start('body')
+        await page.insert_text(selector, micro_content)
+        await page.wait_js("micro_content_applied", """
+            var el = firstVisible(arguments[0]);
+            if (!el) { return false; }
+            return el.tagName === 'TEXTAREA' ? el.value.length > 0 : (el.innerText || '').trim().length > 0;
+        """, 5, selector, required=False)
+        
+        image_fields = {}
+        if images:
+            timer.start('image_upload')
+            image_fields['images'] = await self._upload_micro_images_async(page, images)
+        
+        timer.start('publish_click')
+        start_url = await page.evaluate("return window.location.href;")
+        if not await page.click_xpath("micro_publish_button", MICRO_PUBLISH_BUTTON_XPATH, 10, required=False):
+            return {'success': False, 'message': '未找到发布按钮', **image_fields}
+        timer.start('confirm')
+        await page.click_xpath("micro_confirm_button", MICRO_CONFIRM_BUTTON_XPATH, 5, required=False)
+        
+        timer.start('success_detection')
+        outcome = await page.wait_js("publish_outcome", PUBLISH_SUCCEEDED_SCRIPT, 15,
+                                     start_url, PUBLISH_SUCCEEDED, LOGIN_REQUIRED, required=False)
+        if outcome == LOGIN_REQUIRED:
+            return self._redirected_to_login_result(**image_fields)
+        if outcome == PUBLISH_SUCCEEDED:
+            return {'success': True, 'message': '微头条发布成功', **image_fields}
+        return {'success': True, 'message': '微头条已提交发布，请稍后在平台确认最终状态', **image_fields}
+    
+    async def _upload_micro_images_async(self,
+                                         page: AsyncPage,
+                                         images: List[str],
+                                         per_image_timeout: float = 30) -> Dict[str, Any]:
+        """一次提交全部配图并等待缩略图渲染，报告格式同 _upload_micro_images"""
+        paths = [str(Path(path).resolve()) for path in images if Path(path).is_file()]
+        missing = [path for path in images if not Path(path).is_file()]
+        report: Dict[str, Any] = {'mode': 'batch', 'uploaded': 0, 'failed_count': len(images),
+                                  'failed': list(missing), 'details': []}
+        if not paths:
+            return report
+        
+        selectors = (UPLOAD_THUMBNAIL_SELECTORS, UPLOAD_PROGRESS_SELECTORS, UPLOAD_ERROR_SELECTORS)
+        await page.click_xpath("micro_image_button", MICRO_IMAGE_BUTTON_XPATH, 10)
+        await page.wait_js("micro_file_input", "return !!document.querySelector(\"input[type='file']\");", 5)
+        baseline = await page.evaluate(UPLOAD_SNAPSHOT_SCRIPT, *selectors)
+        await page.set_files("input[type='file']", paths)
+        await page.wait_js("uploads_finished", """
+            var snapshot = (function() { """ + UPLOAD_SNAPSHOT_SCRIPT + """ }).apply(null, arguments[0]);
+            return snapshot.rendered - arguments[1].rendered + snapshot.failed - arguments[1].failed >= arguments[2];
+        """, per_image_timeout * len(paths), list(selectors), baseline, len(paths), required=False)
+        snapshot = await page.evaluate(UPLOAD_SNAPSHOT_SCRIPT, *selectors)
+        
+        # 缩略图不标明对应的文件，上传失败的图片只计数，不列出路径
+        uploaded = min(len(paths), max(0, snapshot['rendered'] - baseline['rendered']))
+        report['uploaded'] = uploaded
+        report['failed_count'] = len(images) - uploaded
+        return report
+    
+    async def publish_batch_async(self,
+                                  jobs: List[Dict[str, Any]],
+                                  interval: float = 0,
+                                  max_concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """
+        异步批量发布，参数和返回值同 publish_batch
+        
+        使用异步 CDP 后端时，所有任务在同一个浏览器的多个页面中并发执行（第 i 个任务在
+        i * interval 秒后开始），transport 为 api 的任务走发布接口；未使用异步后端或
+        PUBLISH_CONFIG['transport'] 为 api 时在线程池中执行 publish_batch，与单条异步发布一致。
+        
+        Args:
+            jobs: 发布任务列表，格式同 publish_concurrently
+            interval: 相邻两个任务开始的间隔（秒）
+            max_concurrency: 同时进行的最多任务数，默认使用 DRIVER_POOL_CONFIG['max_tabs']
+        """
+        if not self._use_async_backend() or PUBLISH_CONFIG['transport'] == 'api':
+            return await self._run_sync(self.publish_batch, jobs, interval=interval)
+        
+        timer = StepTimer()
+        limit = asyncio.Semaphore(max_concurrency or DRIVER_POOL_CONFIG['max_tabs'])
+        try:
+            logger.info(f"开始通过异步 CDP 后端批量发布 {len(jobs)} 个任务")
+            async with self._async_browser_scope() as browser:
+                async def run(index: int, job: Dict[str, Any]) -> Dict[str, Any]:
+                    if interval:
+                        await asyncio.sleep(index * interval)
+                    async with limit:
+                        return await self._run_job_async(browser, job)
+                
+                results = list(await asyncio.gather(*(run(i, job) for i, job in enumerate(jobs))))
+        except Exception as e:
+            logger.error(f"异步批量发布异常: {e}")
+            return {'success': False, 'message': f'批量发布异常: {str(e)}', 'results': []}
+        
+        succeeded = sum(1 for result in results if result.get('success'))
+        logger.info(f"异步批量发布完成: 成功 {succeeded}/{len(jobs)}")
+        return {
+            'success': succeeded == len(jobs),
+            'message': f'成功发布 {succeeded}/{len(jobs)} 个任务',
+            'total': len(jobs),
+            'succeeded': succeeded,
+            'results': results,
+            'timings': timer.as_dict()
+        }
+    
+    async def _run_job_async(self, browser: AsyncBrowser, job: Dict[str, Any]) -> Dict[str, Any]:
+        """在异步 CDP 浏览器中执行单个发布任务"""
+        job_type = job.get('type')
+        if job_type == 'article':
+            result = await self.publish_article_async(
+                job['title'], job['content'], images=job.get('images'), tags=job.get('tags'),
+                cover_image=job.get('cover_image'), content_format=job.get('content_format', 'auto'),
+                transport=job.get('transport'), browser=browser
+            )
+        elif job_type == 'micro_post':
+            result = await self.publish_micro_post_async(
+                job['content'], images=job.get('images'), topic=job.get('topic'),
+                transport=job.get('transport'), browser=browser
+            )
+        else:
+            return {'success': False, 'type': job_type, 'message': f'不支持的发布类型: {job_type}'}
+        result['type'] = job_type
+        return result
     
     def get_article_list(self, page: int = 1, page_size: int = 20, status: str = 'all') -> Dict[str, Any]:
         """
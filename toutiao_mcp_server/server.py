@@ -9,11 +9,9 @@ from typing import Any, Dict, List, Optional, Sequence
 
 from fastmcp import FastMCP, Context
 
-from .auth import TouTiaoAuth
-from .publisher import TouTiaoPublisher
-from .analytics import TouTiaoAnalytics
-from .multi_platform_publisher import MultiPlatformPublisher
-from .config import get_cookies_file_path
+from .accounts import AccountRegistry
+from .config import ACCOUNTS_CONFIG
+from .timing import get_timing_aggregator
 
 # 配置日志
 logging.basicConfig(
@@ -25,11 +23,8 @@ logger = logging.getLogger(__name__)
 # 创建MCP应用
 mcp = FastMCP("TouTiao MCP Server")
 
-# 全局变量存储服务实例
-auth_manager: Optional[TouTiaoAuth] = None
-publisher: Optional[TouTiaoPublisher] = None
-analytics: Optional[TouTiaoAnalytics] = None
-multi_platform_publisher: Optional[MultiPlatformPublisher] = None
+# 账号注册表：每个账号拥有独立的认证会话、发布器（浏览器驱动池）和分析器
+accounts: Optional[AccountRegistry] = None
 
 def initialize_services() -> bool:
     """
@@ -38,48 +33,67 @@ def initialize_services() -> bool:
     Returns:
         bool: 初始化是否成功
     """
-    global auth_manager, publisher, analytics, multi_platform_publisher
+    global accounts
     
     try:
-        # 初始化认证管理器
-        auth_manager = TouTiaoAuth()
+        # 重复初始化时先释放旧账号的浏览器
+        if accounts:
+            accounts.close()
+        accounts = AccountRegistry()
         
-        # 初始化发布器和分析器
-        publisher = TouTiaoPublisher(auth_manager)
-        analytics = TouTiaoAnalytics(auth_manager)
-        
-        # 初始化多平台发布器
-        multi_platform_publisher = MultiPlatformPublisher(auth_manager)
-        
-        logger.info("服务实例初始化成功")
+        logger.info(f"服务实例初始化成功，账号: {', '.join(accounts.names())}（默认 {accounts.default_account}）")
         return True
     except Exception as e:
         logger.error(f"服务实例初始化失败: {e}")
         return False
 
+def prefill_driver_pools() -> None:
+    """
+    后台预热浏览器驱动池，避免首次发布时冷启动
+    
+    由服务启动入口（start_server.py）在初始化服务后调用；导入本模块时不启动浏览器。
+    默认只预热默认账号，ACCOUNTS_CONFIG['prefill_all'] 开启时预热所有账号。
+    """
+    if not accounts:
+        return
+    names = accounts.names() if ACCOUNTS_CONFIG['prefill_all'] else [accounts.default_account]
+    for name in names:
+        accounts.get(name).publisher.driver_pool.prefill(background=True)
+
+def start_session_refresh() -> None:
+    """
+    为所有账号开启登录会话自动续期
+
+    由服务启动入口（start_server.py）在初始化服务后调用；导入本模块时不启动续期定时器。
+    """
+    if accounts:
+        accounts.start_auto_refresh()
+
 @mcp.tool()
-def login_with_credentials(username: str, password: str) -> Dict[str, Any]:
+def login_with_credentials(username: str, password: str, account: Optional[str] = None) -> Dict[str, Any]:
     """
     使用用户名密码登录今日头条
     
     Args:
         username: 用户名（手机号/邮箱）
         password: 密码
+        account: 账号名，默认使用默认账号（见 list_accounts）
         
     Returns:
         Dict: 登录结果
     """
     try:
-        if not auth_manager:
+        if not accounts:
             return {"success": False, "message": "服务未初始化"}
         
-        success = auth_manager.login_with_selenium(username, password)
+        context = accounts.get(account)
+        success = context.auth.login_with_selenium(username, password)
         
         if success:
             return {
                 "success": True,
                 "message": "登录成功",
-                "login_status": auth_manager.check_login_status()
+                "login_status": context.auth.check_login_status()
             }
         else:
             return {
@@ -91,19 +105,23 @@ def login_with_credentials(username: str, password: str) -> Dict[str, Any]:
         return {"success": False, "message": f"登录异常: {str(e)}"}
 
 @mcp.tool()
-def check_login_status() -> Dict[str, Any]:
+def check_login_status(account: Optional[str] = None) -> Dict[str, Any]:
     """
     检查当前登录状态
     
+    Args:
+        account: 账号名，默认使用默认账号（见 list_accounts）
+        
     Returns:
         Dict: 登录状态信息
     """
     try:
-        if not auth_manager:
+        if not accounts:
             return {"success": False, "message": "服务未初始化"}
         
-        is_logged_in = auth_manager.check_login_status()
-        user_info = auth_manager.get_user_info() if is_logged_in else None
+        context = accounts.get(account)
+        is_logged_in = context.auth.check_login_status()
+        user_info = context.auth.get_user_info() if is_logged_in else None
         
         return {
             "success": True,
@@ -115,18 +133,22 @@ def check_login_status() -> Dict[str, Any]:
         return {"success": False, "message": f"检查异常: {str(e)}"}
 
 @mcp.tool()
-def logout() -> Dict[str, Any]:
+def logout(account: Optional[str] = None) -> Dict[str, Any]:
     """
     登出当前账户
     
+    Args:
+        account: 账号名，默认使用默认账号（见 list_accounts）
+        
     Returns:
         Dict: 登出结果
     """
     try:
-        if not auth_manager:
+        if not accounts:
             return {"success": False, "message": "服务未初始化"}
         
-        success = auth_manager.logout()
+        context = accounts.get(account)
+        success = context.auth.logout()
         return {
             "success": success,
             "message": "登出成功" if success else "登出失败"
@@ -144,7 +166,10 @@ def publish_article(
     category: Optional[str] = None,
     cover_image: Optional[str] = None,
     publish_time: Optional[str] = None,
-    original: bool = True
+    original: bool = True,
+    transport: Optional[str] = None,
+    content_format: str = "auto",
+    account: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     发布图文文章到今日头条
@@ -158,18 +183,22 @@ def publish_article(
         cover_image: 封面图片路径
         publish_time: 定时发布时间（格式：YYYY-MM-DD HH:MM:SS）
         original: 是否为原创内容
+        transport: 发布方式，selenium（浏览器）或 api（直接调用发布接口，失败时回退浏览器）
+        content_format: 正文格式，text、markdown、html 或 auto（自动判断）
+        account: 账号名，默认使用默认账号（见 list_accounts）
         
     Returns:
         Dict: 发布结果
     """
     try:
-        if not publisher:
+        if not accounts:
             return {"success": False, "message": "发布服务未初始化"}
         
-        if not auth_manager or not auth_manager.check_login_status():
+        context = accounts.get(account)
+        if not context.auth.check_login_status():
             return {"success": False, "message": "请先登录"}
         
-        result = publisher.publish_article(
+        result = context.publisher.publish_article(
             title=title,
             content=content,
             images=images,
@@ -177,7 +206,9 @@ def publish_article(
             category=category,
             cover_image=cover_image,
             publish_time=publish_time,
-            original=original
+            original=original,
+            transport=transport,
+            content_format=content_format
         )
         
         return result
@@ -191,7 +222,9 @@ def publish_micro_post(
     images: Optional[List[str]] = None,
     topic: Optional[str] = None,
     location: Optional[str] = None,
-    publish_time: Optional[str] = None
+    publish_time: Optional[str] = None,
+    transport: Optional[str] = None,
+    account: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     发布微头条
@@ -202,23 +235,27 @@ def publish_micro_post(
         topic: 话题标签
         location: 位置信息
         publish_time: 定时发布时间
+        transport: 发布方式，selenium（浏览器）或 api（直接调用发布接口，失败时回退浏览器）
+        account: 账号名，默认使用默认账号（见 list_accounts）
         
     Returns:
         Dict: 发布结果
     """
     try:
-        if not publisher:
+        if not accounts:
             return {"success": False, "message": "发布服务未初始化"}
         
-        if not auth_manager or not auth_manager.check_login_status():
+        context = accounts.get(account)
+        if not context.auth.check_login_status():
             return {"success": False, "message": "请先登录"}
         
-        result = publisher.publish_micro_post(
+        result = context.publisher.publish_micro_post(
             content=content,
             images=images,
             topic=topic,
             location=location,
-            publish_time=publish_time
+            publish_time=publish_time,
+            transport=transport
         )
         
         return result
@@ -230,7 +267,8 @@ def publish_micro_post(
 def get_article_list(
     page: int = 1,
     page_size: int = 20,
-    status: str = 'all'
+    status: str = 'all',
+    account: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     获取已发布文章列表
@@ -239,18 +277,20 @@ def get_article_list(
         page: 页码
         page_size: 每页数量
         status: 文章状态 (all/published/draft/review)
+        account: 账号名，默认使用默认账号（见 list_accounts）
         
     Returns:
         Dict: 文章列表数据
     """
     try:
-        if not publisher:
+        if not accounts:
             return {"success": False, "message": "发布服务未初始化"}
         
-        if not auth_manager or not auth_manager.check_login_status():
+        context = accounts.get(account)
+        if not context.auth.check_login_status():
             return {"success": False, "message": "请先登录"}
         
-        result = publisher.get_article_list(
+        result = context.publisher.get_article_list(
             page=page,
             page_size=page_size,
             status=status
@@ -262,93 +302,103 @@ def get_article_list(
         return {"success": False, "message": f"获取异常: {str(e)}"}
 
 @mcp.tool()
-def delete_article(article_id: str) -> Dict[str, Any]:
+def delete_article(article_id: str, account: Optional[str] = None) -> Dict[str, Any]:
     """
     删除指定文章
     
     Args:
         article_id: 文章ID
+        account: 账号名，默认使用默认账号（见 list_accounts）
         
     Returns:
         Dict: 删除结果
     """
     try:
-        if not publisher:
+        if not accounts:
             return {"success": False, "message": "发布服务未初始化"}
         
-        if not auth_manager or not auth_manager.check_login_status():
+        context = accounts.get(account)
+        if not context.auth.check_login_status():
             return {"success": False, "message": "请先登录"}
         
-        result = publisher.delete_article(article_id)
+        result = context.publisher.delete_article(article_id)
         return result
     except Exception as e:
         logger.error(f"删除文章异常: {e}")
         return {"success": False, "message": f"删除异常: {str(e)}"}
 
 @mcp.tool()
-def get_account_overview() -> Dict[str, Any]:
+def get_account_overview(account: Optional[str] = None) -> Dict[str, Any]:
     """
     获取账户数据概览
     
+    Args:
+        account: 账号名，默认使用默认账号（见 list_accounts）
+        
     Returns:
         Dict: 账户概览数据
     """
     try:
-        if not analytics:
+        if not accounts:
             return {"success": False, "message": "分析服务未初始化"}
         
-        if not auth_manager or not auth_manager.check_login_status():
+        context = accounts.get(account)
+        if not context.auth.check_login_status():
             return {"success": False, "message": "请先登录"}
         
-        result = analytics.get_account_overview()
+        result = context.analytics.get_account_overview()
         return result
     except Exception as e:
         logger.error(f"获取账户概览异常: {e}")
         return {"success": False, "message": f"获取异常: {str(e)}"}
 
 @mcp.tool()
-def get_article_stats(article_id: str) -> Dict[str, Any]:
+def get_article_stats(article_id: str, account: Optional[str] = None) -> Dict[str, Any]:
     """
     获取指定文章的统计数据
     
     Args:
         article_id: 文章ID
+        account: 账号名，默认使用默认账号（见 list_accounts）
         
     Returns:
         Dict: 文章统计数据
     """
     try:
-        if not analytics:
+        if not accounts:
             return {"success": False, "message": "分析服务未初始化"}
         
-        if not auth_manager or not auth_manager.check_login_status():
+        context = accounts.get(account)
+        if not context.auth.check_login_status():
             return {"success": False, "message": "请先登录"}
         
-        result = analytics.get_article_stats(article_id)
+        result = context.analytics.get_article_stats(article_id)
         return result
     except Exception as e:
         logger.error(f"获取文章统计异常: {e}")
         return {"success": False, "message": f"获取异常: {str(e)}"}
 
 @mcp.tool()
-def get_trending_analysis(days: int = 7) -> Dict[str, Any]:
+def get_trending_analysis(days: int = 7, account: Optional[str] = None) -> Dict[str, Any]:
     """
     获取趋势分析数据
     
     Args:
         days: 分析天数
+        account: 账号名，默认使用默认账号（见 list_accounts）
         
     Returns:
         Dict: 趋势分析数据
     """
     try:
-        if not analytics:
+        if not accounts:
             return {"success": False, "message": "分析服务未初始化"}
         
-        if not auth_manager or not auth_manager.check_login_status():
+        context = accounts.get(account)
+        if not context.auth.check_login_status():
             return {"success": False, "message": "请先登录"}
         
-        result = analytics.get_trending_analysis(days)
+        result = context.analytics.get_trending_analysis(days)
         return result
     except Exception as e:
         logger.error(f"获取趋势分析异常: {e}")
@@ -357,7 +407,8 @@ def get_trending_analysis(days: int = 7) -> Dict[str, Any]:
 @mcp.tool()
 def get_content_performance(
     limit: int = 10,
-    sort_by: str = 'read_count'
+    sort_by: str = 'read_count',
+    account: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     获取内容表现排行
@@ -365,42 +416,46 @@ def get_content_performance(
     Args:
         limit: 获取数量
         sort_by: 排序字段 (read_count/comment_count/like_count/share_count)
+        account: 账号名，默认使用默认账号（见 list_accounts）
         
     Returns:
         Dict: 内容表现数据
     """
     try:
-        if not analytics:
+        if not accounts:
             return {"success": False, "message": "分析服务未初始化"}
         
-        if not auth_manager or not auth_manager.check_login_status():
+        context = accounts.get(account)
+        if not context.auth.check_login_status():
             return {"success": False, "message": "请先登录"}
         
-        result = analytics.get_content_performance(limit, sort_by)
+        result = context.analytics.get_content_performance(limit, sort_by)
         return result
     except Exception as e:
         logger.error(f"获取内容表现异常: {e}")
         return {"success": False, "message": f"获取异常: {str(e)}"}
 
 @mcp.tool()
-def generate_report(report_type: str = 'weekly') -> Dict[str, Any]:
+def generate_report(report_type: str = 'weekly', account: Optional[str] = None) -> Dict[str, Any]:
     """
     生成数据分析报告
     
     Args:
         report_type: 报告类型 (daily/weekly/monthly)
+        account: 账号名，默认使用默认账号（见 list_accounts）
         
     Returns:
         Dict: 生成的报告数据
     """
     try:
-        if not analytics:
+        if not accounts:
             return {"success": False, "message": "分析服务未初始化"}
         
-        if not auth_manager or not auth_manager.check_login_status():
+        context = accounts.get(account)
+        if not context.auth.check_login_status():
             return {"success": False, "message": "请先登录"}
         
-        result = analytics.generate_report(report_type)
+        result = context.analytics.generate_report(report_type)
         return result
     except Exception as e:
         logger.error(f"生成报告异常: {e}")
@@ -409,7 +464,8 @@ def generate_report(report_type: str = 'weekly') -> Dict[str, Any]:
 @mcp.tool()
 def publish_xiaohongshu_data(
     records: List[Dict[str, Any]],
-    download_folder: str = "downloaded_images"
+    download_folder: str = "downloaded_images",
+    account: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     发布小红书格式数据到今日头条（兼容小红书自动发布工具）
@@ -417,15 +473,17 @@ def publish_xiaohongshu_data(
     Args:
         records: 小红书格式的数据记录列表
         download_folder: 图片下载目录
+        account: 账号名，默认使用默认账号（见 list_accounts）
         
     Returns:
         Dict: 批量发布结果
     """
     try:
-        if not multi_platform_publisher:
+        if not accounts:
             return {"success": False, "message": "多平台发布服务未初始化"}
         
-        if not auth_manager or not auth_manager.check_login_status():
+        context = accounts.get(account)
+        if not context.auth.check_login_status():
             return {"success": False, "message": "请先登录今日头条"}
         
         # 异步处理记录
@@ -434,13 +492,13 @@ def publish_xiaohongshu_data(
         
         try:
             results = loop.run_until_complete(
-                multi_platform_publisher.process_xiaohongshu_records(
+                context.multi_platform_publisher.process_xiaohongshu_records(
                     records, download_folder
                 )
             )
             
             # 生成摘要报告
-            summary = multi_platform_publisher.generate_publish_summary(results)
+            summary = context.multi_platform_publisher.generate_publish_summary(results)
             
             return {
                 "success": True,
@@ -459,7 +517,8 @@ def publish_single_xiaohongshu_record(
     title: str,
     content: str,
     image_url: Optional[str] = None,
-    download_folder: str = "downloaded_images"
+    download_folder: str = "downloaded_images",
+    account: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     发布单条小红书格式数据到今日头条
@@ -469,15 +528,17 @@ def publish_single_xiaohongshu_record(
         content: 内容（支持小红书文案格式）
         image_url: 图片URL（可选）
         download_folder: 图片下载目录
+        account: 账号名，默认使用默认账号（见 list_accounts）
         
     Returns:
         Dict: 发布结果
     """
     try:
-        if not multi_platform_publisher:
+        if not accounts:
             return {"success": False, "message": "多平台发布服务未初始化"}
         
-        if not auth_manager or not auth_manager.check_login_status():
+        context = accounts.get(account)
+        if not context.auth.check_login_status():
             return {"success": False, "message": "请先登录今日头条"}
         
         # 构造记录格式
@@ -493,7 +554,7 @@ def publish_single_xiaohongshu_record(
         
         try:
             results = loop.run_until_complete(
-                multi_platform_publisher.process_xiaohongshu_records(
+                context.multi_platform_publisher.process_xiaohongshu_records(
                     [record], download_folder
                 )
             )
@@ -527,7 +588,7 @@ def convert_xiaohongshu_format(
         Dict: 转换后的数据格式
     """
     try:
-        if not multi_platform_publisher:
+        if not accounts:
             return {"success": False, "message": "多平台发布服务未初始化"}
         
         # 构造小红书格式记录
@@ -538,7 +599,7 @@ def convert_xiaohongshu_format(
         }
         
         # 转换格式
-        converted_data = multi_platform_publisher.process_xiaohongshu_format(record)
+        converted_data = accounts.get().multi_platform_publisher.process_xiaohongshu_format(record)
         
         return {
             "success": True,
@@ -554,7 +615,8 @@ def convert_xiaohongshu_format(
 @mcp.tool()
 def process_feishu_records(
     feishu_records: List[Dict[str, Any]], 
-    download_folder: str = "downloaded_images"
+    download_folder: str = "downloaded_images",
+    account: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     处理飞书多维表格记录并发布到今日头条（完全兼容小红书工具的飞书数据格式）
@@ -562,15 +624,17 @@ def process_feishu_records(
     Args:
         feishu_records: 飞书多维表格记录列表（包含"小红书标题"、"仿写小红书文案"、"配图"字段）
         download_folder: 图片下载目录
+        account: 账号名，默认使用默认账号（见 list_accounts）
         
     Returns:
         Dict: 批量处理结果
     """
     try:
-        if not multi_platform_publisher:
+        if not accounts:
             return {"success": False, "message": "多平台发布服务未初始化"}
         
-        if not auth_manager or not auth_manager.check_login_status():
+        context = accounts.get(account)
+        if not context.auth.check_login_status():
             return {"success": False, "message": "请先登录今日头条"}
         
         # 转换飞书记录格式为标准格式
@@ -591,13 +655,13 @@ def process_feishu_records(
         
         try:
             results = loop.run_until_complete(
-                multi_platform_publisher.process_xiaohongshu_records(
+                context.multi_platform_publisher.process_xiaohongshu_records(
                     converted_records, download_folder
                 )
             )
             
             # 生成摘要报告
-            summary = multi_platform_publisher.generate_publish_summary(results)
+            summary = context.multi_platform_publisher.generate_publish_summary(results)
             
             return {
                 "success": True,
@@ -612,16 +676,95 @@ def process_feishu_records(
         logger.error(f"处理飞书记录异常: {e}")
         return {"success": False, "message": f"处理异常: {str(e)}"}
 
+@mcp.tool()
+def list_accounts() -> Dict[str, Any]:
+    """
+    列出已配置的账号及其登录状态（TOUTIAO_ACCOUNTS）
+    
+    Returns:
+        Dict: 默认账号和各账号的 Cookie 文件、登录状态
+    """
+    try:
+        if not accounts:
+            return {"success": False, "message": "服务未初始化"}
+        
+        return {
+            "success": True,
+            "default_account": accounts.default_account,
+            "accounts": [
+                {
+                    "account": name,
+                    "cookies_file": accounts.accounts[name],
+                    "is_logged_in": accounts.get(name).auth.check_login_status()
+                }
+                for name in accounts.names()
+            ]
+        }
+    except Exception as e:
+        logger.error(f"获取账号列表异常: {e}")
+        return {"success": False, "message": f"获取异常: {str(e)}"}
+
+@mcp.tool()
+def publish_batch(
+    jobs: List[Dict[str, Any]],
+    accounts_to_use: Optional[List[str]] = None,
+    interval: float = 0
+) -> Dict[str, Any]:
+    """
+    把一批文章和微头条分配到多个已登录账号，各账号在自己的浏览器中并行发布
+    
+    Args:
+        jobs: 发布任务列表。type 为 article 时参数同 publish_article（title、content、images、
+            tags、cover_image）；type 为 micro_post 时参数同 publish_micro_post（content、images、topic）；
+            可用 account 字段指定由哪个账号发布
+        accounts_to_use: 参与分配的账号，默认全部已登录账号
+        interval: 同一账号相邻两次发布之间的间隔（秒）
+        
+    Returns:
+        Dict: 汇总结果，results 与 jobs 顺序一致并标明发布账号
+    """
+    try:
+        if not accounts:
+            return {"success": False, "message": "发布服务未初始化"}
+        
+        return accounts.run_batch(jobs, accounts=accounts_to_use, interval=interval)
+    except Exception as e:
+        logger.error(f"多账号批量发布异常: {e}")
+        return {"success": False, "message": f"批量发布异常: {str(e)}"}
+
+@mcp.tool()
+def get_publish_timings(reset: bool = False) -> Dict[str, Any]:
+    """
+    获取本进程发布流程各步骤的耗时汇总（驱动借出、Cookie传递、页面加载、编辑器就绪、
+    标题、正文、封面上传、预览、确认、成功检测等）
+    
+    Args:
+        reset: 返回后是否清空汇总
+        
+    Returns:
+        Dict: 按发布类型汇总的各步骤耗时分布（次数、平均值、p50、p90、最大值）
+    """
+    try:
+        aggregator = get_timing_aggregator()
+        summary = aggregator.summary()
+        if reset:
+            aggregator.reset()
+        return {"success": True, "timings": summary}
+    except Exception as e:
+        logger.error(f"获取发布耗时汇总异常: {e}")
+        return {"success": False, "message": f"获取异常: {str(e)}"}
+
 # 模块初始化
 logger.info("正在初始化今日头条MCP服务器...")
 logger.info("可用功能:")
-logger.info("- 用户认证: login_with_credentials, check_login_status, logout")
-logger.info("- 内容发布: publish_article, publish_micro_post")
+logger.info("- 用户认证: login_with_credentials, check_login_status, logout, list_accounts")
+logger.info("- 内容发布: publish_article, publish_micro_post, publish_batch")
 logger.info("- 内容管理: get_article_list, delete_article")
 logger.info("- 数据分析: get_account_overview, get_article_stats, get_trending_analysis")
 logger.info("- 报告生成: get_content_performance, generate_report")
 logger.info("- 多平台兼容: publish_xiaohongshu_data, publish_single_xiaohongshu_record")
 logger.info("- 格式转换: convert_xiaohongshu_format, process_feishu_records")
+logger.info("- 性能统计: get_publish_timings")
 
 # 初始化服务
 initialize_services()
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""
+多标签页调度模块
+
+在同一个已登录的浏览器中用多个标签页并发执行发布流程。WebDriver 同一时间只能
+操作一个标签页，因此各流程轮流持有浏览器（令牌），只在等待点（PageWaiter 的轮询
+间隔）让出令牌并切换标签页，使多个发布流程的页面加载和上传等待相互重叠。
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .waits import PageWaiter
+
+logger = logging.getLogger(__name__)
+
+
+class TabContext:
+    """单个发布流程占用的标签页"""
+
+    def __init__(self, scheduler: "TabScheduler", handle: str):
+        """
+        初始化标签页上下文
+
+        Args:
+            scheduler: 所属调度器
+            handle: 标签页的窗口句柄
+        """
+        self.scheduler = scheduler
+        self.handle = handle
+        self.holding = False
+
+    def acquire(self) -> None:
+        """取得浏览器令牌并切换到本标签页"""
+        self.scheduler._baton.acquire()
+        self.holding = True
+        try:
+            self.scheduler._switch_to(self.handle)
+        except Exception:
+            self.release()
+            raise
+
+    def release(self) -> None:
+        """让出浏览器令牌"""
+        if self.holding:
+            self.holding = False
+            self.scheduler._baton.release()
+
+    def sleep(self, seconds: float) -> None:
+        """等待期间让出浏览器，供其他标签页执行操作"""
+        self.release()
+        try:
+            time.sleep(seconds)
+        finally:
+            self.acquire()
+
+    def waiter(self, poll_interval: float = 0.1) -> PageWaiter:
+        """创建在等待点让出浏览器的页面等待器"""
+        return PageWaiter(
+            self.scheduler.driver,
+            poll_interval=poll_interval,
+            sleep=self.sleep,
+            blocking_navigation=False
+        )
+
+
+class TabScheduler:
+    """在一个浏览器的多个标签页中并发执行发布流程"""
+
+    def __init__(self,
+                 driver: Any,
+                 max_tabs: int = 4,
+                 setup_tab: Optional[Callable[[Any], None]] = None):
+        """
+        初始化调度器
+
+        Args:
+            driver: 已登录的浏览器驱动
+            max_tabs: 同时打开的最多标签页数
+            setup_tab: 新标签页打开后执行的初始化函数（如设置请求屏蔽）
+        """
+        self.driver = driver
+        self.max_tabs = max(1, max_tabs)
+        self.setup_tab = setup_tab
+        self._baton = threading.Lock()
+        self._current_handle: Optional[str] = None
+
+    def _switch_to(self, handle: str) -> None:
+        """切换到指定标签页（已在该标签页时不发送命令），调用方需持有令牌"""
+        if self._current_handle != handle:
+            self._current_handle = None
+            self.driver.switch_to.window(handle)
+            self._current_handle = handle
+
+    def _open_tab(self) -> TabContext:
+        """打开新标签页，调用方需持有令牌"""
+        self.driver.switch_to.new_window('tab')
+        handle = self.driver.current_window_handle
+        self._current_handle = handle
+        if self.setup_tab:
+            try:
+                self.setup_tab(self.driver)
+            except Exception as e:
+                logger.warning(f"初始化标签页失败: {e}")
+        return TabContext(self, handle)
+
+    def _close_tab(self, tab: TabContext) -> None:
+        """关闭标签页，标签页已崩溃时忽略错误"""
+        with self._baton:
+            try:
+                self._switch_to(tab.handle)
+                self.driver.close()
+            except Exception as e:
+                logger.debug(f"关闭标签页异常: {e}")
+            finally:
+                self._current_handle = None
+
+    def _run_one(self, index: int, flow: Callable[[TabContext], Dict[str, Any]]) -> Dict[str, Any]:
+        """在独立标签页中执行一个发布流程，流程或标签页异常只影响该流程"""
+        tab = None
+        try:
+            with self._baton:
+                tab = self._open_tab()
+            tab.acquire()
+            return flow(tab)
+        except Exception as e:
+            logger.error(f"标签页 {index} 中的发布流程异常: {e}")
+            return {
+                'success': False,
+                'message': f'标签页发布异常: {type(e).__name__} - {str(e)}'
+            }
+        finally:
+            if tab:
+                tab.release()
+                self._close_tab(tab)
+
+    def run(self, flows: List[Callable[[TabContext], Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        并发执行发布流程，同时打开的标签页数不超过 max_tabs
+
+        Args:
+            flows: 发布流程列表，每个流程接收 TabContext 并返回结果字典
+
+        Returns:
+            List[Dict]: 与 flows 顺序一致的结果列表
+        """
+        if not flows:
+            return []
+        workers = min(self.max_tabs, len(flows))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="publish-tab") as executor:
+            futures = [executor.submit(self._run_one, index, flow) for index, flow in enumerate(flows)]
+            return [future.result() for future in futures]
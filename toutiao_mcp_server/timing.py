@@ -0,0 +1,143 @@
+"""
+发布耗时统计模块
+
+按步骤记录单次发布的耗时时间线，并在进程级汇总各步骤的耗时分布，
+用于定位发布流程中的慢步骤。
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class StepTimer:
+    """单次发布的步骤耗时时间线，开始新步骤时自动结束上一个步骤"""
+
+    def __init__(self):
+        """初始化计时器，从创建时开始计算总耗时"""
+        self.started = time.monotonic()
+        self.steps: Dict[str, float] = {}
+        self._current: Optional[str] = None
+        self._current_start = 0.0
+
+    def start(self, name: str) -> None:
+        """
+        开始一个步骤，同名步骤的耗时累加
+
+        Args:
+            name: 步骤名称
+        """
+        self.stop()
+        self._current = name
+        self._current_start = time.monotonic()
+
+    def stop(self) -> None:
+        """结束当前步骤"""
+        if self._current is None:
+            return
+        elapsed = time.monotonic() - self._current_start
+        self.steps[self._current] = round(self.steps.get(self._current, 0.0) + elapsed, 3)
+        self._current = None
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """计时一个步骤的上下文管理器"""
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        结束当前步骤并返回时间线
+
+        Returns:
+            Dict: 各步骤耗时（秒，按开始顺序），total 为从创建计时器起的总耗时
+        """
+        self.stop()
+        timings = dict(self.steps)
+        timings['total'] = round(time.monotonic() - self.started, 3)
+        return timings
+
+
+class TimingAggregator:
+    """进程级的发布耗时汇总"""
+
+    def __init__(self, max_samples: int = 200):
+        """
+        初始化汇总器
+
+        Args:
+            max_samples: 每种发布类型每个步骤保留的最近样本数
+        """
+        self.max_samples = max_samples
+        self._samples: Dict[str, Dict[str, List[float]]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, timings: Dict[str, float], success: Optional[bool] = None) -> None:
+        """
+        记录一次发布的时间线
+
+        Args:
+            kind: 发布类型（如 article、micro_post）
+            timings: StepTimer.as_dict() 的结果
+            success: 发布是否成功
+        """
+        with self._lock:
+            samples = self._samples.setdefault(kind, {})
+            for name, seconds in timings.items():
+                values = samples.setdefault(name, [])
+                values.append(seconds)
+                if len(values) > self.max_samples:
+                    del values[0]
+            counts = self._counts.setdefault(kind, {'runs': 0, 'succeeded': 0})
+            counts['runs'] += 1
+            if success:
+                counts['succeeded'] += 1
+
+    @staticmethod
+    def _percentile(values: List[float], ratio: float) -> float:
+        """计算已排序样本的分位数"""
+        index = min(len(values) - 1, int(round(ratio * (len(values) - 1))))
+        return values[index]
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        汇总各发布类型各步骤的耗时分布
+
+        Returns:
+            Dict: {发布类型: {runs, succeeded, steps: {步骤: {count, mean, p50, p90, max}}}}
+        """
+        with self._lock:
+            result: Dict[str, Any] = {}
+            for kind, samples in self._samples.items():
+                steps = {}
+                for name, values in samples.items():
+                    ordered = sorted(values)
+                    steps[name] = {
+                        'count': len(ordered),
+                        'mean': round(sum(ordered) / len(ordered), 3),
+                        'p50': self._percentile(ordered, 0.5),
+                        'p90': self._percentile(ordered, 0.9),
+                        'max': ordered[-1]
+                    }
+                result[kind] = dict(self._counts.get(kind, {}), steps=steps)
+            return result
+
+    def reset(self) -> None:
+        """清空所有记录"""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+
+# 进程级汇总实例
+_aggregator = TimingAggregator()
+
+
+def get_timing_aggregator() -> TimingAggregator:
+    """获取进程级的发布耗时汇总实例"""
+    return _aggregator
@@ -0,0 +1,403 @@
+"""
+页面等待模块
+
+用基于 DOM 状态的条件等待替代固定时长的 sleep。每个条件都有超时上限，
+并记录实际等待时间，便于定位发布流程中的耗时。
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import TimeoutException
+
+logger = logging.getLogger(__name__)
+
+# 页面内通用的可见性/可用性判断函数，注入到每段条件脚本前
+_JS_HELPERS = """
+var isVisible = function(el) {
+    if (!el) { return false; }
+    var style = window.getComputedStyle(el);
+    if (style.visibility === 'hidden' || style.display === 'none') { return false; }
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+};
+var isEnabled = function(el) {
+    return !!el && !el.disabled && !/\\bbyte-btn-disabled\\b/.test(el.className || '');
+};
+var firstVisible = function(selector) {
+    var nodes = document.querySelectorAll(selector);
+    for (var i = 0; i < nodes.length; i++) {
+        if (isVisible(nodes[i])) { return nodes[i]; }
+    }
+    return null;
+};
+var firstVisibleXPath = function(xpath) {
+    var result = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (var i = 0; i < result.snapshotLength; i++) {
+        var node = result.snapshotItem(i);
+        if (isVisible(node)) { return node; }
+    }
+    return null;
+};
+"""
+
+# 遮罩层选择器（抽屉、弹窗遮罩会拦截点击）
+MASK_SELECTORS = ".byte-drawer-mask, .byte-modal-mask"
+
+# 页面被重定向到登录页时 editor_ready 的返回值
+LOGIN_REQUIRED = "login_required"
+
+# 图片上传区域中的缩略图、上传进度和上传失败元素
+UPLOAD_THUMBNAIL_SELECTORS = (
+    ".byte-upload-list img, [class*='image-list'] img, [class*='upload-list'] img, "
+    "[class*='image-item'] img, [class*='pic-list'] img"
+)
+UPLOAD_PROGRESS_SELECTORS = ".byte-upload-progress, .byte-progress, [class*='uploading'], [class*='upload-progress']"
+UPLOAD_ERROR_SELECTORS = "[class*='upload-error'], [class*='upload-fail'], .byte-upload-list-item-error"
+
+# 统计上传区域状态的脚本（参数依次为缩略图、上传进度、上传失败选择器）
+UPLOAD_SNAPSHOT_SCRIPT = """
+var count = function(selector, loadedOnly) {
+    var nodes = document.querySelectorAll(selector), n = 0;
+    for (var i = 0; i < nodes.length; i++) {
+        if (!isVisible(nodes[i])) { continue; }
+        if (loadedOnly && !(nodes[i].complete && nodes[i].naturalWidth > 0)) { continue; }
+        n++;
+    }
+    return n;
+};
+return {
+    rendered: count(arguments[0], true),
+    uploading: count(arguments[1], false),
+    failed: count(arguments[2], false)
+};
+"""
+
+PUBLISH_SUCCEEDED = "publish_succeeded"
+
+# 发布结果的判断脚本（参数为点击发布前的页面地址、PUBLISH_SUCCEEDED、LOGIN_REQUIRED）：
+# 跳转到登录页时返回 LOGIN_REQUIRED；出现成功提示或跳转到作品管理页时返回 PUBLISH_SUCCEEDED；
+# 跳转到其他页面（如错误页）不视为成功，继续等待
+PUBLISH_SUCCEEDED_SCRIPT = """
+var href = window.location.href;
+if (href !== arguments[0]) {
+    if (/login|passport|\\/auth\\//.test(href)) { return arguments[2]; }
+    if (/\\/profile_v4\\/(manage|graphic\\/articles|weitoutiao)|weitt-success/.test(window.location.pathname)) {
+        return arguments[1];
+    }
+}
+return firstVisibleXPath("//*[contains(text(), '发布成功') or contains(text(), '提交成功')]") ? arguments[1] : null;
+"""
+
+
+class PageWaiter:
+    """基于 DOM 状态的等待器"""
+
+    def __init__(self,
+                 driver: Any,
+                 poll_interval: float = 0.1,
+                 sleep: Callable[[float], None] = time.sleep,
+                 blocking_navigation: bool = True):
+        """
+        初始化等待器
+
+        Args:
+            driver: 浏览器驱动
+            poll_interval: 条件轮询间隔（秒）
+            sleep: 轮询间隔使用的等待函数
+            blocking_navigation: navigate() 是否等待页面加载完成再返回；
+                多标签页调度时为 False，页面加载期间让出浏览器给其他标签页
+        """
+        self.driver = driver
+        self.poll_interval = poll_interval
+        self.sleep = sleep
+        self.blocking_navigation = blocking_navigation
+        self.records: List[Dict[str, Any]] = []
+
+    def navigate(self, url: str) -> None:
+        """
+        打开页面。非阻塞模式下只发起跳转，由后续的条件等待判断页面是否就绪
+
+        Args:
+            url: 页面地址
+        """
+        if self.blocking_navigation:
+            self.driver.get(url)
+            return
+        self.driver.execute_script("window.location.href = arguments[0];", url)
+        self.sleep(self.poll_interval)
+
+    def until(self,
+              name: str,
+              condition: Callable[[Any], Any],
+              timeout: float,
+              required: bool = True) -> Any:
+        """
+        轮询条件直到返回真值或超时
+
+        Args:
+            name: 条件名称，用于日志和记录
+            condition: 接收 driver 的条件函数，返回真值表示满足
+            timeout: 超时时间（秒）
+            required: 超时是否抛出异常，为 False 时返回 None
+
+        Returns:
+            Any: 条件函数返回的真值
+
+        Raises:
+            TimeoutException: required 为 True 且超时
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        value = None
+        last_error = None
+
+        while True:
+            try:
+                value = condition(self.driver)
+            except Exception as e:
+                last_error = e
+                value = None
+            if value or time.monotonic() >= deadline:
+                break
+            self.sleep(self.poll_interval)
+
+        elapsed = time.monotonic() - start
+        satisfied = bool(value)
+        self.records.append({
+            'name': name,
+            'timeout': timeout,
+            'waited': round(elapsed, 3),
+            'satisfied': satisfied
+        })
+
+        if satisfied:
+            logger.info(f"等待条件满足: {name}（{elapsed:.2f}秒）")
+            return value
+
+        message = f"等待条件超时: {name}（{timeout}秒）"
+        if last_error:
+            message += f"，最后一次错误: {last_error}"
+        if required:
+            logger.warning(message)
+            raise TimeoutException(message)
+        logger.info(message)
+        return None
+
+    def until_js(self, name: str, script: str, timeout: float, *args: Any, required: bool = True) -> Any:
+        """
+        轮询一段返回真值即满足的脚本（可使用 isVisible/isEnabled/firstVisible 等辅助函数）
+
+        Args:
+            name: 条件名称
+            script: 条件脚本，需以 return 返回结果
+            timeout: 超时时间（秒）
+            *args: 传给脚本的 arguments
+            required: 超时是否抛出异常
+        """
+        full_script = _JS_HELPERS + script
+        return self.until(name, lambda d: d.execute_script(full_script, *args), timeout, required)
+
+    def visible(self, name: str, selector: str, timeout: float, required: bool = True) -> Any:
+        """等待匹配 CSS 选择器的第一个可见元素"""
+        return self.until_js(name, "return firstVisible(arguments[0]);", timeout, selector, required=required)
+
+    def clickable(self, name: str, selector: str, timeout: float, required: bool = True) -> Any:
+        """等待匹配 CSS 选择器的第一个可见且可用的元素"""
+        return self.until_js(
+            name,
+            "var el = firstVisible(arguments[0]); return isEnabled(el) ? el : null;",
+            timeout, selector, required=required
+        )
+
+    def clickable_xpath(self, name: str, xpath: str, timeout: float, required: bool = True) -> Any:
+        """等待匹配 XPath 的第一个可见且可用的元素"""
+        return self.until_js(
+            name,
+            "var el = firstVisibleXPath(arguments[0]); return isEnabled(el) ? el : null;",
+            timeout, xpath, required=required
+        )
+
+    def first_visible_of(self,
+                         name: str,
+                         selectors: List[str],
+                         timeout: float,
+                         required: bool = True) -> Optional[Tuple[str, Any]]:
+        """
+        一次脚本调用按优先级检查所有候选选择器，轮询直到任一选择器匹配到可见元素
+
+        Args:
+            name: 条件名称
+            selectors: 按优先级排列的 CSS 选择器列表
+            timeout: 超时时间（秒）
+            required: 超时是否抛出异常
+
+        Returns:
+            (选择器, 元素)；页面被重定向到登录页时返回 (LOGIN_REQUIRED, None)
+        """
+        found = self.until_js(name, """
+            if (/login|\\/auth\\//.test(window.location.href)) { return [arguments[1], null]; }
+            var selectors = arguments[0];
+            for (var i = 0; i < selectors.length; i++) {
+                var el = null;
+                try { el = firstVisible(selectors[i]); } catch (e) { el = null; }
+                if (el) { return [selectors[i], el]; }
+            }
+            return null;
+        """, timeout, selectors, LOGIN_REQUIRED, required=required)
+        return tuple(found) if found else None
+
+    # ---- 发布流程中的常用条件 ----
+
+    def editor_ready(self, timeout: float = 20) -> Any:
+        """
+        等待文章编辑页就绪：标题输入框和正文编辑器均可见且可编辑
+
+        Returns:
+            正文编辑器元素；页面被重定向到登录页时返回 LOGIN_REQUIRED
+        """
+        return self.until_js("editor_ready", """
+            if (/login|\\/auth\\//.test(window.location.href)) { return arguments[0]; }
+            if (document.readyState === 'loading') { return null; }
+            var title = firstVisible('textarea');
+            var editor = firstVisible('.ProseMirror');
+            if (!title || !editor || editor.getAttribute('contenteditable') !== 'true') { return null; }
+            return editor;
+        """, timeout, LOGIN_REQUIRED)
+
+    def mask_gone(self, timeout: float = 5) -> bool:
+        """等待遮罩层消失"""
+        return bool(self.until_js(
+            "mask_gone", "return !firstVisible(arguments[0]);", timeout, MASK_SELECTORS, required=False
+        ))
+
+    def value_applied(self, name: str, element: Any, value: str, timeout: float = 3) -> bool:
+        """等待输入框的值与期望一致"""
+        return bool(self.until_js(
+            name, "return arguments[0].value === arguments[1];", timeout, element, value, required=False
+        ))
+
+    def content_applied(self, element: Any, timeout: float = 5) -> bool:
+        """等待编辑器渲染出正文内容"""
+        return bool(self.until_js(
+            "content_applied",
+            "return (arguments[0].innerText || '').trim().length > 0;",
+            timeout, element, required=False
+        ))
+
+    def upload_thumbnail_rendered(self, confirm_selector: str, timeout: float = 30) -> Any:
+        """
+        等待上传弹窗中的缩略图加载完成且确认按钮可用，返回确认按钮
+
+        Args:
+            confirm_selector: 上传确认按钮选择器
+            timeout: 超时时间（秒）
+        """
+        return self.until_js("upload_thumbnail_rendered", """
+            var btn = firstVisible(arguments[0]);
+            if (!isEnabled(btn)) { return null; }
+            var dialog = btn.closest('.byte-modal, .byte-drawer, [role="dialog"]') || document;
+            var images = dialog.querySelectorAll('img');
+            for (var i = 0; i < images.length; i++) {
+                if (isVisible(images[i]) && !(images[i].complete && images[i].naturalWidth > 0)) {
+                    return null;
+                }
+            }
+            return btn;
+        """, timeout, confirm_selector)
+
+    def upload_snapshot(self) -> Dict[str, int]:
+        """
+        统计上传区域的状态
+
+        Returns:
+            Dict: rendered 已加载完成的缩略图数，uploading 上传中的进度元素数，failed 上传失败元素数
+        """
+        return self.driver.execute_script(
+            _JS_HELPERS + UPLOAD_SNAPSHOT_SCRIPT,
+            UPLOAD_THUMBNAIL_SELECTORS, UPLOAD_PROGRESS_SELECTORS, UPLOAD_ERROR_SELECTORS
+        )
+
+    def uploads_finished(self,
+                         expected: int,
+                         baseline: Dict[str, int],
+                         per_image_timeout: float = 30) -> Dict[str, Any]:
+        """
+        等待一批图片上传完成：统计新增的已渲染缩略图和失败元素，直到数量达到预期
+
+        每张图片最多等待 per_image_timeout 秒，即距离上一次有图片完成（或开始上传）
+        超过该时间仍无进展时停止等待。
+
+        Args:
+            expected: 本批上传的图片数
+            baseline: 上传前的 upload_snapshot() 结果
+            per_image_timeout: 单张图片的超时时间（秒）
+
+        Returns:
+            Dict: completed 为每张缩略图渲染完成时距开始上传的秒数（按完成顺序），failed 为失败数
+        """
+        start = time.monotonic()
+        last_progress = start
+        completed: List[float] = []
+        failed = 0
+
+        while True:
+            try:
+                snapshot = self.upload_snapshot()
+            except Exception as e:
+                logger.debug(f"统计上传状态异常: {e}")
+                snapshot = None
+
+            now = time.monotonic()
+            if snapshot:
+                rendered = max(0, snapshot['rendered'] - baseline.get('rendered', 0))
+                new_failed = max(0, snapshot['failed'] - baseline.get('failed', 0))
+                while len(completed) < min(rendered, expected):
+                    completed.append(round(now - start, 3))
+                    last_progress = now
+                if new_failed > failed:
+                    failed = new_failed
+                    last_progress = now
+                if len(completed) + failed >= expected:
+                    break
+            if now - last_progress >= per_image_timeout:
+                break
+            self.sleep(self.poll_interval)
+
+        elapsed = time.monotonic() - start
+        satisfied = len(completed) >= expected
+        self.records.append({
+            'name': 'uploads_finished',
+            'timeout': per_image_timeout * expected,
+            'waited': round(elapsed, 3),
+            'satisfied': satisfied
+        })
+        log = logger.info if satisfied else logger.warning
+        log(f"图片上传完成 {len(completed)}/{expected}，失败 {failed}（{elapsed:.2f}秒）")
+        return {'completed': completed, 'failed': failed}
+
+    def cover_applied(self, timeout: float = 10) -> bool:
+        """等待封面区域显示已选图片（上传弹窗关闭）"""
+        return bool(self.until_js("cover_applied", """
+            if (firstVisible("button[data-e2e='imageUploadConfirm-btn']")) { return false; }
+            var img = firstVisible('.article-cover img');
+            return !!img && img.complete && img.naturalWidth > 0;
+        """, timeout, required=False))
+
+    def publish_dialog_visible(self, confirm_selector: str, timeout: float = 20) -> Any:
+        """等待预览发布弹窗中的最终确认按钮出现且可用，返回该按钮"""
+        return self.clickable("publish_dialog_visible", confirm_selector, timeout)
+
+    def publish_outcome(self, start_url: str, timeout: float = 15) -> Optional[str]:
+        """
+        等待发布成功提示出现、页面跳转到作品管理页或登录页
+
+        Returns:
+            PUBLISH_SUCCEEDED、LOGIN_REQUIRED，超时未判断出结果时返回 None
+        """
+        return self.until_js("publish_outcome", PUBLISH_SUCCEEDED_SCRIPT, timeout,
+                             start_url, PUBLISH_SUCCEEDED, LOGIN_REQUIRED, required=False)
+
+    def total_waited(self) -> float:
+        """所有条件的累计等待时间（秒）"""
+        return round(sum(record['waited'] for record in self.records), 3)